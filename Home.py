@@ -1,11 +1,15 @@
 import streamlit as st
-import pandas as pd
-import random
-import sqlite3
+
+from kitchen import db, publishing, recipes, sessions
 
 # Page configuration
 st.set_page_config(page_title="Leo's Kitchen", page_icon="🐱", layout="wide")
 
+# Open the shared connection pool and run schema setup once per process,
+# then start the background worker (picking up any jobs left from before a restart)
+db.get_pool()
+publishing.get_runner()
+
 # Initialize session state variables if they don't exist
 if 'authenticated' not in st.session_state:
     st.session_state.authenticated = False
@@ -14,6 +18,9 @@ if 'username' not in st.session_state:
 if 'user_id' not in st.session_state:
     st.session_state.user_id = None
 
+# Log returning "Remember me" users back in from their session cookie
+sessions.restore_session()
+
 # --- SIDEBAR NAVIGATION ---
 # st.sidebar.title("Navigation")
 # st.sidebar.page_link("Home.py", label="🏠 Home")
@@ -32,6 +39,7 @@ if st.session_state.authenticated:
     st.sidebar.subheader(f"Welcome, {st.session_state.username}")
     st.sidebar.page_link("pages/My_Profile.py", label="👤 My Profile")
     if st.sidebar.button("Logout"):
+        sessions.forget_login()
         st.session_state.authenticated = False
         st.session_state.username = ""
         st.session_state.user_id = None
@@ -49,10 +57,29 @@ with st.container():
                                      placeholder="e.g., chicken, protein bowl, breakfast...")
 
     with col2:
-        category = st.selectbox("Category", ["All", "Breakfast", "Lunch", "Dinner", "Snacks", "Desserts"])
+        category = st.selectbox("Category", ["All"] + recipes.CATEGORIES)
 
     with col3:
-        sort_by = st.selectbox("Sort by", ["Newest", "Most Popular", "Highest Protein", "Lowest Calories"])
+        # Relevance ranking only makes sense while searching
+        sort_options = list(recipes.SORT_KEYS)
+        if search_query:
+            sort_options.insert(0, recipes.BEST_MATCH)
+        sort_by = st.selectbox("Sort by", sort_options)
+
+    # Macro-target mode: find the recipes closest to what the user wants to eat
+    macro_target = None
+    if st.toggle("🎯 Match my macros"):
+        target_col1, target_col2, target_col3, target_col4 = st.columns(4)
+        with target_col1:
+            target_protein = st.number_input("Protein (g)", min_value=0, value=30)
+        with target_col2:
+            target_carbs = st.number_input("Carbs (g)", min_value=0, value=40)
+        with target_col3:
+            target_fat = st.number_input("Fat (g)", min_value=0, value=15)
+        with target_col4:
+            target_calories = st.number_input("Calories", min_value=0, value=450)
+        st.caption("Set a value to 0 to ignore it.")
+        macro_target = (target_protein, target_carbs, target_fat, target_calories)
 
 # --- WELCOME BANNER ---
 if not search_query and category == "All":
@@ -70,137 +97,124 @@ if not search_query and category == "All":
         with cta_col2:
             st.button("Sign Up Now", on_click=lambda: st.switch_page("pages/Authentication.py"))
 
-    # Featured meals carousel
+    # Featured meals carousel: this week's most popular
     st.subheader("Featured Meals This Week")
     featured_cols = st.columns(3)
+    featured, _ = recipes.cached_feed("", "All", "Most Popular", 3, None)
 
-    with featured_cols[0]:
-        st.image("https://api.placeholder.com/640/480", use_container_width=True)
-        st.markdown("#### Protein Pancakes")
-        st.markdown("**Macros:** 32g protein • 45g carbs • 12g fat • 420 calories")
-        st.button("View Recipe", key="featured1")
-
-    with featured_cols[1]:
-        st.image("https://api.placeholder.com/640/480", use_container_width=True)
-        st.markdown("#### Mediterranean Bowl")
-        st.markdown("**Macros:** 28g protein • 52g carbs • 15g fat • 460 calories")
-        st.button("View Recipe", key="featured2")
-
-    with featured_cols[2]:
-        st.image("https://api.placeholder.com/640/480", use_container_width=True)
-        st.markdown("#### Chocolate Protein Smoothie")
-        st.markdown("**Macros:** 24g protein • 30g carbs • 8g fat • 290 calories")
-        st.button("View Recipe", key="featured3")
+    for featured_col, meal in zip(featured_cols, featured):
+        with featured_col:
+            st.image(meal["image"], use_container_width=True)
+            st.markdown(f"#### {meal['name']}")
+            st.markdown(f"**Macros:** {meal['protein']}g protein • {meal['carbs']}g carbs • "
+                        f"{meal['fat']}g fat • {meal['calories']} calories")
+            if st.button("View Recipe", key=f"featured_{meal['id']}"):
+                st.switch_page("pages/Recipe_Detail.py", query_params={"id": meal["id"]})
 
 # --- SEARCH RESULTS OR MAIN FEED ---
 st.divider()
 
 
-# Function to generate sample meal data (would be replaced with database)
-def get_sample_meals(n=12):
-    meal_types = ["Breakfast", "Lunch", "Dinner", "Snacks", "Desserts"]
-    users = ["@HealthyChef", "@FitnessFoodie", "@MacroMaster", "@KetoKing", "@VeganVibes", "@LeoTheChef"]
-
-    meals = []
-
-    breakfast_items = ["Protein Oatmeal", "Greek Yogurt Bowl", "Egg White Scramble", "Avocado Toast",
-                       "Protein Pancakes"]
-    lunch_items = ["Chicken Salad", "Tuna Wrap", "Quinoa Bowl", "Turkey Sandwich", "Lentil Soup"]
-    dinner_items = ["Salmon with Veggies", "Steak and Sweet Potato", "Chicken Stir Fry", "Tofu Curry",
-                    "Turkey Meatballs"]
-    snack_items = ["Protein Bar", "Greek Yogurt", "Hummus and Veggies", "Protein Shake", "Apple with Peanut Butter"]
-    dessert_items = ["Protein Brownies", "Fruit Parfait", "Protein Cookies", "Frozen Yogurt", "Protein Mug Cake"]
-
-    all_items = {
-        "Breakfast": breakfast_items,
-        "Lunch": lunch_items,
-        "Dinner": dinner_items,
-        "Snacks": snack_items,
-        "Desserts": dessert_items
-    }
-
-    for i in range(n):
-        meal_type = random.choice(meal_types) if category == "All" else category
-        name = random.choice(all_items[meal_type])
-
-        if search_query and search_query.lower() not in name.lower():
-            continue
-
-        protein = random.randint(15, 40)
-        carbs = random.randint(20, 60)
-        fat = random.randint(5, 25)
-        calories = protein * 4 + carbs * 4 + fat * 9
-
-        meals.append({
-            "name": name,
-            "image": f"https://api.placeholder.com/640/480",
-            "user": random.choice(users),
-            "rating": round(random.uniform(3.5, 5.0), 1),
-            "reviews": random.randint(10, 200),
-            "protein": protein,
-            "carbs": carbs,
-            "fat": fat,
-            "calories": calories,
-            "category": meal_type,
-            "date_posted": pd.Timestamp("2025-03-01") - pd.Timedelta(days=random.randint(0, 30))
-        })
-
-    # Sort results based on selected option
-    if sort_by == "Newest":
-        meals = sorted(meals, key=lambda x: x["date_posted"], reverse=True)
-    elif sort_by == "Most Popular":
-        meals = sorted(meals, key=lambda x: x["reviews"], reverse=True)
-    elif sort_by == "Highest Protein":
-        meals = sorted(meals, key=lambda x: x["protein"], reverse=True)
-    elif sort_by == "Lowest Calories":
-        meals = sorted(meals, key=lambda x: x["calories"])
-
-    return meals
-
-
-# Display search results or feed
-meals = get_sample_meals()
-
-if search_query:
-    st.subheader(f"Results for: {search_query}")
-    if not meals:
+FEED_PAGE_SIZE = 12
+
+
+# Start the feed over with its first page whenever the search, category or sort changes.
+# Only the page cursors live in session state; the pages themselves come from the shared cache.
+feed_key = (search_query, category, sort_by)
+if st.session_state.get("feed_key") != feed_key:
+    st.session_state.feed_key = feed_key
+    st.session_state.feed_cursors = [None]
+
+
+# Load every page shown so far; all but a newly requested page are cache hits.
+# Pages cached at different times can overlap after a reorder, so cards are de-duplicated.
+def feed_pages():
+    meals, seen, next_cursor = [], set(), None
+    for cursor in st.session_state.feed_cursors:
+        page, next_cursor = recipes.cached_feed(*st.session_state.feed_key, FEED_PAGE_SIZE, cursor)
+        meals.extend(meal for meal in page if meal["id"] not in seen)
+        seen.update(meal["id"] for meal in page)
+    return meals, next_cursor
+
+
+# Ask for the page after the last one shown
+def load_more_meals(next_cursor):
+    st.session_state.feed_cursors.append(next_cursor)
+
+
+# Render one feed card
+def meal_card(meal):
+    st.image(meal["image"], use_container_width=True)
+    st.markdown(f"#### {meal['name']}")
+    st.markdown(f"⭐ {meal['rating']} ({meal['reviews']} ratings) • {meal['user']}")
+
+    # Macro information in a clean format
+    macros_col1, macros_col2 = st.columns(2)
+    with macros_col1:
+        st.markdown(f"**Protein:** {meal['protein']}g")
+        st.markdown(f"**Carbs:** {meal['carbs']}g")
+    with macros_col2:
+        st.markdown(f"**Fat:** {meal['fat']}g")
+        st.markdown(f"**Calories:** {meal['calories']}")
+
+    # Action buttons
+    button_col1, button_col2 = st.columns(2)
+    with button_col1:
+        if st.button("View Recipe", key=f"recipe_{meal['id']}"):
+            st.switch_page("pages/Recipe_Detail.py", query_params={"id": meal["id"]})
+    with button_col2:
+        # Different button text based on auth status
+        if st.session_state.authenticated:
+            st.button("Save", key=f"save_{meal['id']}")
+        else:
+            if st.button("Login to Save", key=f"login_save_{meal['id']}"):
+                st.switch_page("pages/Authentication.py")
+
+    # Add some spacing between cards
+    st.markdown("<br>", unsafe_allow_html=True)
+
+
+# Pinterest-style masonry grid layout
+def meal_grid(meals):
+    cols = st.columns(3)
+    for i, meal in enumerate(meals):
+        with cols[i % 3]:
+            meal_card(meal)
+
+
+# Feed grid. Runs as a fragment so "Load more" only reruns the grid,
+# and only the next page is fetched from the database.
+@st.fragment
+def meal_feed():
+    meals, next_cursor = feed_pages()
+    search_query = st.session_state.feed_key[0]
+    if search_query and not meals:
         st.write("No meals found matching your search. Try a different keyword.")
-elif category != "All":
-    st.subheader(f"{category} Meals")
+    meal_grid(meals)
+
+    if next_cursor is not None:
+        st.button("Load more", on_click=load_more_meals, args=(next_cursor,), use_container_width=True)
+
+
+if macro_target:
+    # The macro index (and NumPy) is only loaded once someone uses it
+    from kitchen import macros
+
+    st.subheader("Closest to Your Macros")
+    closest_ids = macros.closest_recipe_ids(*macro_target, k=FEED_PAGE_SIZE, category=category)
+    meals = recipes.cached_cards(tuple(closest_ids))
+    if not meals:
+        st.write("Set at least one macro target to find matching meals.")
+    meal_grid(meals)
 else:
-    st.subheader("Trending Meals")
+    if search_query:
+        st.subheader(f"Results for: {search_query}")
+    elif category != "All":
+        st.subheader(f"{category} Meals")
+    else:
+        st.subheader("Trending Meals")
 
-# Pinterest-style masonry grid layout
-cols = st.columns(3)
-for i, meal in enumerate(meals):
-    with cols[i % 3]:
-        st.image(meal["image"], use_container_width=True)
-        st.markdown(f"#### {meal['name']}")
-        st.markdown(f"⭐ {meal['rating']} ({meal['reviews']} ratings) • {meal['user']}")
-
-        # Macro information in a clean format
-        macros_col1, macros_col2 = st.columns(2)
-        with macros_col1:
-            st.markdown(f"**Protein:** {meal['protein']}g")
-            st.markdown(f"**Carbs:** {meal['carbs']}g")
-        with macros_col2:
-            st.markdown(f"**Fat:** {meal['fat']}g")
-            st.markdown(f"**Calories:** {meal['calories']}")
-
-        # Action buttons
-        button_col1, button_col2 = st.columns(2)
-        with button_col1:
-            st.button("View Recipe", key=f"recipe_{i}")
-        with button_col2:
-            # Different button text based on auth status
-            if st.session_state.authenticated:
-                st.button("Save", key=f"save_{i}")
-            else:
-                if st.button("Login to Save", key=f"login_save_{i}"):
-                    st.switch_page("pages/Authentication.py")
-
-        # Add some spacing between cards
-        st.markdown("<br>", unsafe_allow_html=True)
+    meal_feed()
 
 # --- FOOTER ---
 st.divider()
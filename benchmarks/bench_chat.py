@@ -0,0 +1,112 @@
+# benchmarks/bench_chat.py
+# Simulates Leo chats against a local stand-in for the OpenAI client: one long chat, comparing the
+# tokens sent per turn by the budgeted window with sending the whole history, and many short chats
+# asking common questions through the response cache (on a throwaway database).
+# Run from the repository root: python -m benchmarks.bench_chat --turns 200 --chats 500
+import argparse
+import os
+import random
+import tempfile
+import time
+from types import SimpleNamespace
+
+from kitchen import chat, chat_cache, db
+
+QUESTIONS = [
+    "Give me three high protein breakfast ideas.", "How many calories are in a cup of oats?",
+    "Can I swap the chicken for tofu in that recipe?", "What should I eat after a morning run?",
+    "Is Greek yogurt better than regular yogurt for protein?", "Plan a 1800 calorie vegetarian day for me.",
+]
+
+
+# Answers every request with canned text and records the prompt size of each call
+class FakeClient:
+    def __init__(self, reply_words=120, seed=0):
+        self.rng = random.Random(seed)
+        self.reply_words = reply_words
+        self.calls = []
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+
+    def _text(self, words):
+        return " ".join(self.rng.choice(["protein", "oats", "grams", "calories", "cook", "minutes", "add",
+                                         "serve", "with", "a", "the", "and", "eggs,", "spinach."])
+                        for _ in range(words))
+
+    def _create(self, model, messages, stream=False, max_tokens=None):
+        self.calls.append((model, sum(chat.message_tokens(message) for message in messages)))
+        if stream:
+            return iter([SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=self._text(self.reply_words)))])])
+        text = self._text(min(max_tokens or self.reply_words, 250))
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=text))])
+
+
+# Streams yield OpenAI chunks, or plain text when they come through the cache
+def _text(chunk):
+    return chunk if isinstance(chunk, str) else chunk.choices[0].delta.content
+
+
+def bench_window(turns, budget):
+    client = FakeClient()
+    conversation = chat.Conversation(budget=budget)
+    transcript = []
+    full_history, full_max = 0, 0
+    overhead = 0.0
+    for turn in range(turns):
+        question = QUESTIONS[turn % len(QUESTIONS)]
+        conversation.add("user", question)
+        start = time.perf_counter()
+        stream = conversation.stream_reply(client)
+        overhead += time.perf_counter() - start
+        reply = "".join(_text(chunk) for chunk in stream)
+        conversation.add("assistant", reply)
+        transcript += [{"role": "user", "content": question}, {"role": "assistant", "content": reply}]
+        sent = sum(chat.message_tokens(message) for message in transcript[:-1])
+        full_history, full_max = full_history + sent, max(full_max, sent)
+
+    replies = [tokens for model, tokens in client.calls if model == chat.MODEL]
+    summaries = [tokens for model, tokens in client.calls if model == chat.SUMMARY_MODEL]
+    print(f"{turns} turns, budget {budget} tokens")
+    print(f"windowed: max {max(replies)} tokens/request, {sum(replies) + sum(summaries)} tokens total "
+          f"({len(summaries)} summary requests)")
+    print(f"full history: max {full_max} tokens/request, {full_history} tokens total")
+    print(f"window bookkeeping: {overhead / turns * 1000:.3f} ms/turn")
+
+
+def bench_cache(chats):
+    with tempfile.TemporaryDirectory() as directory:
+        pool = db.ConnectionPool(os.path.join(directory, "bench.db"))
+        pool.migrate()
+        cache = chat_cache.ResponseCache(pool)
+        client = FakeClient()
+        rng = random.Random(1)
+        timings = {True: [], False: []}
+        for _ in range(chats):
+            conversation = chat.Conversation()
+            question = rng.choice(QUESTIONS)
+            conversation.add("user", rng.choice([question, question.lower(), f"  {question.rstrip('.?')} "]))
+            calls = len(client.calls)
+            start = time.perf_counter()
+            reply = "".join(_text(chunk) for chunk in conversation.stream_reply(client, cache=cache))
+            timings[len(client.calls) == calls].append((time.perf_counter() - start) * 1000)
+            conversation.add("assistant", reply)
+        stats = cache.stats()
+        pool.close()
+    print(f"{chats} one-question chats: {stats['hits']} hits, {stats['misses']} misses "
+          f"({stats['hit_rate']:.0%}), {stats['entries']} entries")
+    print(f"hit: median {sorted(timings[True])[len(timings[True]) // 2]:.2f} ms "
+          f"(the stand-in client itself answers in "
+          f"{sorted(timings[False])[len(timings[False]) // 2]:.2f} ms; gpt-4o takes seconds)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure chat request sizes and response cache hits.")
+    parser.add_argument("--turns", type=int, default=200)
+    parser.add_argument("--budget", type=int, default=chat.CONTEXT_TOKEN_BUDGET)
+    parser.add_argument("--chats", type=int, default=500)
+    args = parser.parse_args()
+    bench_window(args.turns, args.budget)
+    bench_cache(args.chats)
+
+
+if __name__ == "__main__":
+    main()
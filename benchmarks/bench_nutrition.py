@@ -0,0 +1,42 @@
+# benchmarks/bench_nutrition.py
+# Times ingredient parsing and nutrition lookup for Share Your Meal.
+# Run from the repository root: python -m benchmarks.bench_nutrition --lines 30
+import argparse
+import random
+import time
+
+from kitchen.nutrition import NutritionTable
+
+LINES = [
+    "1/2 cup rolled oats", "1 scoop vanilla protein powder", "1 tablespoon chia seeds", "2-3 large eggs",
+    "1½ cups cooked rice", "200g chicken breast", "1 (15 oz) can black beans, drained", "8 oz. salmon fillet",
+    "2 tbsp. olive oil", "3 cloves garlic, minced", "½ avocado", "1 teaspoon honey or maple syrup (optional)",
+    "a pinch of salt", "1 lb lean ground beef", "1/4 cup Greek yogurt", "2 slices whole wheat bread",
+    "1 cup baby spinach", "10 almonds", "1 medium sweet potato, cubed", "handful of something unusual",
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure ingredient-list parsing latency.")
+    parser.add_argument("--lines", type=int, default=30)
+    parser.add_argument("--runs", type=int, default=500)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    table = NutritionTable.from_csv()
+    print(f"loaded nutrition table in {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    rng = random.Random(0)
+    timings = []
+    for _ in range(args.runs):
+        lines = [rng.choice(LINES) for _ in range(args.lines)]
+        start = time.perf_counter()
+        table.recipe_nutrition(lines)
+        timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    print(f"{args.lines}-line recipe: median {timings[len(timings) // 2]:.2f} ms, "
+          f"p95 {timings[int(len(timings) * 0.95)]:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
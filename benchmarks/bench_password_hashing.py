@@ -0,0 +1,57 @@
+# benchmarks/bench_password_hashing.py
+# Reports how many logins per second the current scrypt parameters allow.
+# Run from the repository root: python -m benchmarks.bench_password_hashing
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from kitchen import auth
+
+
+def bench_serial(stored, seconds):
+    count = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < seconds:
+        auth.check_hash("correct horse battery staple", stored)
+        count += 1
+    return count / (time.perf_counter() - start)
+
+
+# Many concurrent "sessions" logging in through the bounded pool, like a login burst
+def bench_pool(stored, seconds, clients, workers):
+    pool = auth.HashPool(workers=workers, max_pending=clients)
+    deadline = time.perf_counter() + seconds
+
+    def client():
+        count = 0
+        while time.perf_counter() < deadline:
+            pool.run(auth.check_hash, "correct horse battery staple", stored)
+            count += 1
+        return count
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=clients) as sessions:
+        total = sum(sessions.map(lambda _: client(), range(clients)))
+    return total / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure login throughput at the configured scrypt cost.")
+    parser.add_argument("--seconds", type=float, default=3.0)
+    parser.add_argument("--clients", type=int, default=16)
+    parser.add_argument("--workers", type=int, default=auth.HASH_WORKERS)
+    args = parser.parse_args()
+
+    stored = auth.make_hash("correct horse battery staple")
+    print(f"scrypt N={auth.SCRYPT_N} r={auth.SCRYPT_R} p={auth.SCRYPT_P} "
+          f"({128 * auth.SCRYPT_N * auth.SCRYPT_R // 1024 // 1024} MiB per hash)")
+
+    serial = bench_serial(stored, args.seconds)
+    print(f"single thread:       {serial:8.1f} logins/sec ({1000 / serial:.1f} ms per login)")
+
+    pooled = bench_pool(stored, args.seconds, args.clients, args.workers)
+    print(f"pool ({args.workers} workers, {args.clients} clients): {pooled:8.1f} logins/sec")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+# benchmarks/bench_retrieval.py
+# Times the chat bot's recipe retrieval against a synthetic catalog.
+# Run from the repository root: python -m benchmarks.bench_retrieval --recipes 100000
+import argparse
+import random
+import time
+
+from benchmarks.bench_similar import TAGS, WORDS, synthetic_recipes
+from kitchen import retrieval
+
+QUESTIONS = [
+    "high protein breakfast ideas", "how many calories in oats", "something quick with salmon and rice",
+    "vegan low carb dinner please", "what can I make with chicken, spinach and garlic?",
+    "a gluten-free snack with peanut butter", "low fat dessert with berries and yogurt",
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure recipe retrieval latency per chat turn.")
+    parser.add_argument("--recipes", type=int, default=100000)
+    parser.add_argument("--queries", type=int, default=500)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    recipes = []
+    for recipe in synthetic_recipes(args.recipes, rng):
+        recipe["name"] = " ".join(rng.sample(WORDS, 2)).title() + " " + rng.choice(["Bowl", "Salad", "Wrap", "Bake"])
+        recipe["tags"] = recipe["tags"] if rng.random() < 0.8 else rng.choice(TAGS)
+        recipes.append(recipe)
+
+    index = retrieval.RecipeIndex()
+    start = time.perf_counter()
+    index.add(recipes)
+    print(f"indexed {args.recipes} recipes in {time.perf_counter() - start:.1f} s")
+
+    start = time.perf_counter()
+    for recipe_id in range(args.recipes + 1, args.recipes + 101):
+        index.add([dict(recipes[0], id=recipe_id)])
+    print(f"incremental add: {(time.perf_counter() - start) * 10:.3f} ms/recipe")
+
+    timings = []
+    for _ in range(args.queries):
+        question = rng.choice(QUESTIONS)
+        start = time.perf_counter()
+        index.search(question)
+        timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    print(f"top-{retrieval.TOP_K} search: median {timings[len(timings) // 2]:.2f} ms, "
+          f"p95 {timings[int(len(timings) * 0.95)]:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
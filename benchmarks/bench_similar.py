@@ -0,0 +1,53 @@
+# benchmarks/bench_similar.py
+# Times "You might also like" lookups against a synthetic catalog.
+# Run from the repository root: python -m benchmarks.bench_similar --recipes 100000
+import argparse
+import random
+import time
+
+from kitchen import similar
+from kitchen.recipes import CATEGORIES
+
+WORDS = ("chicken beef tofu oats rice quinoa salmon tuna egg yogurt banana berries spinach kale bean "
+         "lentil pepper garlic onion tomato avocado almond peanut honey cheese milk pasta potato").split()
+TAGS = "high-protein low-carb vegan vegetarian keto quick meal-prep no-cook gluten-free high-fiber".split()
+
+
+def synthetic_recipes(count, rng):
+    for recipe_id in range(1, count + 1):
+        protein, carbs, fat = rng.randint(5, 60), rng.randint(5, 90), rng.randint(2, 40)
+        yield {
+            "id": recipe_id,
+            "category": rng.choice(CATEGORIES),
+            "protein": protein, "carbs": carbs, "fat": fat,
+            "calories": protein * 4 + carbs * 4 + fat * 9,
+            "tags": " ".join(rng.sample(TAGS, 3)),
+            "ingredients": " ".join(f"1 cup {word}" for word in rng.sample(WORDS, 6)),
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure similar-recipe lookup latency.")
+    parser.add_argument("--recipes", type=int, default=100000)
+    parser.add_argument("--queries", type=int, default=200)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    engine = similar.SimilarRecipes()
+    start = time.perf_counter()
+    engine.add(list(synthetic_recipes(args.recipes, rng)))
+    print(f"encoded {args.recipes} recipes in {time.perf_counter() - start:.1f} s "
+          f"({engine._matrix.nbytes / 1024 / 1024:.0f} MiB matrix)")
+
+    timings = []
+    for _ in range(args.queries):
+        recipe_id = rng.randint(1, args.recipes)
+        start = time.perf_counter()
+        engine.similar(recipe_id, k=3)
+        timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    print(f"top-3 lookup: median {timings[len(timings) // 2]:.2f} ms, p95 {timings[int(len(timings) * 0.95)]:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+# benchmarks/bench_writes.py
+# Compares recipe posting throughput: one transaction per post on pooled connections
+# versus the group-committing write queue. Uses a throwaway database.
+# Run from the repository root: python -m benchmarks.bench_writes --clients 16 --posts 50
+import argparse
+import os
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from kitchen import db, recipes, writer
+
+RECIPE = {
+    "name": "Benchmark Bowl", "category": "Lunch", "description": "Rice, chicken and greens.",
+    "instructions": ["Cook the rice.", "Grill the chicken.", "Assemble."],
+    "ingredients": ["1 cup cooked rice", "150g chicken breast", "1 cup spinach", "1 tbsp olive oil"],
+    "tags": ["high-protein", "meal-prep"],
+    "protein": 45, "carbs": 50, "fat": 18, "calories": 542,
+}
+
+
+def run_clients(clients, posts, post):
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=clients) as sessions:
+        list(sessions.map(lambda _: [post() for _ in range(posts)], range(clients)))
+    return clients * posts / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure recipe posts per second with and without the write queue.")
+    parser.add_argument("--clients", type=int, default=16)
+    parser.add_argument("--posts", type=int, default=50)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.db")
+        pool = db.ConnectionPool(path, size=args.clients)
+        pool.migrate()
+
+        def direct_post():
+            with pool.connection() as conn:
+                conn.execute("BEGIN IMMEDIATE")
+                recipes.create_recipe(conn, None, "@bench", RECIPE)
+
+        queue = writer.WriteQueue(path)
+
+        def queued_post():
+            queue.write(recipes.create_recipe, None, "@bench", RECIPE)
+
+        print(f"one transaction per post: {run_clients(args.clients, args.posts, direct_post):8.1f} posts/sec")
+        print(f"group-committed queue:    {run_clients(args.clients, args.posts, queued_post):8.1f} posts/sec")
+        queue.close()
+        pool.close()
+
+
+if __name__ == "__main__":
+    main()
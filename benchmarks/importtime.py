@@ -0,0 +1,68 @@
+# benchmarks/importtime.py
+# Cold-start import report per page, in the style of `python -X importtime`: each page's top-level
+# imports run in a fresh interpreter (after Streamlit itself, which the server has loaded anyway),
+# and the slowest modules they pull in are listed. With --budget-ms it exits non-zero when a page
+# goes over, so import-time regressions can be caught.
+# Run from the repository root: python -m benchmarks.importtime --budget-ms 250
+import argparse
+import ast
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+PAGES = [ROOT / "Home.py"] + sorted((ROOT / "pages").glob("*.py"))
+MARKER = "import time: --- page imports ---"
+
+
+# The page's module-level import statements, as source
+def top_level_imports(path):
+    tree = ast.parse(path.read_text(encoding="utf-8"))
+    return "\n".join(ast.unparse(node) for node in tree.body if isinstance(node, (ast.Import, ast.ImportFrom)))
+
+
+# (cumulative microseconds, module) for each module the page imports directly or indirectly,
+# plus the total; parsed from -X importtime's "self | cumulative | name" lines after the marker
+def measure(path):
+    code = f"import sys, streamlit\nprint({MARKER!r}, file=sys.stderr, flush=True)\n{top_level_imports(path)}"
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", code], cwd=ROOT, capture_output=True,
+                            text=True, env=dict(os.environ, PYTHONPATH=str(ROOT)))
+    if result.returncode:
+        raise RuntimeError(f"{path.name}: {result.stderr.strip().splitlines()[-1]}")
+    lines = result.stderr.splitlines()
+    modules, total = [], 0
+    for line in lines[lines.index(MARKER) + 1:]:
+        if not line.startswith("import time:"):
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip())) // 2
+        modules.append((int(cumulative), name.strip()))
+        if depth == 0:
+            total += int(cumulative)
+    return total, modules
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Report import time per page on a cold start.")
+    parser.add_argument("--budget-ms", type=float, default=None, help="fail if any page's imports take longer")
+    parser.add_argument("--top", type=int, default=5, help="slowest modules to list per page")
+    parser.add_argument("pages", nargs="*", help="page files (default: Home.py and pages/*.py)")
+    args = parser.parse_args()
+
+    over_budget = []
+    for path in [Path(page).resolve() for page in args.pages] or PAGES:
+        total, modules = measure(path)
+        print(f"{path.relative_to(ROOT)}: {total / 1000:.0f} ms")
+        for cumulative, name in sorted(modules, reverse=True)[:args.top]:
+            print(f"  {cumulative / 1000:8.1f} ms  {name}")
+        if args.budget_ms is not None and total / 1000 > args.budget_ms:
+            over_budget.append(path.name)
+
+    if over_budget:
+        print(f"over the {args.budget_ms:g} ms budget: {', '.join(over_budget)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
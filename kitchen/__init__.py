@@ -0,0 +1 @@
+# Shared helpers used by the Streamlit pages of Leo's Food App
@@ -0,0 +1,97 @@
+# kitchen/auth.py
+# Password hashing for login/register: salted scrypt, run on a bounded worker pool
+import hashlib
+import hmac
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import streamlit as st
+
+# scrypt cost parameters. N=2**14, r=8 needs 16 MiB of memory per hash (128 * N * r bytes).
+# Raising any of them makes new hashes stronger; old hashes are upgraded on the next login.
+SCRYPT_N = 2 ** 14
+SCRYPT_R = 8
+SCRYPT_P = 1
+SCRYPT_MAXMEM = 64 * 1024 * 1024
+SALT_BYTES = 16
+KEY_BYTES = 32
+
+# At most HASH_WORKERS hashes run at once and at most HASH_MAX_PENDING wait for a worker,
+# so a burst of logins queues up here instead of starving the Streamlit script threads
+HASH_WORKERS = 2
+HASH_MAX_PENDING = 32
+HASH_WAIT_SECONDS = 10
+
+
+def _scrypt(password, salt, n, r, p):
+    return hashlib.scrypt(password.encode(), salt=salt, n=n, r=r, p=p, maxmem=SCRYPT_MAXMEM, dklen=KEY_BYTES)
+
+
+# Hash a password as "scrypt$n$r$p$salt$key" (salt and key hex encoded)
+def make_hash(password):
+    salt = os.urandom(SALT_BYTES)
+    key = _scrypt(password, salt, SCRYPT_N, SCRYPT_R, SCRYPT_P)
+    return f"scrypt${SCRYPT_N}${SCRYPT_R}${SCRYPT_P}${salt.hex()}${key.hex()}"
+
+
+# Check a password against a stored hash, comparing in constant time.
+# Returns (matches, needs_rehash); needs_rehash is set for a correct password stored
+# as a legacy unsalted SHA-256 digest or with outdated scrypt parameters.
+def check_hash(password, stored):
+    if stored.startswith("scrypt$"):
+        _, n, r, p, salt, key = stored.split("$")
+        n, r, p = int(n), int(r), int(p)
+        matches = hmac.compare_digest(_scrypt(password, bytes.fromhex(salt), n, r, p), bytes.fromhex(key))
+        return matches, matches and (n, r, p) != (SCRYPT_N, SCRYPT_R, SCRYPT_P)
+
+    legacy = hashlib.sha256(password.encode()).hexdigest()
+    matches = hmac.compare_digest(legacy.encode(), stored.encode())
+    return matches, matches
+
+
+class HashPool:
+    # Bounded thread pool for password hashing. hashlib.scrypt releases the GIL,
+    # so the workers hash in parallel while script threads keep serving reruns.
+    def __init__(self, workers=HASH_WORKERS, max_pending=HASH_MAX_PENDING):
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="password-hash")
+        self._pending = threading.BoundedSemaphore(max_pending)
+
+    # Run func(*args) on the pool and wait for it. Raises TimeoutError when the
+    # pool stays full for longer than `wait` seconds.
+    def run(self, func, *args, wait=HASH_WAIT_SECONDS):
+        if not self._pending.acquire(timeout=wait):
+            raise TimeoutError("Password hashing pool is busy")
+        try:
+            future = self._executor.submit(func, *args)
+        except BaseException:
+            self._pending.release()
+            raise
+        future.add_done_callback(lambda _: self._pending.release())
+        return future.result()
+
+
+@st.cache_resource
+def get_hash_pool():
+    return HashPool()
+
+
+# A well-formed hash to verify against when the user does not exist,
+# so unknown usernames take as long to reject as wrong passwords
+@st.cache_resource
+def _dummy_hash():
+    return make_hash(os.urandom(16).hex())
+
+
+# Hash a new password on the shared pool
+def hash_password(password):
+    return get_hash_pool().run(make_hash, password)
+
+
+# Verify a password on the shared pool; stored=None checks against a dummy hash and fails.
+# Returns (matches, needs_rehash) like check_hash().
+def verify_password(password, stored):
+    if stored is None:
+        get_hash_pool().run(check_hash, password, _dummy_hash())
+        return False, False
+    return get_hash_pool().run(check_hash, password, stored)
@@ -0,0 +1,157 @@
+# kitchen/charts.py
+# Nutrition charts for My Profile and Recipe Detail, cached as built Plotly dicts.
+# Long histories are downsampled on the server so each trace ships at most MAX_POINTS points.
+# NumPy, pandas and Plotly are imported where they are used, so a page only loads them when a
+# chart is actually built (cached charts never need them).
+from datetime import date, timedelta
+
+import streamlit as st
+
+from kitchen import db, meal_log
+
+MAX_POINTS = 120
+
+# Date ranges offered on the profile, as days back from today (None = since the first log)
+DATE_RANGES = {
+    "Last 7 Days": 7,
+    "Last 30 Days": 30,
+    "Last 90 Days": 90,
+    "Last Year": 365,
+    "All Time": None,
+}
+
+
+# Largest-Triangle-Three-Buckets: indices of `threshold` points that keep the line's shape.
+# The first and last points are always kept; every bucket in between contributes the point
+# forming the largest triangle with the previous pick and the next bucket's average.
+def lttb_indices(x, y, threshold):
+    import numpy as np
+
+    n = len(y)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+
+    edges = np.linspace(1, n - 1, threshold - 1).astype(np.intp)
+    selected = np.empty(threshold, dtype=np.intp)
+    selected[0], selected[-1] = 0, n - 1
+    previous = 0
+    for bucket in range(threshold - 2):
+        start, end = edges[bucket], edges[bucket + 1]
+        if bucket + 2 < len(edges):
+            next_end = edges[bucket + 2]
+            next_x, next_y = x[end:next_end].mean(), y[end:next_end].mean()
+        else:
+            next_x, next_y = x[-1], y[-1]
+        area = np.abs((x[previous] - next_x) * (y[start:end] - y[previous])
+                      - (x[previous] - x[start:end]) * (next_y - y[previous]))
+        previous = start + int(np.argmax(area))
+        selected[bucket + 1] = previous
+    return selected
+
+
+# Average of consecutive, equal-sized runs of rows: at most `buckets` rows, each labelled
+# with its first index value. Returns the frame unchanged when it already fits.
+def bucket_means(frame, buckets):
+    import numpy as np
+    import pandas as pd
+
+    n = len(frame)
+    if n <= buckets:
+        return frame, 1
+    size = -(-n // buckets)
+    starts = np.arange(0, n, size)
+    counts = np.diff(np.append(starts, n))
+    sums = np.add.reduceat(frame.to_numpy(dtype=np.float64), starts, axis=0)
+    return pd.DataFrame(sums / counts[:, None], index=frame.index[starts], columns=frame.columns), size
+
+
+# First and last day shown for a range label
+def range_bounds(conn, user_id, range_label, today):
+    days_back = DATE_RANGES[range_label]
+    if days_back is None:
+        start = meal_log.first_logged_day(conn, user_id) or today
+    else:
+        start = today - timedelta(days=days_back - 1)
+    return start, today
+
+
+# Macro trend line and calorie bars for [start, end], as Plotly figure dicts.
+# `version` is the user's meal-log version: it only keys the cache, so new entries miss it.
+@st.cache_data(ttl=60 * 60, max_entries=500, show_spinner=False)
+def nutrition_figures(user_id, start, end, range_label, version, max_points=MAX_POINTS):
+    import pandas as pd
+    import plotly.express as px
+
+    with db.connection() as conn:
+        daily = meal_log.daily_totals(conn, user_id, date.fromisoformat(start), date.fromisoformat(end))
+
+    # Line chart: LTTB per macro, so peaks and dips survive the cut
+    x = daily.index.asi8
+    traces = []
+    for macro in ["protein", "carbs", "fat"]:
+        keep = lttb_indices(x, daily[macro].to_numpy(), max_points)
+        traces.append(pd.DataFrame({"Date": daily.index[keep], "Grams": daily[macro].to_numpy()[keep],
+                                    "Nutrient": macro.title()}))
+    fig = px.line(pd.concat(traces), x="Date", y="Grams", color="Nutrient",
+                  title=f"Daily Macro Nutrients ({range_label})")
+
+    # Bar chart: bars are averaged over equal runs of days once there are too many to draw
+    calories, days_per_bar = bucket_means(daily[["calories"]], max_points)
+    title = f"Daily Calorie Intake ({range_label})"
+    if days_per_bar > 1:
+        title = f"Average Daily Calories per {days_per_bar} Days ({range_label})"
+    fig2 = px.bar(calories.rename_axis("Date").reset_index(), x="Date", y="calories",
+                  labels={"calories": "Calories"}, title=title)
+    return fig.to_dict(), fig2.to_dict()
+
+
+MACRO_NAMES = ["Protein", "Carbs", "Fat"]
+MACRO_COLORS = ["#1f77b4", "#ff7f0e", "#2ca02c"]
+CALORIES_PER_GRAM = (4, 4, 9)
+
+
+# Grams and calories per macro; both recipe charts are drawn from this one split
+def macro_split(protein, carbs, fat):
+    import numpy as np
+
+    grams = np.array([protein, carbs, fat], dtype=np.float64)
+    return {"Macronutrient Distribution (grams)": grams, "Calorie Distribution": grams * CALORIES_PER_GRAM}
+
+
+# The two Recipe Detail pies as Plotly figure dicts, built once per recipe and macro values
+@st.cache_data(max_entries=1000, show_spinner=False)
+def macro_pies(recipe_id, protein, carbs, fat):
+    import plotly.graph_objects as go
+
+    figures = []
+    for title, values in macro_split(protein, carbs, fat).items():
+        fig = go.Figure(go.Pie(labels=MACRO_NAMES, values=values, sort=False, marker_colors=MACRO_COLORS))
+        fig.update_layout(title=title)
+        figures.append(fig.to_dict())
+    return figures
+
+
+# Low-bandwidth alternative to the pies: one inline SVG with a stacked bar per split
+@st.cache_data(max_entries=1000, show_spinner=False)
+def macro_bars_svg(recipe_id, protein, carbs, fat):
+    import numpy as np
+
+    rows = []
+    for row, (title, values) in enumerate(macro_split(protein, carbs, fat).items()):
+        total = values.sum()
+        shares = values / total if total else np.zeros_like(values)
+        y = row * 52
+        rows.append(f'<text x="0" y="{y + 14}" font-size="13" fill="currentColor">{title}</text>')
+        x = 0.0
+        for name, color, share in zip(MACRO_NAMES, MACRO_COLORS, shares):
+            width = share * 100
+            rows.append(f'<rect x="{x:.2f}%" y="{y + 20}" width="{width:.2f}%" height="24" fill="{color}">'
+                        f'<title>{name}: {share:.0%}</title></rect>')
+            if share >= 0.12:
+                rows.append(f'<text x="{x + width / 2:.2f}%" y="{y + 37}" font-size="12" fill="white" '
+                            f'text-anchor="middle">{name} {share:.0%}</text>')
+            x += width
+    return (f'<svg xmlns="http://www.w3.org/2000/svg" width="100%" height="96" '
+            f'role="img" aria-label="Macro breakdown">{"".join(rows)}</svg>')
@@ -0,0 +1,154 @@
+# kitchen/chat.py
+# Conversation state for the Leo chat bot. Each turn sends the system prompt, a running summary of
+# older turns and as many recent turns as fit in a token budget, so requests stop growing with the
+# length of the chat. Turns that fall out of the window are folded into the summary a batch at a time.
+# The OpenAI client is passed in, so anything with the same chat.completions.create() works.
+import math
+import re
+
+import streamlit as st
+
+from kitchen import chat_cache
+
+MODEL = "gpt-4o"
+SUMMARY_MODEL = "gpt-4o-mini"
+
+SYSTEM_PROMPT = (
+    "You are Leo, the friendly assistant of a healthy-recipe app. Help with recipes, meal ideas, "
+    "cooking questions and nutrition. Keep answers practical and concise."
+)
+
+# Tokens of conversation (summary + recent turns) sent with each request
+CONTEXT_TOKEN_BUDGET = 3000
+# After folding, recent turns fill at most this share of the budget, so the summary is
+# updated every few turns rather than on every turn once a chat is long
+KEEP_AFTER_FOLD = 0.6
+SUMMARY_MAX_TOKENS = 400
+# Chat-format overhead per message (role and separators)
+MESSAGE_OVERHEAD_TOKENS = 4
+
+SUMMARY_PROMPT = (
+    "You maintain a running summary of a conversation between a user and Leo, a recipe and nutrition "
+    "assistant. Update the summary with the new messages. Keep the user's goals, dietary preferences, "
+    "allergies, numbers and any recipes already suggested; drop small talk. Reply with the summary only, "
+    f"in under {SUMMARY_MAX_TOKENS * 3 // 4} words."
+)
+
+_PIECES = re.compile(r"\w+|[^\w\s]")
+
+
+# Close estimate of the tokenizer's count without loading it: GPT tokenizers use about one token
+# per short word, one per 4 characters of longer words and one per punctuation mark
+def count_tokens(text):
+    return sum(math.ceil(len(piece) / 4) for piece in _PIECES.findall(text or ""))
+
+
+def message_tokens(message):
+    return count_tokens(message["content"]) + MESSAGE_OVERHEAD_TOKENS
+
+
+def _transcript(messages):
+    return "\n".join(f"{message['role']}: {message['content']}" for message in messages)
+
+
+class Conversation:
+    # The model's view of a chat: the summary of everything up to message summarized_id, and the
+    # messages after it as {"id", "role", "content"} dicts. Folded messages are dropped from memory;
+    # the full transcript lives in the database (kitchen.chat_history).
+    def __init__(self, messages=None, summary="", summarized_id=None, budget=CONTEXT_TOKEN_BUDGET):
+        self.messages = []
+        self.summary = summary
+        self.summarized_id = summarized_id
+        self.budget = budget
+        self._tokens = []
+        for message in messages or []:
+            self.add(message["role"], message["content"], message["id"])
+
+    # message_id is the stored message's id, if it is stored
+    def add(self, role, content, message_id=None):
+        self.messages.append({"id": message_id, "role": role, "content": content})
+        self._tokens.append(message_tokens(self.messages[-1]))
+
+    def _summary_tokens(self):
+        return count_tokens(self.summary) + MESSAGE_OVERHEAD_TOKENS if self.summary else 0
+
+    # First message index of the newest run of turns fitting in `budget` tokens;
+    # the latest message is always kept, even if it alone is over budget
+    def _window_start(self, budget):
+        start, used = len(self.messages), 0
+        while start > 0:
+            if used + self._tokens[start - 1] > budget and start < len(self.messages):
+                break
+            used += self._tokens[start - 1]
+            start -= 1
+        return start
+
+    # Tokens of conversation the next request would carry
+    def context_tokens(self):
+        return self._summary_tokens() + sum(self._tokens)
+
+    # Fold turns that no longer fit into the summary (one summary request), if needed;
+    # returns whether the summary changed
+    def compact(self, client):
+        if self.context_tokens() <= self.budget:
+            return False
+        keep_budget = int(self.budget * KEEP_AFTER_FOLD) - SUMMARY_MAX_TOKENS - MESSAGE_OVERHEAD_TOKENS
+        start = self._window_start(max(keep_budget, 0))
+        if not start:
+            return False
+        self.summary = summarize(client, self.summary, self.messages[:start])
+        self.summarized_id = self.messages[start - 1]["id"]
+        del self.messages[:start], self._tokens[:start]
+        return True
+
+    # Messages for the next completion: system prompt, summary, then the recent turns.
+    # `extra_system` adds per-turn context (e.g. matching recipes) after the summary.
+    def request_messages(self, extra_system=None):
+        request = [{"role": "system", "content": SYSTEM_PROMPT}]
+        if self.summary:
+            request.append({"role": "system", "content": f"Summary of the earlier conversation:\n{self.summary}"})
+        if extra_system:
+            request.append({"role": "system", "content": extra_system})
+        start = self._window_start(self.budget - self._summary_tokens())
+        request.extend({"role": message["role"], "content": message["content"]} for message in self.messages[start:])
+        return request
+
+    # Compact if needed, then start a streamed reply to the latest user message.
+    # With a cache (kitchen.chat_cache), a repeated request is answered from it and a new
+    # answer is stored once it has streamed in full.
+    def stream_reply(self, client, extra_system=None, model=MODEL, cache=None):
+        self.compact(client)
+        messages = self.request_messages(extra_system)
+        if cache is None:
+            return client.chat.completions.create(model=model, messages=messages, stream=True)
+
+        key = chat_cache.cache_key(model, messages)
+        response = cache.get(key)
+        if response is not None:
+            return chat_cache.replay(response)
+        stream = client.chat.completions.create(model=model, messages=messages, stream=True)
+        return cache.store_stream(key, messages[-1]["content"], stream)
+
+
+# One OpenAI client per process, created on the first question: importing openai alone takes
+# most of a second, which pages shouldn't pay just for showing the chat history
+@st.cache_resource
+def get_client():
+    from openai import OpenAI
+
+    return OpenAI(api_key=st.secrets["OPENAI_API_KEY"])
+
+
+# New summary from the previous one plus the messages leaving the window; only those are sent,
+# so each update costs about the same however long the conversation gets
+def summarize(client, summary, messages):
+    content = f"Current summary:\n{summary or '(none yet)'}\n\nNew messages:\n{_transcript(messages)}"
+    response = client.chat.completions.create(
+        model=SUMMARY_MODEL,
+        messages=[
+            {"role": "system", "content": SUMMARY_PROMPT},
+            {"role": "user", "content": content},
+        ],
+        max_tokens=SUMMARY_MAX_TOKENS
+    )
+    return response.choices[0].message.content.strip()
@@ -0,0 +1,127 @@
+# kitchen/chat_cache.py
+# Answers to repeated chat bot questions, kept in SQLite and shared by all sessions.
+# The key is a hash of the model and the exact request (system prompt, summary, context and recent
+# turns), with user messages normalized, so a hit only happens when Leo would see the same thing.
+# Entries expire after a TTL; above MAX_ENTRIES the least recently used ones are evicted.
+import hashlib
+import json
+import re
+import threading
+import time
+
+import streamlit as st
+
+from kitchen import db
+
+TTL_SECONDS = 7 * 24 * 60 * 60
+MAX_ENTRIES = 5000
+# Expired and surplus entries are removed every this many stores
+EVICT_EVERY = 50
+
+_SPACES = re.compile(r"\s+")
+
+
+# "  High protein breakfast ideas?! " -> "high protein breakfast ideas"
+def normalize(text):
+    return _SPACES.sub(" ", text.lower()).strip(" .?!")
+
+
+def cache_key(model, messages):
+    request = [(message["role"], normalize(message["content"]) if message["role"] == "user" else message["content"])
+               for message in messages]
+    return hashlib.sha256(json.dumps([model, request]).encode()).hexdigest()
+
+
+# Stream a cached answer in word-sized chunks, like a live reply
+def replay(text):
+    for chunk in re.findall(r"\S+\s*|\s+", text):
+        yield chunk
+
+
+class ResponseCache:
+    def __init__(self, pool, ttl=TTL_SECONDS, max_entries=MAX_ENTRIES):
+        self.pool = pool
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._stores = 0
+        self._lock = threading.Lock()
+
+    def _count(self, hit):
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    # Cached answer for key, or None; a hit also marks the entry as recently used
+    def get(self, key):
+        now = time.time()
+        with self.pool.connection() as conn:
+            row = conn.execute(
+                """
+                UPDATE chat_cache SET last_used_at = ?, hits = hits + 1
+                WHERE key = ? AND created_at > ?
+                RETURNING response
+                """,
+                (now, key, now - self.ttl)
+            ).fetchone()
+        self._count(row is not None)
+        return row["response"] if row else None
+
+    def put(self, key, prompt, response):
+        now = time.time()
+        with self.pool.connection() as conn:
+            conn.execute(
+                """
+                INSERT INTO chat_cache (key, prompt, response, created_at, last_used_at) VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT (key) DO UPDATE SET
+                    response = excluded.response, created_at = excluded.created_at,
+                    last_used_at = excluded.last_used_at
+                """,
+                (key, prompt, response, now, now)
+            )
+        with self._lock:
+            self._stores += 1
+            evict = self._stores % EVICT_EVERY == 1
+        if evict:
+            self.evict()
+
+    # Drop expired entries, then the least recently used ones beyond max_entries
+    def evict(self):
+        with self.pool.connection() as conn:
+            conn.execute("DELETE FROM chat_cache WHERE created_at <= ?", (time.time() - self.ttl,))
+            conn.execute(
+                """
+                DELETE FROM chat_cache WHERE key IN (
+                    SELECT key FROM chat_cache ORDER BY last_used_at DESC LIMIT -1 OFFSET ?
+                )
+                """,
+                (self.max_entries,)
+            )
+
+    # Pass a live OpenAI stream through as text, storing the answer once it has fully arrived
+    def store_stream(self, key, prompt, stream):
+        chunks = []
+        for chunk in stream:
+            text = chunk.choices[0].delta.content if chunk.choices else None
+            if text:
+                chunks.append(text)
+                yield text
+        if chunks:
+            self.put(key, prompt, "".join(chunks))
+
+    def stats(self):
+        with self.pool.connection() as conn:
+            entries = conn.execute("SELECT COUNT(*) FROM chat_cache").fetchone()[0]
+        with self._lock:
+            hits, misses = self.hits, self.misses
+        return {"hits": hits, "misses": misses, "hit_rate": hits / (hits + misses) if hits + misses else 0.0,
+                "entries": entries}
+
+
+# Process-wide cache; the hit/miss counters cover every session since startup
+@st.cache_resource
+def get_cache():
+    return ResponseCache(db.get_pool())
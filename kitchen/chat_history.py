@@ -0,0 +1,92 @@
+# kitchen/chat_history.py
+# Stored chat bot transcripts. The page shows the newest messages and pages back with keyset
+# queries on (conversation_id, id); the model only needs the summary and the messages after it.
+import hashlib
+import secrets
+
+from kitchen.chat import Conversation
+
+PAGE_SIZE = 20
+
+
+def _token_hash(token):
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+# Start a conversation; returns (id, token), the token going in the page URL
+def create_conversation(conn, user_id=None):
+    token = secrets.token_urlsafe(16)
+    conversation_id = conn.execute(
+        "INSERT INTO conversations (user_id, token_hash) VALUES (?, ?)", (user_id, _token_hash(token))
+    ).lastrowid
+    return conversation_id, token
+
+
+# The conversation to resume: the one in the URL if it is this user's (or anonymous, in which
+# case a signed-in user takes it over), else the user's latest one. None if there is none.
+def resume_conversation(conn, user_id=None, token=None):
+    if token:
+        row = conn.execute("SELECT id, user_id FROM conversations WHERE token_hash = ?",
+                           (_token_hash(token),)).fetchone()
+        if row and row["user_id"] is None and user_id is not None:
+            conn.execute("UPDATE conversations SET user_id = ? WHERE id = ?", (user_id, row["id"]))
+            return row["id"]
+        if row and row["user_id"] == user_id:
+            return row["id"]
+    if user_id is None:
+        return None
+    row = conn.execute(
+        "SELECT id FROM conversations WHERE user_id = ? ORDER BY updated_at DESC, id DESC LIMIT 1", (user_id,)
+    ).fetchone()
+    return row["id"] if row else None
+
+
+def add_message(conn, conversation_id, role, content):
+    message_id = conn.execute(
+        "INSERT INTO chat_messages (conversation_id, role, content) VALUES (?, ?, ?)",
+        (conversation_id, role, content)
+    ).lastrowid
+    conn.execute("UPDATE conversations SET updated_at = datetime('now') WHERE id = ?", (conversation_id,))
+    return message_id
+
+
+def save_summary(conn, conversation_id, summary, summarized_id):
+    conn.execute("UPDATE conversations SET summary = ?, summarized_id = ? WHERE id = ?",
+                 (summary, summarized_id, conversation_id))
+
+
+# The model's state: the stored summary plus the messages it doesn't cover yet
+def load_conversation(conn, conversation_id):
+    row = conn.execute("SELECT summary, summarized_id FROM conversations WHERE id = ?",
+                       (conversation_id,)).fetchone()
+    messages = conn.execute(
+        "SELECT id, role, content FROM chat_messages WHERE conversation_id = ? AND id > ? ORDER BY id",
+        (conversation_id, row["summarized_id"] or 0)
+    ).fetchall()
+    return Conversation([dict(message) for message in messages], row["summary"], row["summarized_id"])
+
+
+# Messages to show, oldest first: everything from message `since_id` on, or the newest `limit`
+def transcript(conn, conversation_id, since_id=None, limit=PAGE_SIZE):
+    if since_id is not None:
+        return conn.execute(
+            "SELECT id, role, content FROM chat_messages WHERE conversation_id = ? AND id >= ? ORDER BY id",
+            (conversation_id, since_id)
+        ).fetchall()
+    rows = conn.execute(
+        "SELECT id, role, content FROM chat_messages WHERE conversation_id = ? ORDER BY id DESC LIMIT ?",
+        (conversation_id, limit)
+    ).fetchall()
+    return rows[::-1]
+
+
+# Id of the oldest message in the page before `before_id`, or None if nothing is older
+def earlier_page_start(conn, conversation_id, before_id, limit=PAGE_SIZE):
+    return conn.execute(
+        """
+        SELECT MIN(id) FROM (
+            SELECT id FROM chat_messages WHERE conversation_id = ? AND id < ? ORDER BY id DESC LIMIT ?
+        )
+        """,
+        (conversation_id, before_id, limit)
+    ).fetchone()[0]
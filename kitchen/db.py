@@ -0,0 +1,523 @@
+# kitchen/db.py
+# Shared data-access layer: one pooled set of SQLite connections per process
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+import streamlit as st
+
+from kitchen.sample_data import seed_sample_recipes
+
+DB_PATH = "food_app.db"
+POOL_SIZE = 8
+BUSY_TIMEOUT_MS = 5000
+STATEMENT_CACHE_SIZE = 256
+
+# Schema migrations, applied in order exactly once per database.
+# The number of applied migrations is tracked in PRAGMA user_version.
+# Each entry is either an SQL script or a callable taking the connection.
+MIGRATIONS = [
+    # 1: users
+    """
+    CREATE TABLE IF NOT EXISTS users (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        username TEXT UNIQUE NOT NULL,
+        email TEXT UNIQUE NOT NULL,
+        password_hash TEXT NOT NULL,
+        full_name TEXT,
+        bio TEXT,
+        profile_pic TEXT,
+        date_joined TEXT,
+        is_premium BOOLEAN DEFAULT 0
+    );
+    """,
+    # 2: recipes and the tables hanging off them
+    """
+    CREATE TABLE recipes (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        user_id INTEGER REFERENCES users(id) ON DELETE SET NULL,
+        author TEXT NOT NULL,
+        name TEXT NOT NULL,
+        description TEXT,
+        category TEXT NOT NULL,
+        image TEXT,
+        recipe_url TEXT,
+        instructions TEXT,
+        prep_time TEXT,
+        cook_time TEXT,
+        servings INTEGER DEFAULT 1,
+        protein INTEGER NOT NULL DEFAULT 0,
+        carbs INTEGER NOT NULL DEFAULT 0,
+        fat INTEGER NOT NULL DEFAULT 0,
+        calories INTEGER NOT NULL DEFAULT 0,
+        fiber INTEGER DEFAULT 0,
+        sugar INTEGER DEFAULT 0,
+        sodium INTEGER DEFAULT 0,
+        cholesterol INTEGER DEFAULT 0,
+        saturated_fat INTEGER DEFAULT 0,
+        trans_fat INTEGER DEFAULT 0,
+        rating_sum INTEGER NOT NULL DEFAULT 0,
+        rating_count INTEGER NOT NULL DEFAULT 0,
+        save_count INTEGER NOT NULL DEFAULT 0,
+        created_at TEXT NOT NULL DEFAULT (datetime('now'))
+    );
+
+    CREATE TABLE ingredients (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        recipe_id INTEGER NOT NULL REFERENCES recipes(id) ON DELETE CASCADE,
+        position INTEGER NOT NULL,
+        line TEXT NOT NULL
+    );
+    CREATE INDEX idx_ingredients_recipe ON ingredients (recipe_id, position);
+
+    CREATE TABLE tags (
+        recipe_id INTEGER NOT NULL REFERENCES recipes(id) ON DELETE CASCADE,
+        tag TEXT NOT NULL,
+        PRIMARY KEY (recipe_id, tag)
+    ) WITHOUT ROWID;
+    CREATE INDEX idx_tags_tag ON tags (tag, recipe_id);
+
+    CREATE TABLE ratings (
+        user_id INTEGER NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+        recipe_id INTEGER NOT NULL REFERENCES recipes(id) ON DELETE CASCADE,
+        stars INTEGER NOT NULL CHECK (stars BETWEEN 1 AND 5),
+        created_at TEXT NOT NULL DEFAULT (datetime('now')),
+        PRIMARY KEY (user_id, recipe_id)
+    ) WITHOUT ROWID;
+    CREATE INDEX idx_ratings_recipe ON ratings (recipe_id);
+
+    CREATE TABLE saves (
+        user_id INTEGER NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+        recipe_id INTEGER NOT NULL REFERENCES recipes(id) ON DELETE CASCADE,
+        created_at TEXT NOT NULL DEFAULT (datetime('now')),
+        PRIMARY KEY (user_id, recipe_id)
+    ) WITHOUT ROWID;
+    CREATE INDEX idx_saves_recipe ON saves (recipe_id);
+    CREATE INDEX idx_saves_user_newest ON saves (user_id, created_at DESC);
+
+    -- One index per Home feed sort mode, with and without the category filter.
+    -- id is the tie-breaker so every ordering is total.
+    CREATE INDEX idx_recipes_newest ON recipes (created_at DESC, id DESC);
+    CREATE INDEX idx_recipes_category_newest ON recipes (category, created_at DESC, id DESC);
+    CREATE INDEX idx_recipes_popular ON recipes (rating_count DESC, id DESC);
+    CREATE INDEX idx_recipes_category_popular ON recipes (category, rating_count DESC, id DESC);
+    CREATE INDEX idx_recipes_protein ON recipes (protein DESC, id DESC);
+    CREATE INDEX idx_recipes_category_protein ON recipes (category, protein DESC, id DESC);
+    CREATE INDEX idx_recipes_calories ON recipes (calories, id);
+    CREATE INDEX idx_recipes_category_calories ON recipes (category, calories, id);
+
+    -- Keep the denormalized rating and save counters on recipes in step
+    CREATE TRIGGER ratings_after_insert AFTER INSERT ON ratings BEGIN
+        UPDATE recipes SET rating_sum = rating_sum + NEW.stars, rating_count = rating_count + 1
+        WHERE id = NEW.recipe_id;
+    END;
+    CREATE TRIGGER ratings_after_update AFTER UPDATE OF stars ON ratings BEGIN
+        UPDATE recipes SET rating_sum = rating_sum - OLD.stars + NEW.stars WHERE id = NEW.recipe_id;
+    END;
+    CREATE TRIGGER ratings_after_delete AFTER DELETE ON ratings BEGIN
+        UPDATE recipes SET rating_sum = rating_sum - OLD.stars, rating_count = rating_count - 1
+        WHERE id = OLD.recipe_id;
+    END;
+    CREATE TRIGGER saves_after_insert AFTER INSERT ON saves BEGIN
+        UPDATE recipes SET save_count = save_count + 1 WHERE id = NEW.recipe_id;
+    END;
+    CREATE TRIGGER saves_after_delete AFTER DELETE ON saves BEGIN
+        UPDATE recipes SET save_count = save_count - 1 WHERE id = OLD.recipe_id;
+    END;
+    """,
+    # 3: starter catalog
+    seed_sample_recipes,
+    # 4: full-text search over name, description, ingredients and tags.
+    # The rowid of recipes_fts is the recipe id; triggers keep it in sync.
+    """
+    CREATE VIRTUAL TABLE recipes_fts USING fts5(
+        name, description, ingredients, tags,
+        tokenize = 'porter unicode61 remove_diacritics 2',
+        prefix = '2 3 4'
+    );
+    -- Rank by BM25 with the name weighted highest
+    INSERT INTO recipes_fts (recipes_fts, rank) VALUES ('rank', 'bm25(10.0, 2.0, 4.0, 5.0)');
+
+    INSERT INTO recipes_fts (rowid, name, description, ingredients, tags)
+    SELECT id, name, description,
+           (SELECT group_concat(line, ' ') FROM ingredients WHERE recipe_id = recipes.id),
+           (SELECT group_concat(tag, ' ') FROM tags WHERE recipe_id = recipes.id)
+    FROM recipes;
+
+    CREATE TRIGGER recipes_fts_after_insert AFTER INSERT ON recipes BEGIN
+        INSERT INTO recipes_fts (rowid, name, description) VALUES (NEW.id, NEW.name, NEW.description);
+    END;
+    CREATE TRIGGER recipes_fts_after_update AFTER UPDATE OF name, description ON recipes BEGIN
+        UPDATE recipes_fts SET name = NEW.name, description = NEW.description WHERE rowid = NEW.id;
+    END;
+    CREATE TRIGGER recipes_fts_after_delete AFTER DELETE ON recipes BEGIN
+        DELETE FROM recipes_fts WHERE rowid = OLD.id;
+    END;
+
+    CREATE TRIGGER ingredients_fts_after_insert AFTER INSERT ON ingredients BEGIN
+        UPDATE recipes_fts SET ingredients = (SELECT group_concat(line, ' ') FROM ingredients
+                                              WHERE recipe_id = NEW.recipe_id)
+        WHERE rowid = NEW.recipe_id;
+    END;
+    CREATE TRIGGER ingredients_fts_after_update AFTER UPDATE OF line ON ingredients BEGIN
+        UPDATE recipes_fts SET ingredients = (SELECT group_concat(line, ' ') FROM ingredients
+                                              WHERE recipe_id = NEW.recipe_id)
+        WHERE rowid = NEW.recipe_id;
+    END;
+    CREATE TRIGGER ingredients_fts_after_delete AFTER DELETE ON ingredients BEGIN
+        UPDATE recipes_fts SET ingredients = (SELECT group_concat(line, ' ') FROM ingredients
+                                              WHERE recipe_id = OLD.recipe_id)
+        WHERE rowid = OLD.recipe_id;
+    END;
+
+    CREATE TRIGGER tags_fts_after_insert AFTER INSERT ON tags BEGIN
+        UPDATE recipes_fts SET tags = (SELECT group_concat(tag, ' ') FROM tags WHERE recipe_id = NEW.recipe_id)
+        WHERE rowid = NEW.recipe_id;
+    END;
+    CREATE TRIGGER tags_fts_after_delete AFTER DELETE ON tags BEGIN
+        UPDATE recipes_fts SET tags = (SELECT group_concat(tag, ' ') FROM tags WHERE recipe_id = OLD.recipe_id)
+        WHERE rowid = OLD.recipe_id;
+    END;
+    """,
+    # 5: persistent "Remember me" sessions; only a SHA-256 of the cookie token is stored
+    """
+    CREATE TABLE sessions (
+        token_hash TEXT PRIMARY KEY,
+        user_id INTEGER NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+        created_at TEXT NOT NULL DEFAULT (datetime('now')),
+        expires_at TEXT NOT NULL
+    ) WITHOUT ROWID;
+    CREATE INDEX idx_sessions_expires ON sessions (expires_at);
+    CREATE INDEX idx_sessions_user ON sessions (user_id);
+    """,
+    # 6: login rate-limit state, so throttling and lockouts survive restarts
+    """
+    CREATE TABLE login_throttle (
+        key TEXT PRIMARY KEY,
+        tokens REAL NOT NULL,
+        updated_at REAL NOT NULL,
+        window_start REAL NOT NULL,
+        failures INTEGER NOT NULL,
+        previous_failures INTEGER NOT NULL,
+        locked_until REAL NOT NULL
+    ) WITHOUT ROWID;
+    """,
+    # 7: likes, comments and per-user activity counters.
+    # user_stats is maintained by triggers so dashboards read one row instead of COUNT(*)s.
+    """
+    CREATE TABLE likes (
+        user_id INTEGER NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+        recipe_id INTEGER NOT NULL REFERENCES recipes(id) ON DELETE CASCADE,
+        created_at TEXT NOT NULL DEFAULT (datetime('now')),
+        PRIMARY KEY (user_id, recipe_id)
+    ) WITHOUT ROWID;
+    CREATE INDEX idx_likes_recipe ON likes (recipe_id);
+
+    CREATE TABLE comments (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        recipe_id INTEGER NOT NULL REFERENCES recipes(id) ON DELETE CASCADE,
+        user_id INTEGER NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+        body TEXT NOT NULL,
+        created_at TEXT NOT NULL DEFAULT (datetime('now'))
+    );
+    CREATE INDEX idx_comments_recipe ON comments (recipe_id, created_at DESC);
+    CREATE INDEX idx_comments_user ON comments (user_id);
+
+    ALTER TABLE recipes ADD COLUMN like_count INTEGER NOT NULL DEFAULT 0;
+    ALTER TABLE recipes ADD COLUMN comment_count INTEGER NOT NULL DEFAULT 0;
+    CREATE INDEX idx_recipes_user ON recipes (user_id, created_at DESC);
+
+    CREATE TABLE user_stats (
+        user_id INTEGER PRIMARY KEY REFERENCES users(id) ON DELETE CASCADE,
+        recipes_shared INTEGER NOT NULL DEFAULT 0,
+        saved_recipes INTEGER NOT NULL DEFAULT 0,
+        total_likes INTEGER NOT NULL DEFAULT 0,  -- likes received on the user's recipes
+        comments INTEGER NOT NULL DEFAULT 0      -- comments the user has written
+    );
+    INSERT INTO user_stats (user_id, recipes_shared, saved_recipes)
+    SELECT id,
+           (SELECT COUNT(*) FROM recipes WHERE recipes.user_id = users.id),
+           (SELECT COUNT(*) FROM saves WHERE saves.user_id = users.id)
+    FROM users;
+
+    CREATE TRIGGER users_stats_after_insert AFTER INSERT ON users BEGIN
+        INSERT INTO user_stats (user_id) VALUES (NEW.id);
+    END;
+
+    CREATE TRIGGER recipes_stats_after_insert AFTER INSERT ON recipes WHEN NEW.user_id IS NOT NULL BEGIN
+        UPDATE user_stats SET recipes_shared = recipes_shared + 1 WHERE user_id = NEW.user_id;
+    END;
+    -- Cascaded likes are deleted after the recipe row is gone, so the author's
+    -- like total is corrected here from the recipe's own counter
+    CREATE TRIGGER recipes_stats_after_delete AFTER DELETE ON recipes WHEN OLD.user_id IS NOT NULL BEGIN
+        UPDATE user_stats SET recipes_shared = recipes_shared - 1, total_likes = total_likes - OLD.like_count
+        WHERE user_id = OLD.user_id;
+    END;
+
+    CREATE TRIGGER saves_stats_after_insert AFTER INSERT ON saves BEGIN
+        UPDATE user_stats SET saved_recipes = saved_recipes + 1 WHERE user_id = NEW.user_id;
+    END;
+    CREATE TRIGGER saves_stats_after_delete AFTER DELETE ON saves BEGIN
+        UPDATE user_stats SET saved_recipes = saved_recipes - 1 WHERE user_id = OLD.user_id;
+    END;
+
+    CREATE TRIGGER likes_after_insert AFTER INSERT ON likes BEGIN
+        UPDATE recipes SET like_count = like_count + 1 WHERE id = NEW.recipe_id;
+        UPDATE user_stats SET total_likes = total_likes + 1
+        WHERE user_id = (SELECT user_id FROM recipes WHERE id = NEW.recipe_id);
+    END;
+    CREATE TRIGGER likes_after_delete AFTER DELETE ON likes BEGIN
+        UPDATE recipes SET like_count = like_count - 1 WHERE id = OLD.recipe_id;
+        UPDATE user_stats SET total_likes = total_likes - 1
+        WHERE user_id = (SELECT user_id FROM recipes WHERE id = OLD.recipe_id);
+    END;
+
+    CREATE TRIGGER comments_after_insert AFTER INSERT ON comments BEGIN
+        UPDATE recipes SET comment_count = comment_count + 1 WHERE id = NEW.recipe_id;
+        UPDATE user_stats SET comments = comments + 1 WHERE user_id = NEW.user_id;
+    END;
+    CREATE TRIGGER comments_after_delete AFTER DELETE ON comments BEGIN
+        UPDATE recipes SET comment_count = comment_count - 1 WHERE id = OLD.recipe_id;
+        UPDATE user_stats SET comments = comments - 1 WHERE user_id = OLD.user_id;
+    END;
+    """,
+    # 8: nutrition log with day/week/month rollups.
+    # Triggers fold each entry into its three rollup rows so charts never scan the raw log;
+    # weeks start on Monday and `days` counts the logged days inside a week or month.
+    """
+    CREATE TABLE meal_log (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        user_id INTEGER NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+        logged_at TEXT NOT NULL,
+        recipe_id INTEGER REFERENCES recipes(id) ON DELETE SET NULL,
+        portion REAL NOT NULL DEFAULT 1,
+        protein REAL NOT NULL DEFAULT 0,
+        carbs REAL NOT NULL DEFAULT 0,
+        fat REAL NOT NULL DEFAULT 0,
+        calories REAL NOT NULL DEFAULT 0
+    );
+    CREATE INDEX idx_meal_log_user ON meal_log (user_id, logged_at);
+
+    CREATE TABLE nutrition_rollups (
+        user_id INTEGER NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+        period TEXT NOT NULL CHECK (period IN ('day', 'week', 'month')),
+        period_start TEXT NOT NULL,
+        entries INTEGER NOT NULL DEFAULT 0,
+        days INTEGER NOT NULL DEFAULT 0,
+        protein REAL NOT NULL DEFAULT 0,
+        carbs REAL NOT NULL DEFAULT 0,
+        fat REAL NOT NULL DEFAULT 0,
+        calories REAL NOT NULL DEFAULT 0,
+        PRIMARY KEY (user_id, period, period_start)
+    ) WITHOUT ROWID;
+
+    CREATE TRIGGER meal_log_after_insert AFTER INSERT ON meal_log BEGIN
+        INSERT INTO nutrition_rollups (user_id, period, period_start, entries, days, protein, carbs, fat, calories)
+        VALUES (NEW.user_id, 'day', date(NEW.logged_at), 1, 1, NEW.protein, NEW.carbs, NEW.fat, NEW.calories)
+        ON CONFLICT (user_id, period, period_start) DO UPDATE SET
+            entries = entries + 1, protein = protein + excluded.protein, carbs = carbs + excluded.carbs,
+            fat = fat + excluded.fat, calories = calories + excluded.calories;
+        INSERT INTO nutrition_rollups (user_id, period, period_start, entries, days, protein, carbs, fat, calories)
+        SELECT NEW.user_id, period, period_start, 1,
+               (SELECT entries = 1 FROM nutrition_rollups
+                WHERE user_id = NEW.user_id AND period = 'day' AND period_start = date(NEW.logged_at)),
+               NEW.protein, NEW.carbs, NEW.fat, NEW.calories
+        FROM (SELECT 'week' AS period, date(NEW.logged_at, '-6 days', 'weekday 1') AS period_start
+              UNION ALL SELECT 'month', date(NEW.logged_at, 'start of month'))
+        WHERE true
+        ON CONFLICT (user_id, period, period_start) DO UPDATE SET
+            entries = entries + 1, days = days + excluded.days, protein = protein + excluded.protein,
+            carbs = carbs + excluded.carbs, fat = fat + excluded.fat, calories = calories + excluded.calories;
+    END;
+
+    CREATE TRIGGER meal_log_after_delete AFTER DELETE ON meal_log BEGIN
+        UPDATE nutrition_rollups SET
+            entries = entries - 1,
+            days = days - (SELECT entries = 1 FROM nutrition_rollups
+                           WHERE user_id = OLD.user_id AND period = 'day' AND period_start = date(OLD.logged_at)),
+            protein = protein - OLD.protein, carbs = carbs - OLD.carbs,
+            fat = fat - OLD.fat, calories = calories - OLD.calories
+        WHERE user_id = OLD.user_id AND (period, period_start) IN (
+            VALUES ('week', date(OLD.logged_at, '-6 days', 'weekday 1')),
+                   ('month', date(OLD.logged_at, 'start of month')));
+        UPDATE nutrition_rollups SET
+            entries = entries - 1, protein = protein - OLD.protein, carbs = carbs - OLD.carbs,
+            fat = fat - OLD.fat, calories = calories - OLD.calories
+        WHERE user_id = OLD.user_id AND period = 'day' AND period_start = date(OLD.logged_at);
+        DELETE FROM nutrition_rollups WHERE user_id = OLD.user_id AND entries = 0 AND (period, period_start) IN (
+            VALUES ('day', date(OLD.logged_at)),
+                   ('week', date(OLD.logged_at, '-6 days', 'weekday 1')),
+                   ('month', date(OLD.logged_at, 'start of month')));
+    END;
+    """,
+    # 9: per-user nutrition log version, bumped on every log change; it keys the cached charts
+    """
+    ALTER TABLE user_stats ADD COLUMN meal_log_version INTEGER NOT NULL DEFAULT 0;
+
+    CREATE TRIGGER meal_log_version_after_insert AFTER INSERT ON meal_log BEGIN
+        UPDATE user_stats SET meal_log_version = meal_log_version + 1 WHERE user_id = NEW.user_id;
+    END;
+    CREATE TRIGGER meal_log_version_after_delete AFTER DELETE ON meal_log BEGIN
+        UPDATE user_stats SET meal_log_version = meal_log_version + 1 WHERE user_id = OLD.user_id;
+    END;
+    """,
+    # 10: background jobs, and a publish status so recipes stay out of the feed until processed
+    """
+    ALTER TABLE recipes ADD COLUMN status TEXT NOT NULL DEFAULT 'published'
+        CHECK (status IN ('processing', 'published'));
+
+    CREATE TABLE jobs (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        kind TEXT NOT NULL,
+        payload TEXT NOT NULL,                 -- JSON arguments for the handler
+        status TEXT NOT NULL DEFAULT 'queued' CHECK (status IN ('queued', 'running', 'done', 'failed')),
+        attempts INTEGER NOT NULL DEFAULT 0,
+        run_after REAL NOT NULL,               -- unix time; retries are pushed back with a backoff
+        last_error TEXT,
+        created_at TEXT NOT NULL DEFAULT (datetime('now')),
+        updated_at TEXT NOT NULL DEFAULT (datetime('now'))
+    );
+    CREATE INDEX idx_jobs_ready ON jobs (status, run_after);
+    """,
+    # 11: cached chat bot answers, keyed by a hash of the model and the request messages
+    """
+    CREATE TABLE chat_cache (
+        key TEXT PRIMARY KEY,
+        prompt TEXT NOT NULL,
+        response TEXT NOT NULL,
+        created_at REAL NOT NULL,              -- unix time; entries expire after a TTL
+        last_used_at REAL NOT NULL,            -- least recently used entries are evicted first
+        hits INTEGER NOT NULL DEFAULT 0
+    ) WITHOUT ROWID;
+    CREATE INDEX idx_chat_cache_last_used ON chat_cache (last_used_at);
+    """,
+    # 12: stored chat bot conversations. Signed-in users resume their latest one; anonymous chats are
+    # found again through a random token kept in the page URL (stored hashed, like session tokens).
+    """
+    CREATE TABLE conversations (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        user_id INTEGER REFERENCES users(id) ON DELETE CASCADE,
+        token_hash TEXT NOT NULL UNIQUE,
+        summary TEXT NOT NULL DEFAULT '',      -- running summary of the messages up to summarized_id
+        summarized_id INTEGER,
+        created_at TEXT NOT NULL DEFAULT (datetime('now')),
+        updated_at TEXT NOT NULL DEFAULT (datetime('now'))
+    );
+    CREATE INDEX idx_conversations_user ON conversations (user_id, updated_at);
+
+    CREATE TABLE chat_messages (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        conversation_id INTEGER NOT NULL REFERENCES conversations(id) ON DELETE CASCADE,
+        role TEXT NOT NULL CHECK (role IN ('user', 'assistant')),
+        content TEXT NOT NULL,
+        created_at TEXT NOT NULL DEFAULT (datetime('now'))
+    );
+    CREATE INDEX idx_chat_messages_conversation ON chat_messages (conversation_id, id);
+    """,
+]
+
+
+# Open a new connection with the settings every pooled connection shares
+def connect(path=DB_PATH):
+    conn = sqlite3.connect(path, check_same_thread=False, timeout=BUSY_TIMEOUT_MS / 1000,
+                           cached_statements=STATEMENT_CACHE_SIZE)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode = WAL")
+    conn.execute("PRAGMA synchronous = NORMAL")
+    conn.execute("PRAGMA foreign_keys = ON")
+    conn.execute(f"PRAGMA busy_timeout = {BUSY_TIMEOUT_MS}")
+    return conn
+
+
+# Bring the schema up to date, running only the migrations not applied yet
+def migrate(conn):
+    version = conn.execute("PRAGMA user_version").fetchone()[0]
+    for number, step in enumerate(MIGRATIONS[version:], start=version + 1):
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            if callable(step):
+                step(conn)
+            else:
+                for statement in _split_script(step):
+                    conn.execute(statement)
+            conn.execute(f"PRAGMA user_version = {number}")
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+
+
+# executescript() commits on its own, so scripts are run statement by statement
+# to keep each migration inside a single transaction
+def _split_script(script):
+    statement = ""
+    for line in script.splitlines(keepends=True):
+        statement += line
+        if sqlite3.complete_statement(statement):
+            if statement.strip():
+                yield statement
+            statement = ""
+    if statement.strip():
+        yield statement
+
+
+class ConnectionPool:
+    # A bounded pool of connections; each one is only ever used by one thread at a time
+    def __init__(self, path=DB_PATH, size=POOL_SIZE):
+        self.path = path
+        self.size = size
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(size)
+
+    def _acquire(self):
+        self._slots.acquire()
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            try:
+                return connect(self.path)
+            except BaseException:
+                self._slots.release()
+                raise
+
+    def _release(self, conn):
+        self._idle.put(conn)
+        self._slots.release()
+
+    # Borrow a connection; commits on success and rolls back on any error
+    @contextmanager
+    def connection(self):
+        conn = self._acquire()
+        try:
+            yield conn
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+        finally:
+            self._release(conn)
+
+    def migrate(self):
+        with self.connection() as conn:
+            migrate(conn)
+
+    def close(self):
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                break
+
+
+# Process-wide pool, created (and the schema migrated) once at startup
+@st.cache_resource
+def get_pool():
+    pool = ConnectionPool(DB_PATH)
+    pool.migrate()
+    return pool
+
+
+# Shortcut used by the pages: `with db.connection() as conn: ...`
+def connection():
+    return get_pool().connection()
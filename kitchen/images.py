@@ -0,0 +1,135 @@
+# kitchen/images.py
+# Uploaded meal photos: decoded once, EXIF-stripped, downscaled to the sizes the pages show and
+# stored as WebP in a content-addressed folder (media/<first 2 hex>/<sha256>-<size>.webp).
+# recipes.image holds the sha256 for uploads; older rows keep a plain URL.
+# Pillow is imported by the functions that decode, so pages that only call image_url don't load it.
+import contextlib
+import hashlib
+import io
+import os
+import re
+import threading
+
+from kitchen.sample_data import PLACEHOLDER_IMAGE
+
+MEDIA_DIR = "media"
+
+# Longest edge in pixels per rendition; the thumb is a square crop for "You might also like"
+SIZES = {"card": 600, "detail": 1200, "thumb": 150}
+SQUARE_SIZES = {"thumb"}
+WEBP_QUALITY = 80
+
+# Refuse to decode anything bigger than this (about a 50 MP photo)
+MAX_PIXELS = 50_000_000
+
+_DIGEST = re.compile(r"^[0-9a-f]{64}$")
+
+
+def _path(digest, size):
+    return os.path.join(MEDIA_DIR, digest[:2], f"{digest}-{size}.webp")
+
+
+def _upload_path(digest):
+    return os.path.join(MEDIA_DIR, "uploads", digest)
+
+
+def _has_renditions(digest):
+    return all(os.path.exists(_path(digest, size)) for size in SIZES)
+
+
+def _write_atomically(path, write):
+    temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    write(temp_path)
+    os.replace(temp_path, path)
+
+
+# What st.image should load for a stored recipes.image value at one of SIZES
+def image_url(value, size="card"):
+    if not value:
+        return PLACEHOLDER_IMAGE
+    if _DIGEST.match(value):
+        return _path(value, size)
+    return value
+
+
+def _rendition(image, size):
+    from PIL import Image, ImageOps
+
+    if size in SQUARE_SIZES:
+        return ImageOps.fit(image, (SIZES[size], SIZES[size]), Image.Resampling.LANCZOS)
+    rendition = image.copy()
+    rendition.thumbnail((SIZES[size], SIZES[size]), Image.Resampling.LANCZOS)
+    return rendition
+
+
+# Store an uploaded photo (raw bytes) in every size and return its digest for recipes.image.
+# The same bytes uploaded twice map to the same digest and are only processed once.
+# Raises ValueError for files that aren't images or are too large to decode.
+def ingest(data):
+    from PIL import Image, ImageOps
+
+    digest = hashlib.sha256(data).hexdigest()
+    if _has_renditions(digest):
+        return digest
+
+    try:
+        image = Image.open(io.BytesIO(data))
+        if image.width * image.height > MAX_PIXELS:
+            raise ValueError("That photo is too large; please upload one under 50 megapixels.")
+        # JPEGs can be decoded at 1/2, 1/4 or 1/8 scale directly, which is much faster
+        image.draft("RGB", (max(SIZES.values()),) * 2)
+        # Apply the EXIF orientation, then drop all metadata (location included) by re-encoding
+        image = ImageOps.exif_transpose(image)
+        image = image.convert("RGBA" if image.mode in ("RGBA", "LA", "P") else "RGB")
+    except (OSError, Image.DecompressionBombError) as exc:
+        raise ValueError("That file doesn't look like a photo we can read.") from exc
+
+    os.makedirs(os.path.dirname(_path(digest, "card")), exist_ok=True)
+    for size in SIZES:
+        rendition = _rendition(image, size)
+        _write_atomically(_path(digest, size),
+                          lambda temp_path: rendition.save(temp_path, "WEBP", quality=WEBP_QUALITY, method=4))
+    return digest
+
+
+# Keep an upload on disk until a background job has processed it; returns its digest.
+# Only the header is checked here, so obviously broken files are still rejected up front.
+def store_upload(data):
+    from PIL import Image
+
+    try:
+        with Image.open(io.BytesIO(data)) as image:
+            image.verify()
+    except Exception as exc:
+        raise ValueError("That file doesn't look like a photo we can read.") from exc
+    digest = hashlib.sha256(data).hexdigest()
+    os.makedirs(os.path.dirname(_upload_path(digest)), exist_ok=True)
+
+    def write(temp_path):
+        with open(temp_path, "wb") as upload:
+            upload.write(data)
+
+    _write_atomically(_upload_path(digest), write)
+    return digest
+
+
+# Background step: make the renditions for a stored upload, then drop the original.
+# Safe to repeat, and to run in several jobs at once for the same photo (the same bytes shared
+# twice); returns False if the photo turned out to be unreadable or has gone missing.
+def process_upload(digest):
+    if not _has_renditions(digest):
+        try:
+            with open(_upload_path(digest), "rb") as upload:
+                data = upload.read()
+        except FileNotFoundError:
+            # Another job may have just finished this photo and dropped the upload
+            return _has_renditions(digest)
+        try:
+            ingest(data)
+        except ValueError:
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(_upload_path(digest))
+            return False
+    with contextlib.suppress(FileNotFoundError):
+        os.remove(_upload_path(digest))
+    return True
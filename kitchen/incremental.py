@@ -0,0 +1,57 @@
+# kitchen/incremental.py
+# Shared refresh logic for the in-memory recipe indexes (macros, similar, retrieval). Each index
+# remembers the recipe id it has scanned up to and, on refresh, only reads published recipes above it.
+import threading
+import time
+
+from kitchen import db
+
+
+class IncrementalIndex:
+    # Subclasses set SCAN_QUERY (published recipes with id > ?, ORDER BY id) and implement
+    # add(rows), which must skip recipes already indexed, and __len__.
+    SCAN_QUERY = None
+    BATCH_SIZE = 5000
+    # Look for newly published recipes at most this often
+    REFRESH_SECONDS = 30
+
+    def __init__(self):
+        self._last_id = 0
+        self._refreshed_at = 0.0
+        self._refresh_lock = threading.Lock()
+
+    def is_stale(self):
+        return time.monotonic() - self._refreshed_at >= self.REFRESH_SECONDS
+
+    # Load recipes published since the last refresh. Recipes still processing are picked up by a
+    # later refresh: the scan restarts just below the oldest of them. That minimum is read before
+    # the scan and in the same read transaction, so a recipe published in between can't be skipped.
+    def refresh(self, conn, batch_size=None):
+        with self._refresh_lock:
+            self._refreshed_at = time.monotonic()
+            scanned_from = last_id = self._last_id
+            started = not conn.in_transaction
+            if started:
+                conn.execute("BEGIN")
+            try:
+                processing = conn.execute(
+                    "SELECT MIN(id) FROM recipes WHERE id > ? AND status = 'processing'", (scanned_from,)
+                ).fetchone()[0]
+                cursor = conn.execute(self.SCAN_QUERY, (scanned_from,))
+                while True:
+                    rows = cursor.fetchmany(batch_size or self.BATCH_SIZE)
+                    if not rows:
+                        break
+                    self.add(rows)
+                    last_id = rows[-1]["id"]
+            finally:
+                if started:
+                    conn.commit()
+            self._last_id = last_id if processing is None else min(last_id, processing - 1)
+
+    # The index with any newly published recipes loaded; `force` refreshes even if it isn't stale
+    def current(self, force=False):
+        if force or not len(self) or self.is_stale():
+            with db.connection() as conn:
+                self.refresh(conn)
+        return self
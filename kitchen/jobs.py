@@ -0,0 +1,152 @@
+# kitchen/jobs.py
+# Persistent background jobs. Work is queued as rows of the jobs table (in the same transaction
+# as the data it belongs to), so it survives restarts; a dispatcher thread claims ready rows and
+# runs them on a small thread pool, retrying failures with exponential backoff.
+import json
+import threading
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+
+from kitchen import db
+
+JOB_WORKERS = 2
+MAX_ATTEMPTS = 5
+RETRY_BASE_SECONDS = 2
+POLL_SECONDS = 5
+KEEP_DONE_SECONDS = 24 * 60 * 60
+CLEANUP_SECONDS = 60 * 60
+
+
+# Queue a job inside the caller's transaction; it runs once that transaction commits
+def enqueue(conn, kind, payload, delay=0):
+    return conn.execute(
+        "INSERT INTO jobs (kind, payload, run_after) VALUES (?, ?, ?)",
+        (kind, json.dumps(payload), time.time() + delay)
+    ).lastrowid
+
+
+# Failed attempts wait 2, 4, 8, ... seconds before running again
+def retry_delay(attempts):
+    return RETRY_BASE_SECONDS * 2 ** (attempts - 1)
+
+
+class JobRunner:
+    # handlers maps a job kind to `handler(pool, payload)`; raising marks the attempt failed.
+    # on_failed optionally maps a kind to `callback(pool, payload)`, run once a job has used up
+    # its attempts, so the job's data isn't left half-done.
+    def __init__(self, path, handlers, workers=JOB_WORKERS, max_attempts=MAX_ATTEMPTS, poll_seconds=POLL_SECONDS,
+                 on_failed=None):
+        self.handlers = handlers
+        self.on_failed = on_failed or {}
+        self.workers = workers
+        self.max_attempts = max_attempts
+        self.poll_seconds = poll_seconds
+        self.pool = db.ConnectionPool(path, size=workers + 1)
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="kitchen-job")
+        self._free = threading.Semaphore(workers)
+        self._wake = threading.Event()
+        self._stopped = threading.Event()
+        self._recover()
+        self._thread = threading.Thread(target=self._dispatch, name="kitchen-jobs", daemon=True)
+        self._thread.start()
+
+    # Check for ready jobs now instead of at the next poll (call after enqueueing)
+    def wake(self):
+        self._wake.set()
+
+    def close(self):
+        self._stopped.set()
+        self._wake.set()
+        self._thread.join()
+        self._executor.shutdown(wait=True)
+        self.pool.close()
+
+    # Jobs left running by a process that stopped mid-job are simply run again
+    def _recover(self):
+        with self.pool.connection() as conn:
+            conn.execute("UPDATE jobs SET status = 'queued', run_after = ? WHERE status = 'running'", (time.time(),))
+
+    def _claim(self, limit):
+        with self.pool.connection() as conn:
+            return conn.execute(
+                """
+                UPDATE jobs SET status = 'running', attempts = attempts + 1, updated_at = datetime('now')
+                WHERE id IN (
+                    SELECT id FROM jobs WHERE status = 'queued' AND run_after <= ? ORDER BY run_after LIMIT ?
+                )
+                RETURNING id, kind, payload, attempts
+                """,
+                (time.time(), limit)
+            ).fetchall()
+
+    def _next_run_after(self):
+        with self.pool.connection() as conn:
+            return conn.execute("SELECT MIN(run_after) FROM jobs WHERE status = 'queued'").fetchone()[0]
+
+    def _dispatch(self):
+        last_cleanup = 0.0
+        while not self._stopped.is_set():
+            self._wake.clear()
+            free = 0
+            while self._free.acquire(blocking=False):
+                free += 1
+            try:
+                claimed = self._claim(free) if free else []
+            except Exception:
+                claimed = []
+                traceback.print_exc()
+            for _ in range(free - len(claimed)):
+                self._free.release()
+            for job in claimed:
+                self._executor.submit(self._run, job)
+
+            if time.time() - last_cleanup > CLEANUP_SECONDS:
+                last_cleanup = time.time()
+                self._cleanup()
+
+            # Sleep until woken, a worker frees up, the next retry is due, or the poll interval passes
+            timeout = self.poll_seconds
+            try:
+                next_run_after = self._next_run_after()
+            except Exception:
+                next_run_after = None
+            if next_run_after is not None:
+                timeout = min(timeout, max(next_run_after - time.time(), 0.05))
+            self._wake.wait(timeout)
+
+    def _run(self, job):
+        try:
+            self.handlers[job["kind"]](self.pool, json.loads(job["payload"]))
+        except Exception:
+            error = traceback.format_exc(limit=5)
+            failed = job["attempts"] >= self.max_attempts
+            with self.pool.connection() as conn:
+                conn.execute(
+                    """
+                    UPDATE jobs SET status = ?, run_after = ?, last_error = ?, updated_at = datetime('now')
+                    WHERE id = ?
+                    """,
+                    ("failed" if failed else "queued", time.time() + retry_delay(job["attempts"]), error, job["id"])
+                )
+            if failed and job["kind"] in self.on_failed:
+                try:
+                    self.on_failed[job["kind"]](self.pool, json.loads(job["payload"]))
+                except Exception:
+                    traceback.print_exc()
+        else:
+            with self.pool.connection() as conn:
+                conn.execute("UPDATE jobs SET status = 'done', updated_at = datetime('now') WHERE id = ?",
+                             (job["id"],))
+        finally:
+            self._free.release()
+            self._wake.set()
+
+    # Finished jobs are kept for a day for debugging; failed ones stay until looked at
+    def _cleanup(self):
+        try:
+            with self.pool.connection() as conn:
+                conn.execute("DELETE FROM jobs WHERE status = 'done' AND updated_at < datetime('now', ?)",
+                             (f"-{KEEP_DONE_SECONDS} seconds",))
+        except Exception:
+            traceback.print_exc()
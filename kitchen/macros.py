@@ -0,0 +1,115 @@
+# kitchen/macros.py
+# "Match my macros": nearest recipes to a protein/carbs/fat/calorie target
+import threading
+
+import numpy as np
+import streamlit as st
+
+from kitchen.incremental import IncrementalIndex
+from kitchen.recipes import CATEGORIES
+
+MACROS = ("protein", "carbs", "fat", "calories")
+
+# Distances are measured in units of a typical serving so that grams and calories are
+# comparable: being 10g of protein off counts like being 160 calories off.
+MACRO_SCALES = np.array([10.0, 20.0, 8.0, 160.0], dtype=np.float32)
+
+CATEGORY_CODES = {category: code for code, category in enumerate(CATEGORIES)}
+
+
+class MacroIndex(IncrementalIndex):
+    # Recipe macros as a (4, n) float32 matrix, pre-divided by MACRO_SCALES and stored one
+    # contiguous row per macro so the scan streams through memory. With only four dimensions
+    # a vectorized brute-force scan stays in the low milliseconds at 100k recipes, which is
+    # cheaper than keeping a KD-tree balanced under incremental inserts.
+    SCAN_QUERY = """
+        SELECT id, category, protein, carbs, fat, calories FROM recipes
+        WHERE id > ? AND status = 'published' ORDER BY id
+    """
+    BATCH_SIZE = 20000
+
+    def __init__(self):
+        super().__init__()
+        self._points = np.zeros((len(MACROS), 0), dtype=np.float32)
+        self._ids = np.zeros(0, dtype=np.int64)
+        self._categories = np.zeros(0, dtype=np.int8)
+        self._size = 0
+        self._indexed = set()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return self._size
+
+    # Append recipes (mappings with id, category and the four macros)
+    def add(self, recipes):
+        recipes = [recipe for recipe in recipes if recipe["id"] not in self._indexed]
+        if not recipes:
+            return
+        points = np.array([[recipe[macro] for macro in MACROS] for recipe in recipes], dtype=np.float32)
+        categories = np.array([CATEGORY_CODES.get(recipe["category"], -1) for recipe in recipes], dtype=np.int8)
+        ids = np.array([recipe["id"] for recipe in recipes], dtype=np.int64)
+        with self._lock:
+            needed = self._size + len(recipes)
+            if needed > len(self._ids):
+                capacity = max(needed, 2 * len(self._ids), 1024)
+                grown = np.zeros((len(MACROS), capacity), dtype=np.float32)
+                grown[:, :self._size] = self._points[:, :self._size]
+                self._points = grown
+                self._ids = np.resize(self._ids, capacity)
+                self._categories = np.resize(self._categories, capacity)
+            self._points[:, self._size:needed] = (points / MACRO_SCALES).T
+            self._ids[self._size:needed] = ids
+            self._categories[self._size:needed] = categories
+            self._size = needed
+            self._indexed.update(ids.tolist())
+
+    # Scaled macros (as an (n, 4) array) and ids of every recipe in one category
+    def category_points(self, category):
+        with self._lock:
+            size = self._size
+            mask = self._categories[:size] == CATEGORY_CODES[category]
+            return self._points[:, :size][:, mask].T.copy(), self._ids[:size][mask].copy()
+
+    # Ids of the k recipes closest to target (protein, carbs, fat, calories), closest first,
+    # with their distances. A target of 0 for a macro means "don't care".
+    def nearest(self, target, k=12, category="All"):
+        target = np.asarray(target, dtype=np.float32)
+        weights = target > 0
+        if not weights.any():
+            return [], []
+        with self._lock:
+            size = self._size
+            points, ids, categories = self._points[:, :size], self._ids[:size], self._categories[:size]
+
+        # Weighted squared distance, accumulated one macro at a time
+        scaled_target = target / MACRO_SCALES
+        distances = np.zeros(size, dtype=np.float32)
+        for macro in np.flatnonzero(weights):
+            delta = points[macro] - scaled_target[macro]
+            distances += delta * delta
+        if category != "All":
+            distances[categories != CATEGORY_CODES[category]] = np.inf
+
+        k = min(k, size)
+        if not k:
+            return [], []
+        top = np.argpartition(distances, k - 1)[:k]
+        top = top[np.argsort(distances[top])]
+        top = top[np.isfinite(distances[top])]
+        return [int(recipe_id) for recipe_id in ids[top]], np.sqrt(distances[top]).tolist()
+
+
+@st.cache_resource
+def get_index():
+    return MacroIndex()
+
+
+# The shared index, with any newly added recipes loaded
+def current_index():
+    return get_index().current()
+
+
+# Closest recipes to a macro target
+def closest_recipe_ids(protein, carbs, fat, calories, k=12, category="All"):
+    ids, _ = current_index().nearest((protein, carbs, fat, calories), k, category)
+    return ids
@@ -0,0 +1,78 @@
+# kitchen/meal_log.py
+# Nutrition log behind the My Profile charts.
+# Every entry is folded into day/week/month rows of nutrition_rollups by triggers,
+# so reads cost one primary-key range scan however long a user's history gets.
+# pandas is only imported by the functions returning frames, when they are first called.
+from datetime import date, datetime, timedelta
+
+MACRO_COLUMNS = ["protein", "carbs", "fat", "calories"]
+
+
+# Record what the user ate; recipe entries copy the recipe's macros scaled by the portion
+def log_meal(conn, user_id, protein, carbs, fat, calories, recipe_id=None, portion=1.0, logged_at=None):
+    logged_at = logged_at or datetime.now()
+    conn.execute(
+        """
+        INSERT INTO meal_log (user_id, logged_at, recipe_id, portion, protein, carbs, fat, calories)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        """,
+        (user_id, logged_at.strftime("%Y-%m-%d %H:%M:%S"), recipe_id, portion,
+         protein * portion, carbs * portion, fat * portion, calories * portion)
+    )
+
+
+def log_recipe(conn, user_id, recipe, portion=1.0, logged_at=None):
+    log_meal(conn, user_id, recipe["protein"], recipe["carbs"], recipe["fat"], recipe["calories"],
+             recipe_id=recipe["id"], portion=portion, logged_at=logged_at)
+
+
+# Bumped by triggers whenever the user's log changes; part of the chart cache key
+def log_version(conn, user_id):
+    row = conn.execute("SELECT meal_log_version FROM user_stats WHERE user_id = ?", (user_id,)).fetchone()
+    return row[0] if row else 0
+
+
+# Day of the user's first logged meal, or None
+def first_logged_day(conn, user_id):
+    row = conn.execute(
+        "SELECT MIN(period_start) FROM nutrition_rollups WHERE user_id = ? AND period = 'day'", (user_id,)
+    ).fetchone()
+    return date.fromisoformat(row[0]) if row[0] else None
+
+
+# Rollup rows of one period ("day", "week" or "month") whose start falls in [start, end]
+def rollups(conn, user_id, period, start, end):
+    import pandas as pd
+
+    rows = conn.execute(
+        """
+        SELECT period_start, entries, days, protein, carbs, fat, calories
+        FROM nutrition_rollups
+        WHERE user_id = ? AND period = ? AND period_start BETWEEN ? AND ?
+        ORDER BY period_start
+        """,
+        (user_id, period, start.isoformat(), end.isoformat())
+    ).fetchall()
+    frame = pd.DataFrame([dict(row) for row in rows],
+                         columns=["period_start", "entries", "days"] + MACRO_COLUMNS)
+    frame["period_start"] = pd.to_datetime(frame["period_start"])
+    return frame.set_index("period_start")
+
+
+# One row per calendar day in [start, end]; days without entries count as zero
+def daily_totals(conn, user_id, start, end):
+    import pandas as pd
+
+    days = rollups(conn, user_id, "day", start, end)
+    return days.reindex(pd.date_range(start, end, freq="D"), fill_value=0)
+
+
+# Average per logged day for the week containing `day` and the week before it
+def weekly_averages(conn, user_id, day):
+    import pandas as pd
+
+    this_week = day - timedelta(days=day.weekday())
+    weeks = rollups(conn, user_id, "week", this_week - timedelta(days=7), this_week)
+    weeks = weeks.reindex(pd.to_datetime([this_week - timedelta(days=7), this_week]), fill_value=0)
+    averages = weeks[MACRO_COLUMNS].div(weeks["days"].where(weeks["days"] > 0), axis=0).fillna(0)
+    return averages.iloc[1], averages.iloc[0]
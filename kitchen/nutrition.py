@@ -0,0 +1,171 @@
+# kitchen/nutrition.py
+# Ingredient-line parser and nutrition calculator for Share Your Meal.
+# Lines like "1 1/2 cups rolled oats" are split into quantity, unit and food, converted to grams,
+# and looked up in data/nutrition.csv (values per 100 g), which is held in a dict keyed by food name.
+import csv
+import re
+from collections import namedtuple
+from pathlib import Path
+
+import streamlit as st
+
+NUTRITION_CSV = Path(__file__).resolve().parent.parent / "data" / "nutrition.csv"
+
+# Same names (and units: grams, sodium/cholesterol in mg) as the recipes table columns
+NUTRIENTS = ["calories", "protein", "carbs", "fat", "fiber", "sugar", "sodium", "cholesterol",
+             "saturated_fat", "trans_fat"]
+
+# Units normalized to grams (mass) or millilitres (volume); count units weigh one of the food
+MASS_UNITS = {"g": 1.0, "kg": 1000.0, "mg": 0.001, "oz": 28.35, "lb": 453.6}
+VOLUME_UNITS = {"ml": 1.0, "l": 1000.0, "tsp": 4.93, "tbsp": 14.79, "cup": 236.6, "fl oz": 29.57,
+                "pinch": 0.31, "dash": 0.62}
+COUNT_UNITS = {"piece": 1.0, "scoop": 1.0, "slice": 1.0, "clove": 1.0, "can": 1.0, "fillet": 1.0,
+               "small": 0.75, "medium": 1.0, "large": 1.25}
+UNIT_ALIASES = {
+    "g": "g", "gram": "g", "grams": "g", "gr": "g",
+    "kg": "kg", "kilogram": "kg", "kilograms": "kg",
+    "mg": "mg", "milligram": "mg", "milligrams": "mg",
+    "oz": "oz", "ounce": "oz", "ounces": "oz",
+    "lb": "lb", "lbs": "lb", "pound": "lb", "pounds": "lb",
+    "ml": "ml", "milliliter": "ml", "milliliters": "ml", "millilitre": "ml", "millilitres": "ml",
+    "l": "l", "liter": "l", "liters": "l", "litre": "l", "litres": "l",
+    "tsp": "tsp", "teaspoon": "tsp", "teaspoons": "tsp",
+    "tbsp": "tbsp", "tbs": "tbsp", "tablespoon": "tbsp", "tablespoons": "tbsp",
+    "cup": "cup", "cups": "cup", "c": "cup",
+    "fl oz": "fl oz", "fluid ounce": "fl oz", "fluid ounces": "fl oz",
+    "pinch": "pinch", "pinches": "pinch", "dash": "dash", "dashes": "dash",
+    "piece": "piece", "pieces": "piece", "scoop": "scoop", "scoops": "scoop",
+    "slice": "slice", "slices": "slice", "clove": "clove", "cloves": "clove",
+    "can": "can", "cans": "can", "fillet": "fillet", "fillets": "fillet",
+    "small": "small", "medium": "medium", "large": "large",
+}
+
+UNICODE_FRACTIONS = {"½": "1/2", "⅓": "1/3", "⅔": "2/3", "¼": "1/4", "¾": "3/4", "⅕": "1/5", "⅖": "2/5",
+                     "⅗": "3/5", "⅘": "4/5", "⅙": "1/6", "⅚": "5/6", "⅛": "1/8", "⅜": "3/8", "⅝": "5/8",
+                     "⅞": "7/8", "⁄": "/"}
+_FRACTION_CHARS = re.compile("[" + "".join(UNICODE_FRACTIONS) + "]")
+
+_NUMBER = r"(?:\d+(?:\.\d+)?\s+\d+/\d+|\d+/\d+|\d+(?:\.\d+)?|an?\b)"
+_LINE = re.compile(
+    rf"^(?P<quantity>{_NUMBER})(?:\s*(?:-|–|to)\s*(?P<upper>{_NUMBER}))?\s*"
+    r"(?:(?P<unit>" + "|".join(sorted(map(re.escape, UNIT_ALIASES), key=len, reverse=True)) + r")\.?\b)?"
+    r"\s*(?:of\s+)?(?P<food>.*)$"
+)
+_NOTES = re.compile(r"\([^)]*\)")
+_PACKAGE = re.compile(r"\(\s*(\d+(?:\.\d+)?)\s*-?\s*(oz|ounces?|g|grams?|lbs?|kg|ml)\.?\s*\)")
+_WORD = re.compile(r"[a-z%]+")
+
+ParsedIngredient = namedtuple("ParsedIngredient", "line quantity unit food grams nutrients")
+
+
+# "1 1/2" -> 1.5, "3/4" -> 0.75, "a" -> 1
+def parse_number(text):
+    if text in ("a", "an"):
+        return 1.0
+    total = 0.0
+    for part in text.split():
+        if "/" in part:
+            numerator, denominator = part.split("/")
+            total += float(numerator) / float(denominator) if float(denominator) else 0.0
+        else:
+            total += float(part)
+    return total
+
+
+# Split one ingredient line into (quantity, unit, food words); quantity is None when missing.
+# Ranges like "2-3" count as their midpoint; a package size such as "1 (15 oz) can" becomes
+# the measure; other notes in parentheses, ", chopped"-style trailers and alternatives after
+# " or " are dropped.
+def parse_line(line):
+    text = _FRACTION_CHARS.sub(lambda match: " " + UNICODE_FRACTIONS[match.group()], line.lower())
+    package = _PACKAGE.search(text)
+    text = _NOTES.sub(" ", text).split(",")[0].split(" or ")[0].strip()
+    text = re.sub(r"\s*/\s*", "/", text)
+    match = _LINE.match(text)
+    if not match:
+        return None, None, _WORD.findall(text)
+    quantity = parse_number(match.group("quantity"))
+    if match.group("upper"):
+        quantity = (quantity + parse_number(match.group("upper"))) / 2
+    unit = UNIT_ALIASES.get(match.group("unit")) if match.group("unit") else None
+    if package and (unit is None or unit in COUNT_UNITS):
+        quantity, unit = quantity * float(package.group(1)), UNIT_ALIASES[package.group(2)]
+    return quantity, unit, _WORD.findall(match.group("food"))
+
+
+class NutritionTable:
+    def __init__(self, rows):
+        # name/alias -> (grams per ml, grams per unit, nutrients per gram)
+        self._foods = {}
+        for row in rows:
+            entry = (
+                float(row["grams_per_ml"] or 1.0),
+                float(row["grams_per_unit"]) if row["grams_per_unit"] else None,
+                [float(row[nutrient] or 0) / 100 for nutrient in NUTRIENTS],
+            )
+            names = [row["food"]] + [alias for alias in row["aliases"].split("|") if alias]
+            for name in names:
+                self._foods.setdefault(name.strip().lower(), (row["food"],) + entry)
+
+    @classmethod
+    def from_csv(cls, path=NUTRITION_CSV):
+        with open(path, newline="", encoding="utf-8") as csv_file:
+            return cls(list(csv.DictReader(csv_file)))
+
+    def _get(self, name):
+        entry = self._foods.get(name)
+        if entry is None and name.endswith("es"):
+            entry = self._foods.get(name[:-2])
+        if entry is None and name.endswith("s"):
+            entry = self._foods.get(name[:-1])
+        return entry
+
+    # Longest run of words naming a known food; at equal length the rightmost wins,
+    # since the head noun comes last ("vanilla protein powder" -> "protein powder")
+    def lookup(self, words):
+        for length in range(len(words), 0, -1):
+            for start in range(len(words) - length, -1, -1):
+                entry = self._get(" ".join(words[start:start + length]))
+                if entry is not None:
+                    return entry
+        return None
+
+    # Parse one line and work out its nutrients; grams/nutrients are None when unknown
+    def measure(self, line):
+        quantity, unit, words = parse_line(line)
+        entry = self.lookup(words)
+        if entry is None:
+            return ParsedIngredient(line, quantity, unit, None, None, None)
+        food, grams_per_ml, grams_per_unit, per_gram = entry
+        if quantity is None:
+            grams = None
+        elif unit in MASS_UNITS:
+            grams = quantity * MASS_UNITS[unit]
+        elif unit in VOLUME_UNITS:
+            grams = quantity * VOLUME_UNITS[unit] * grams_per_ml
+        elif grams_per_unit is not None:
+            grams = quantity * COUNT_UNITS.get(unit, 1.0) * grams_per_unit
+        else:
+            grams = None
+        nutrients = None if grams is None else dict(zip(NUTRIENTS, (grams * value for value in per_gram)))
+        return ParsedIngredient(line, quantity, unit, food, grams, nutrients)
+
+    # Totals (rounded like the recipes table) plus every parsed line, for an ingredient list
+    def recipe_nutrition(self, lines):
+        parsed = [self.measure(line) for line in lines if line.strip()]
+        totals = dict.fromkeys(NUTRIENTS, 0.0)
+        for ingredient in parsed:
+            if ingredient.nutrients:
+                for nutrient, value in ingredient.nutrients.items():
+                    totals[nutrient] += value
+        return {nutrient: round(value) for nutrient, value in totals.items()}, parsed
+
+
+# The table is read once per process and shared by all sessions
+@st.cache_resource
+def get_table():
+    return NutritionTable.from_csv()
+
+
+def recipe_nutrition(lines):
+    return get_table().recipe_nutrition(lines)
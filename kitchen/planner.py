@@ -0,0 +1,96 @@
+# kitchen/planner.py
+# Daily meal planner: one recipe per meal slot, with day totals as close as possible to a macro target
+import numpy as np
+import streamlit as st
+
+from kitchen import macros
+
+# Meal slots, with the share of the day's target each is expected to cover.
+# The shares only steer the pruning; the final choice is scored on the day's totals.
+SLOT_SHARES = {
+    "Breakfast": 0.25,
+    "Lunch": 0.30,
+    "Dinner": 0.35,
+    "Snacks": 0.10,
+}
+DESSERT_SHARE = 0.10
+
+# The search is exact over the candidates it keeps: each slot is pruned to the recipes nearest
+# its share of the target, keeping as many as fit in MAX_COMBINATIONS whole-day combinations
+# (64 per slot for four slots). Those are searched meet-in-the-middle style: every pairing of
+# a first-half and a second-half combination is scored with one matrix product per chunk.
+MAX_COMBINATIONS = 2 ** 24
+CHUNK_ROWS = 1024
+
+
+def _squared_distance(points, target, weights):
+    return (((points - target) ** 2) * weights).sum(axis=-1)
+
+
+# Every combination of one recipe per slot: summed points and the ids picked
+def _combinations(parts, dims):
+    sums = np.zeros((1, dims), dtype=np.float32)
+    picks = np.zeros((1, 0), dtype=np.int64)
+    for points, ids in parts:
+        sums = (sums[:, None, :] + points[None, :, :]).reshape(-1, dims)
+        picks = np.hstack([np.repeat(picks, len(ids), axis=0), np.tile(ids, len(picks))[:, None]])
+    return sums, picks
+
+
+# Best plan for a target given {slot: (scaled macro points, ids)}.
+# Returns {slot: recipe id} and the plan's distance from the target (in scaled units).
+def plan_day(target, slot_shares, candidates):
+    target = np.asarray(target, dtype=np.float32) / macros.MACRO_SCALES
+    weights = (target > 0).astype(np.float32)
+    slots = [slot for slot in slot_shares if len(candidates[slot][1])]
+    if not slots or not weights.any():
+        return {}, float("inf")
+
+    # Prune each slot to the recipes nearest its share of the target
+    per_slot = max(1, int(MAX_COMBINATIONS ** (1 / len(slots))))
+    parts = []
+    for slot in slots:
+        points, ids = candidates[slot]
+        if len(ids) > per_slot:
+            distances = _squared_distance(points, target * slot_shares[slot], weights)
+            keep = np.argpartition(distances, per_slot - 1)[:per_slot]
+            points, ids = points[keep], ids[keep]
+        parts.append((points, ids))
+
+    # Split the slots in two halves and enumerate each half's combinations.
+    # For a pair (l, r): |w(l + r - t)|^2 = |w(l - t)|^2 + |wr|^2 + 2 w(l - t) . wr
+    half = len(parts) // 2
+    left, left_picks = _combinations(parts[:half], len(target))
+    right, right_picks = _combinations(parts[half:], len(target))
+    left = (left - target) * weights
+    right = right * weights
+    left_norms = (left ** 2).sum(axis=1)
+    right_norms = (right ** 2).sum(axis=1)
+
+    best_distance, best_pair = np.inf, (0, 0)
+    for start in range(0, len(left), CHUNK_ROWS):
+        block = left_norms[start:start + CHUNK_ROWS, None] + right_norms[None, :] \
+            + 2 * left[start:start + CHUNK_ROWS] @ right.T
+        row, column = np.unravel_index(np.argmin(block), block.shape)
+        if block[row, column] < best_distance:
+            best_distance, best_pair = block[row, column], (start + row, column)
+
+    picks = np.concatenate([left_picks[best_pair[0]], right_picks[best_pair[1]]])
+    plan = dict(zip(slots, (int(recipe_id) for recipe_id in picks)))
+    return plan, float(np.sqrt(max(best_distance, 0.0)))
+
+
+# The day's plan for a macro target, cached per (target, day). `day` is part of the
+# cache key so plans are recomputed daily and pick up recipes shared since.
+@st.cache_data(ttl=24 * 60 * 60, max_entries=1000, show_spinner="Planning your day...")
+def daily_plan(protein, carbs, fat, calories, day, include_dessert=False):
+    slot_shares = dict(SLOT_SHARES)
+    if include_dessert:
+        slot_shares["Desserts"] = DESSERT_SHARE
+        slot_shares["Snacks"] -= DESSERT_SHARE / 2
+        slot_shares["Dinner"] -= DESSERT_SHARE / 2
+
+    index = macros.current_index()
+    candidates = {slot: index.category_points(slot) for slot in slot_shares}
+    plan, _ = plan_day((protein, carbs, fat, calories), slot_shares, candidates)
+    return plan
@@ -0,0 +1,71 @@
+# kitchen/publishing.py
+# Share Your Meal submissions: the recipe is saved as "processing" together with a publish job,
+# and a background worker finishes the slow parts (photo renditions, recommendation indexes)
+# before flipping it to "published" so it shows up in the feed.
+import streamlit as st
+
+from kitchen import db, images, jobs, recipes
+
+PUBLISH_JOB = "publish_recipe"
+
+
+# Writer-queue job: the recipe row and its publish job commit together or not at all
+def save_submission(conn, user_id, author, recipe, upload_digest=None):
+    recipe_id = recipes.create_recipe(conn, user_id, author, dict(recipe, status="processing"))
+    jobs.enqueue(conn, PUBLISH_JOB, {"recipe_id": recipe_id, "upload": upload_digest})
+    return recipe_id
+
+
+def publish_recipe(pool, payload):
+    image = None
+    if payload["upload"] and images.process_upload(payload["upload"]):
+        image = payload["upload"]
+    _publish(pool, payload["recipe_id"], image)
+
+
+# A publish job out of attempts still publishes the recipe (with whatever photo it has, else the
+# placeholder) so it reaches the feed and the Share Your Meal preview stops waiting for it.
+# The recommendation indexes pick it up on their next refresh.
+def publish_failed(pool, payload):
+    with pool.connection() as conn:
+        conn.execute("UPDATE recipes SET status = 'published' WHERE id = ?", (payload["recipe_id"],))
+    _invalidate(payload["recipe_id"])
+
+
+def _publish(pool, recipe_id, image):
+    with pool.connection() as conn:
+        conn.execute("UPDATE recipes SET image = coalesce(?, image), status = 'published' WHERE id = ?",
+                     (image, recipe_id))
+
+    # Index the new recipe now rather than on the next visitor's request. The indexes are imported
+    # here so pages starting the job runner don't load them (and NumPy) up front.
+    from kitchen import macros, retrieval, similar
+
+    with pool.connection() as conn:
+        similar.get_engine().refresh(conn)
+        macros.get_index().refresh(conn)
+        retrieval.get_index().refresh(conn)
+    _invalidate(recipe_id)
+
+
+def _invalidate(recipe_id):
+    # Card lists cached while the recipe was processing left it out
+    recipes.invalidate_feed()
+    recipes.invalidate_recipe(recipe_id)
+    recipes.cached_cards.clear()
+
+
+HANDLERS = {PUBLISH_JOB: publish_recipe}
+FAILED_HANDLERS = {PUBLISH_JOB: publish_failed}
+
+
+# Process-wide job runner; starting it also resumes any jobs queued before a restart
+@st.cache_resource
+def get_runner():
+    db.get_pool()
+    return jobs.JobRunner(db.DB_PATH, HANDLERS, on_failed=FAILED_HANDLERS)
+
+
+def recipe_status(conn, recipe_id):
+    row = conn.execute("SELECT status FROM recipes WHERE id = ?", (recipe_id,)).fetchone()
+    return row["status"] if row else None
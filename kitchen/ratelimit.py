@@ -0,0 +1,209 @@
+# kitchen/ratelimit.py
+# Login throttling: token buckets plus sliding-window failure counters, shared by all sessions
+import math
+import threading
+import time
+from collections import namedtuple
+
+import streamlit as st
+
+from kitchen import db
+
+# capacity/refill_seconds: burst size and how often one attempt is earned back.
+# max_failures within window_seconds locks the key out for lockout_seconds.
+Limit = namedtuple("Limit", "capacity refill_seconds max_failures window_seconds lockout_seconds")
+
+USERNAME_LIMIT = Limit(capacity=5, refill_seconds=30, max_failures=10, window_seconds=15 * 60, lockout_seconds=15 * 60)
+CLIENT_LIMIT = Limit(capacity=20, refill_seconds=3, max_failures=50, window_seconds=15 * 60, lockout_seconds=15 * 60)
+
+# Above this many tracked keys, keys that are back to a clean state are dropped
+MAX_TRACKED_KEYS = 10000
+
+# Reverse proxies in front of the app that append the connecting address to X-Forwarded-For.
+# Only the hops they appended can be trusted; anything further left was sent by the client.
+TRUSTED_PROXY_HOPS = 0
+
+
+class _KeyState:
+    __slots__ = ("tokens", "updated_at", "window_start", "failures", "previous_failures", "locked_until")
+
+    def __init__(self, limit, now):
+        self.tokens = float(limit.capacity)
+        self.updated_at = now
+        self.window_start = now
+        self.failures = 0
+        self.previous_failures = 0
+        self.locked_until = 0.0
+
+    def refill(self, limit, now):
+        self.tokens = min(limit.capacity, self.tokens + (now - self.updated_at) / limit.refill_seconds)
+        self.updated_at = now
+
+    # Sliding-window counter approximated from the current and previous fixed windows
+    def recent_failures(self, limit, now):
+        elapsed = now - self.window_start
+        if elapsed >= 2 * limit.window_seconds:
+            self.window_start, self.failures, self.previous_failures = now, 0, 0
+        elif elapsed >= limit.window_seconds:
+            self.window_start += limit.window_seconds
+            self.failures, self.previous_failures = 0, self.failures
+        weight = 1 - (now - self.window_start) / limit.window_seconds
+        return self.failures + self.previous_failures * weight
+
+    def is_clean(self, limit):
+        return self.tokens >= limit.capacity and not self.failures and not self.previous_failures
+
+
+class LoginLimiter:
+    # Keys are strings like "user:leo" or "client:10.0.0.1"; the prefix picks the Limit.
+    # With persist=True the state is written to login_throttle so limits survive restarts.
+    def __init__(self, limits=None, persist=False):
+        self.limits = limits or {"user": USERNAME_LIMIT, "client": CLIENT_LIMIT}
+        self.persist = persist
+        self._states = {}
+        self._lock = threading.Lock()
+        if persist:
+            self._load()
+
+    def _limit(self, key):
+        return self.limits[key.split(":", 1)[0]]
+
+    def _state(self, key, now):
+        state = self._states.get(key)
+        if state is None:
+            state = self._states[key] = _KeyState(self._limit(key), now)
+        return state
+
+    # Take one attempt from every key's bucket, or none if any key is throttled or locked out.
+    # Returns (allowed, retry_after_seconds). Call this before doing any password hashing.
+    def acquire(self, *keys):
+        now = time.time()
+        with self._lock:
+            retry_after = 0.0
+            for key in keys:
+                limit, state = self._limit(key), self._state(key, now)
+                state.refill(limit, now)
+                if state.locked_until > now:
+                    retry_after = max(retry_after, state.locked_until - now)
+                elif state.tokens < 1:
+                    retry_after = max(retry_after, (1 - state.tokens) * limit.refill_seconds)
+            if retry_after:
+                return False, retry_after
+
+            for key in keys:
+                self._states[key].tokens -= 1
+            rows = self._snapshot(keys)
+        self._save(rows)
+        return True, 0.0
+
+    # Count a failed login against every key, locking out keys that fail too often
+    def record_failure(self, *keys):
+        now = time.time()
+        with self._lock:
+            for key in keys:
+                limit, state = self._limit(key), self._state(key, now)
+                state.recent_failures(limit, now)  # roll the windows forward before counting
+                state.failures += 1
+                if state.recent_failures(limit, now) >= limit.max_failures:
+                    state.locked_until = now + limit.lockout_seconds
+            rows = self._snapshot(keys)
+            self._prune()
+        self._save(rows)
+
+    # A successful login clears the failure history for its keys
+    def record_success(self, *keys):
+        now = time.time()
+        with self._lock:
+            for key in keys:
+                state = self._state(key, now)
+                state.failures = state.previous_failures = 0
+                state.locked_until = 0.0
+            rows = self._snapshot(keys)
+        self._save(rows)
+
+    def _prune(self):
+        if len(self._states) <= MAX_TRACKED_KEYS:
+            return
+        now = time.time()
+        for key, state in list(self._states.items()):
+            limit = self._limit(key)
+            state.refill(limit, now)
+            if state.locked_until <= now and state.is_clean(limit):
+                del self._states[key]
+
+    # The keys' state as login_throttle rows; taken under the lock so _save can write it after
+    # the lock is released, and other logins don't wait on the database. Buckets are brought up to
+    # date first, so updated_at orders the snapshots of a key.
+    def _snapshot(self, keys):
+        if not self.persist:
+            return []
+        now = time.time()
+        rows = []
+        for key in keys:
+            state = self._states[key]
+            state.refill(self._limit(key), max(now, state.updated_at))
+            rows.append((key, state.tokens, state.updated_at, state.window_start, state.failures,
+                         state.previous_failures, state.locked_until))
+        return rows
+
+    # Concurrent saves can commit out of order; an older snapshot never overwrites a newer one
+    def _save(self, rows):
+        if not rows:
+            return
+        with db.connection() as conn:
+            conn.executemany(
+                """
+                INSERT INTO login_throttle
+                    (key, tokens, updated_at, window_start, failures, previous_failures, locked_until)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (key) DO UPDATE SET
+                    tokens = excluded.tokens, updated_at = excluded.updated_at,
+                    window_start = excluded.window_start, failures = excluded.failures,
+                    previous_failures = excluded.previous_failures, locked_until = excluded.locked_until
+                WHERE excluded.updated_at >= login_throttle.updated_at
+                """,
+                rows
+            )
+
+    # Reload state that still matters: recent failures or an active lockout
+    def _load(self):
+        horizon = time.time() - 2 * max(limit.window_seconds for limit in self.limits.values())
+        with db.connection() as conn:
+            conn.execute("DELETE FROM login_throttle WHERE window_start < ? AND locked_until < ?",
+                         (horizon, time.time()))
+            rows = conn.execute("SELECT * FROM login_throttle").fetchall()
+        for row in rows:
+            if row["key"].split(":", 1)[0] not in self.limits:
+                continue
+            state = _KeyState(self._limit(row["key"]), row["updated_at"])
+            for field in _KeyState.__slots__:
+                setattr(state, field, row[field])
+            self._states[row["key"]] = state
+
+
+@st.cache_resource
+def get_login_limiter():
+    return LoginLimiter(persist=True)
+
+
+# Address of the connecting client, or None if there isn't one we can trust. Unknown clients
+# aren't pooled under one key, where anyone's failures would lock everyone out.
+def client_id():
+    if not TRUSTED_PROXY_HOPS:
+        return getattr(st.context, "ip_address", None) or None
+    hops = [hop.strip() for hop in st.context.headers.get("X-Forwarded-For", "").split(",")]
+    if len(hops) < TRUSTED_PROXY_HOPS:
+        return None
+    return hops[-TRUSTED_PROXY_HOPS] or None
+
+
+# Throttle keys for a login attempt: the account, plus the client when its address is known
+def login_keys(username):
+    client = client_id()
+    account_key = f"user:{username.strip().lower()}"
+    return (account_key, f"client:{client}") if client else (account_key,)
+
+
+def format_retry_after(seconds):
+    minutes, seconds = divmod(math.ceil(seconds), 60)
+    return f"{minutes} min {seconds} s" if minutes else f"{seconds} s"
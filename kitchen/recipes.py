@@ -0,0 +1,244 @@
+# kitchen/recipes.py
+# Recipe queries used by the Home feed and the recipe pages
+import json
+import re
+
+import streamlit as st
+
+from kitchen import db, images
+
+# Feed pages are cached in memory for every session for at most this long, and the
+# least recently used pages are dropped beyond FEED_CACHE_ENTRIES
+FEED_CACHE_TTL = 300
+FEED_CACHE_ENTRIES = 512
+
+CATEGORIES = ["Breakfast", "Lunch", "Dinner", "Snacks", "Desserts"]
+
+# Each Home "Sort by" option maps to its sort key and direction, backed by one of the
+# idx_recipes_* indexes. id is always the last key so the order is total, which lets
+# the feed page with a keyset cursor (the key of the last card shown) instead of OFFSET.
+SORT_KEYS = {
+    "Newest": (("created_at", "id"), "DESC"),
+    "Most Popular": (("rating_count", "id"), "DESC"),
+    "Highest Protein": (("protein", "id"), "DESC"),
+    "Lowest Calories": (("calories", "id"), "ASC"),
+}
+
+# Extra sort option offered while searching: BM25 rank from recipes_fts
+BEST_MATCH = "Best Match"
+
+CARD_COLUMNS = ", ".join(f"recipes.{column}" for column in (
+    "id", "name", "author", "image", "category", "protein", "carbs", "fat", "calories",
+    "rating_sum", "rating_count", "created_at",
+))
+
+
+# Turn a recipe row into the dict the feed cards render
+def to_card(row):
+    card = dict(row)
+    card["thumb"] = images.image_url(card["image"], "thumb")
+    card["image"] = images.image_url(card["image"], "card")
+    card["user"] = card["author"]
+    card["reviews"] = card["rating_count"]
+    card["rating"] = round(card["rating_sum"] / card["rating_count"], 1) if card["rating_count"] else 0.0
+    return card
+
+
+# Build an FTS5 query from free text: every word must match, each as a prefix,
+# so "chick" finds chicken. Returns "" when there is nothing to search for.
+def fts_query(search_query):
+    words = re.findall(r"\w+", search_query.lower())
+    return " ".join(f'"{word}"*' for word in words)
+
+
+# One page of the Home feed (published recipes only), filtered and sorted entirely inside SQLite.
+# Pass the returned cursor back in to get the page after it; it is None on the last page.
+def feed(conn, search_query="", category="All", sort_by="Newest", limit=12, cursor=None):
+    match = fts_query(search_query)
+    if sort_by == BEST_MATCH and not match:
+        sort_by = "Newest"
+
+    where, params = ["recipes.status = 'published'"], []
+    if sort_by == BEST_MATCH:
+        sql = (f"SELECT {CARD_COLUMNS}, recipes_fts.rank AS rank"
+               " FROM recipes_fts JOIN recipes ON recipes.id = recipes_fts.rowid")
+        where.append("recipes_fts MATCH ?")
+        params.append(match)
+        key, direction = ("recipes_fts.rank", "recipes.id"), "ASC"
+        cursor_columns = ("rank", "id")
+    else:
+        sql = f"SELECT {CARD_COLUMNS} FROM recipes"
+        if match:
+            where.append("recipes.id IN (SELECT rowid FROM recipes_fts WHERE recipes_fts MATCH ?)")
+            params.append(match)
+        cursor_columns, direction = SORT_KEYS[sort_by]
+        key = tuple(f"recipes.{column}" for column in cursor_columns)
+
+    if category != "All":
+        where.append("recipes.category = ?")
+        params.append(category)
+
+    if cursor is not None:
+        placeholders = ", ".join("?" * len(cursor))
+        where.append(f"({', '.join(key)}) {'<' if direction == 'DESC' else '>'} ({placeholders})")
+        params.extend(cursor)
+
+    sql += " WHERE " + " AND ".join(where)
+    sql += " ORDER BY " + ", ".join(f"{column} {direction}" for column in key) + " LIMIT ?"
+    # Fetch one extra row to find out whether there is a next page
+    params.append(limit + 1)
+
+    rows = conn.execute(sql, params).fetchall()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = tuple(rows[-1][column] for column in cursor_columns)
+    return [to_card(row) for row in rows], next_cursor
+
+
+# Cached feed page keyed by (search_query, category, sort_by, page cursor).
+# The default "All / Newest" first page is served from memory for every visitor.
+@st.cache_data(ttl=FEED_CACHE_TTL, max_entries=FEED_CACHE_ENTRIES, show_spinner=False)
+def cached_feed(search_query, category, sort_by, limit, cursor):
+    with db.connection() as conn:
+        return feed(conn, search_query, category, sort_by, limit, cursor)
+
+
+# Drop every cached feed page; call after a commit that adds recipes or changes ratings
+def invalidate_feed():
+    cached_feed.clear()
+
+
+# Rate a recipe (or change an earlier rating); the rating triggers update the counters
+def rate_recipe(conn, user_id, recipe_id, stars):
+    conn.execute(
+        """
+        INSERT INTO ratings (user_id, recipe_id, stars) VALUES (?, ?, ?)
+        ON CONFLICT (user_id, recipe_id) DO UPDATE SET stars = excluded.stars
+        """,
+        (user_id, recipe_id, stars)
+    )
+
+
+# Insert a shared recipe with its ingredient and tag rows; returns the new recipe id.
+# Runs inside the caller's transaction, so the recipe appears all at once or not at all.
+def create_recipe(conn, user_id, author, recipe):
+    recipe_id = conn.execute(
+        """
+        INSERT INTO recipes (user_id, author, name, description, category, image, recipe_url, instructions,
+                             servings, protein, carbs, fat, calories, fiber, sugar, sodium, cholesterol,
+                             saturated_fat, trans_fat, status)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """,
+        (user_id, author, recipe["name"], recipe.get("description"), recipe["category"], recipe.get("image"),
+         recipe.get("recipe_url"), "\n".join(recipe.get("instructions", [])), recipe.get("servings", 1),
+         recipe["protein"], recipe["carbs"], recipe["fat"], recipe["calories"], recipe.get("fiber", 0),
+         recipe.get("sugar", 0), recipe.get("sodium", 0), recipe.get("cholesterol", 0),
+         recipe.get("saturated_fat", 0), recipe.get("trans_fat", 0), recipe.get("status", "published"))
+    ).lastrowid
+    conn.executemany("INSERT INTO ingredients (recipe_id, position, line) VALUES (?, ?, ?)",
+                     [(recipe_id, i, line) for i, line in enumerate(recipe.get("ingredients", []))])
+    conn.executemany("INSERT OR IGNORE INTO tags (recipe_id, tag) VALUES (?, ?)",
+                     [(recipe_id, tag) for tag in recipe.get("tags", [])])
+    return recipe_id
+
+
+# Everything the detail page shows, fetched in a single statement: the recipe row plus
+# its ingredients, tags and latest comments folded in as JSON arrays. None if no such recipe.
+def load_recipe(conn, recipe_id, comment_limit=20):
+    row = conn.execute(
+        """
+        SELECT recipes.*,
+               (SELECT json_group_array(line) FROM (
+                    SELECT line FROM ingredients WHERE recipe_id = recipes.id ORDER BY position
+               )) AS ingredients_json,
+               (SELECT json_group_array(tag) FROM (
+                    SELECT tag FROM tags WHERE recipe_id = recipes.id ORDER BY tag
+               )) AS tags_json,
+               (SELECT json_group_array(json_object('user', username, 'body', body, 'created_at', created_at)) FROM (
+                    SELECT users.username, comments.body, comments.created_at
+                    FROM comments JOIN users ON users.id = comments.user_id
+                    WHERE comments.recipe_id = recipes.id
+                    ORDER BY comments.created_at DESC, comments.id DESC LIMIT ?
+               )) AS comments_json
+        FROM recipes WHERE recipes.id = ?
+        """,
+        (comment_limit, recipe_id)
+    ).fetchone()
+    if row is None:
+        return None
+
+    recipe = to_card(row)
+    recipe["image"] = images.image_url(row["image"], "detail")
+    recipe["ingredients"] = json.loads(recipe.pop("ingredients_json"))
+    recipe["tags"] = json.loads(recipe.pop("tags_json"))
+    recipe["comments"] = json.loads(recipe.pop("comments_json"))
+    recipe["instructions"] = [step for step in (recipe["instructions"] or "").splitlines() if step.strip()]
+    return recipe
+
+
+# Per-recipe memo for the detail page, so a warm view costs no database work
+@st.cache_data(ttl=600, max_entries=1000, show_spinner=False)
+def cached_recipe(recipe_id):
+    with db.connection() as conn:
+        return load_recipe(conn, recipe_id)
+
+
+# Feed cards for a handful of published recipe ids in one query, in the order given
+@st.cache_data(ttl=FEED_CACHE_TTL, max_entries=FEED_CACHE_ENTRIES, show_spinner=False)
+def cached_cards(recipe_ids):
+    if not recipe_ids:
+        return []
+    with db.connection() as conn:
+        rows = conn.execute(
+            f"SELECT {CARD_COLUMNS} FROM recipes WHERE recipes.id IN ({', '.join('?' * len(recipe_ids))})"
+            " AND recipes.status = 'published'",
+            recipe_ids
+        ).fetchall()
+    cards = {row["id"]: to_card(row) for row in rows}
+    return [cards[recipe_id] for recipe_id in recipe_ids if recipe_id in cards]
+
+
+# Drop one recipe's cached detail view; call after its counters or comments change
+def invalidate_recipe(recipe_id):
+    cached_recipe.clear(recipe_id)
+
+
+# Whether a user has liked and saved a recipe (not cached: it's per user)
+def user_reactions(conn, user_id, recipe_id):
+    liked = conn.execute("SELECT 1 FROM likes WHERE user_id = ? AND recipe_id = ?", (user_id, recipe_id)).fetchone()
+    saved = conn.execute("SELECT 1 FROM saves WHERE user_id = ? AND recipe_id = ?", (user_id, recipe_id)).fetchone()
+    return {"liked": liked is not None, "saved": saved is not None}
+
+
+# Like/unlike or save/unsave; table is "likes" or "saves"
+def toggle_reaction(conn, table, user_id, recipe_id, on):
+    if on:
+        conn.execute(f"INSERT OR IGNORE INTO {table} (user_id, recipe_id) VALUES (?, ?)", (user_id, recipe_id))
+    else:
+        conn.execute(f"DELETE FROM {table} WHERE user_id = ? AND recipe_id = ?", (user_id, recipe_id))
+
+
+def add_comment(conn, user_id, recipe_id, body):
+    conn.execute("INSERT INTO comments (recipe_id, user_id, body) VALUES (?, ?, ?)", (recipe_id, user_id, body))
+
+
+# The profile page lists: recipes a user shared, and recipes they saved (newest first)
+def user_recipes(conn, user_id, limit=20):
+    return [to_card(row) for row in conn.execute(
+        f"""
+        SELECT {CARD_COLUMNS}, recipes.like_count, recipes.comment_count FROM recipes
+        WHERE recipes.user_id = ? ORDER BY recipes.created_at DESC LIMIT ?
+        """,
+        (user_id, limit)
+    )]
+
+
+def saved_recipes(conn, user_id, limit=20):
+    return [to_card(row) for row in conn.execute(
+        f"""
+        SELECT {CARD_COLUMNS}, saves.created_at AS saved_at FROM saves JOIN recipes ON recipes.id = saves.recipe_id
+        WHERE saves.user_id = ? ORDER BY saves.created_at DESC LIMIT ?
+        """,
+        (user_id, limit)
+    )]
@@ -0,0 +1,156 @@
+# kitchen/retrieval.py
+# Recipe retrieval for the Leo chat bot: a TF-IDF index over recipe names, tags, categories,
+# ingredients and macro labels ("high protein", "low carb", ...). The top matches for a question
+# are handed to the model as a short list, so Leo can point users at recipes from the app.
+import math
+import re
+import threading
+from array import array
+from collections import Counter
+
+import numpy as np
+import streamlit as st
+
+from kitchen.incremental import IncrementalIndex
+from kitchen.similar import INGREDIENT_STOPWORDS
+
+TOP_K = 5
+
+# How often a word counts per field, so a name match outweighs an ingredient mention
+FIELD_WEIGHTS = {"name": 3, "tags": 2, "macros": 2, "category": 1, "ingredients": 1}
+
+# Words in questions (and recipes) that don't help pick a recipe
+STOPWORDS = INGREDIENT_STOPWORDS | {
+    "what", "which", "how", "many", "much", "can", "could", "should", "would", "give", "some", "any",
+    "idea", "recipe", "meal", "food", "make", "want", "need", "like", "good", "best", "healthy",
+    "you", "your", "are", "is", "does", "have", "that", "this", "please", "leo", "thank", "thanks",
+}
+
+# "high-protein", "Low Carbs" -> "highprotein", "lowcarb", in both recipes and questions
+_MACRO_PHRASE = re.compile(r"\b(high|low)[\s-]+(protein|carb|fat|calorie|cal|sugar|sodium)s?\b")
+
+
+def words(text):
+    text = _MACRO_PHRASE.sub(lambda match: match.group(1) + match.group(2), (text or "").lower())
+    found = re.findall(r"[a-z]{3,}", text)
+    return [word.rstrip("s") for word in found if word not in STOPWORDS]
+
+
+# Labels for how a recipe's calories split, so "high protein" questions find high-protein recipes
+def macro_labels(recipe):
+    calories = max(float(recipe["calories"] or 0), 1.0)
+    labels = []
+    if recipe["protein"] * 4 / calories >= 0.30:
+        labels.append("highprotein")
+    if recipe["carbs"] * 4 / calories <= 0.15:
+        labels.append("lowcarb")
+    if recipe["fat"] * 9 / calories <= 0.20:
+        labels.append("lowfat")
+    if calories <= 400:
+        labels.append("lowcalorie")
+    return labels
+
+
+# One line per recipe, as the model sees it
+def describe(recipe):
+    line = (f"- {recipe['name']} ({recipe['category']}): {recipe['protein']:g} g protein, "
+            f"{recipe['carbs']:g} g carbs, {recipe['fat']:g} g fat, {recipe['calories']:g} kcal")
+    if recipe["tags"]:
+        line += f"; tags: {', '.join(recipe['tags'].split())}"
+    return line
+
+
+def _term_weights(recipe):
+    counts = Counter()
+    fields = {
+        "name": words(recipe["name"]),
+        "tags": words(recipe["tags"]),
+        "macros": macro_labels(recipe),
+        "category": words(recipe["category"]),
+        "ingredients": words(recipe["ingredients"]),
+    }
+    for field, field_words in fields.items():
+        for word in field_words:
+            counts[word] += FIELD_WEIGHTS[field]
+    # Sublinear term frequency, normalized by document length
+    norm = math.sqrt(len(counts)) or 1.0
+    return {term: (1 + math.log(count)) / norm for term, count in counts.items()}
+
+
+class RecipeIndex(IncrementalIndex):
+    # An inverted index: term -> (rows, weights) in growable arrays, so adding recipes only appends.
+    # IDF is applied at query time, which keeps old postings valid as the collection grows.
+    # A query scores only the rows in its terms' postings, accumulated in a NumPy vector.
+    SCAN_QUERY = """
+        SELECT id, name, category, protein, carbs, fat, calories,
+               (SELECT group_concat(tag, ' ') FROM tags WHERE recipe_id = recipes.id) AS tags,
+               (SELECT group_concat(line, ' ') FROM ingredients WHERE recipe_id = recipes.id) AS ingredients
+        FROM recipes WHERE id > ? AND status = 'published' ORDER BY id
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._postings = {}
+        self._ids = []
+        self._lines = []
+        self._row_of = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._ids)
+
+    # Index recipes (mappings with id, name, category, macros, tags and ingredients text)
+    def add(self, recipes):
+        encoded = [(recipe, _term_weights(recipe)) for recipe in recipes if recipe["id"] not in self._row_of]
+        with self._lock:
+            for recipe, weights in encoded:
+                row = len(self._ids)
+                self._ids.append(recipe["id"])
+                self._lines.append(describe(recipe))
+                self._row_of[recipe["id"]] = row
+                for term, weight in weights.items():
+                    postings = self._postings.get(term)
+                    if postings is None:
+                        postings = self._postings[term] = (array("i"), array("f"))
+                    postings[0].append(row)
+                    postings[1].append(weight)
+
+    # Ids and description lines of the k recipes best matching text, best first
+    def search(self, text, k=TOP_K):
+        terms = set(words(text))
+        with self._lock:
+            size = len(self._ids)
+            matched = [(len(self._postings[term][0]), np.array(self._postings[term][0], dtype=np.int64),
+                        np.array(self._postings[term][1], dtype=np.float32))
+                       for term in terms if term in self._postings]
+        if not matched or not size:
+            return [], []
+
+        scores = np.zeros(size, dtype=np.float32)
+        for document_frequency, rows, weights in matched:
+            scores[rows] += math.log(1 + size / document_frequency) * weights
+        candidates = np.flatnonzero(scores)
+        k = min(k, len(candidates))
+        top = candidates[np.argpartition(-scores[candidates], k - 1)[:k]]
+        top = top[np.argsort(-scores[top])]
+        with self._lock:
+            return [self._ids[row] for row in top], [self._lines[row] for row in top]
+
+
+@st.cache_resource
+def get_index():
+    return RecipeIndex()
+
+
+# The shared index, with any newly published recipes loaded
+def current_index():
+    return get_index().current()
+
+
+# System message listing the app's recipes that match a question, or None if nothing matches
+def recipe_context(question, k=TOP_K):
+    _, lines = current_index().search(question, k)
+    if not lines:
+        return None
+    return ("Recipes from this app that match the question (per serving). Suggest them by name when "
+            "they fit; users can find them with the search on the Home page.\n" + "\n".join(lines))
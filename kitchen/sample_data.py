@@ -0,0 +1,100 @@
+# kitchen/sample_data.py
+# Starter catalog loaded into an empty database so the feed has something to show
+
+PLACEHOLDER_IMAGE = "https://api.placeholder.com/640/480"
+
+# (name, category, author, protein, carbs, fat, rating, reviews, days_ago, tags)
+SAMPLE_MEALS = [
+    ("Protein Oatmeal", "Breakfast", "@HealthyChef", 28, 52, 9, 4.6, 88, 3, ["high-protein", "quick"]),
+    ("Greek Yogurt Bowl", "Breakfast", "@FitnessFoodie", 30, 35, 8, 4.7, 142, 14, ["high-protein", "no-cook", "vegetarian"]),
+    ("Egg White Scramble", "Breakfast", "@MacroMaster", 34, 12, 6, 4.2, 37, 21, ["high-protein", "low-carb"]),
+    ("Avocado Toast", "Breakfast", "@VeganVibes", 12, 38, 21, 4.4, 120, 9, ["vegan", "quick"]),
+    ("Protein Pancakes", "Breakfast", "@LeoTheChef", 32, 45, 12, 4.8, 196, 1, ["high-protein", "vegetarian"]),
+    ("Chicken Salad", "Lunch", "@HealthyChef", 38, 14, 16, 4.5, 64, 5, ["high-protein", "low-carb", "gluten-free"]),
+    ("Tuna Wrap", "Lunch", "@MacroMaster", 33, 36, 11, 4.1, 29, 17, ["high-protein", "quick"]),
+    ("Quinoa Bowl", "Lunch", "@VeganVibes", 18, 58, 14, 4.6, 101, 8, ["vegan", "meal-prep"]),
+    ("Turkey Sandwich", "Lunch", "@FitnessFoodie", 29, 41, 10, 3.9, 22, 26, ["quick"]),
+    ("Lentil Soup", "Lunch", "@VeganVibes", 19, 47, 6, 4.3, 55, 12, ["vegan", "meal-prep", "high-fiber"]),
+    ("Mediterranean Bowl", "Lunch", "@LeoTheChef", 28, 52, 15, 4.7, 133, 4, ["vegetarian", "meal-prep"]),
+    ("Salmon with Veggies", "Dinner", "@HealthyChef", 36, 18, 22, 4.9, 178, 2, ["high-protein", "gluten-free"]),
+    ("Steak and Sweet Potato", "Dinner", "@KetoKing", 40, 44, 20, 4.6, 150, 11, ["high-protein"]),
+    ("Chicken Stir Fry", "Dinner", "@MacroMaster", 35, 40, 12, 4.5, 97, 6, ["high-protein", "quick"]),
+    ("Tofu Curry", "Dinner", "@VeganVibes", 21, 49, 18, 4.4, 73, 19, ["vegan"]),
+    ("Turkey Meatballs", "Dinner", "@FitnessFoodie", 34, 22, 15, 4.3, 61, 23, ["high-protein", "meal-prep"]),
+    ("Protein Bar", "Snacks", "@MacroMaster", 20, 24, 7, 4.0, 44, 15, ["high-protein", "meal-prep"]),
+    ("Greek Yogurt", "Snacks", "@HealthyChef", 17, 9, 4, 4.2, 31, 28, ["high-protein", "no-cook"]),
+    ("Hummus and Veggies", "Snacks", "@VeganVibes", 8, 22, 12, 4.5, 58, 7, ["vegan", "no-cook"]),
+    ("Protein Shake", "Snacks", "@FitnessFoodie", 25, 10, 3, 4.1, 84, 10, ["high-protein", "quick"]),
+    ("Apple with Peanut Butter", "Snacks", "@LeoTheChef", 8, 28, 16, 4.6, 112, 13, ["vegetarian", "no-cook"]),
+    ("Chocolate Protein Smoothie", "Snacks", "@LeoTheChef", 24, 30, 8, 4.7, 164, 4, ["high-protein", "quick"]),
+    ("Protein Brownies", "Desserts", "@LeoTheChef", 15, 26, 9, 4.5, 90, 16, ["high-protein", "vegetarian"]),
+    ("Fruit Parfait", "Desserts", "@HealthyChef", 12, 40, 5, 4.3, 47, 20, ["vegetarian", "no-cook"]),
+    ("Protein Cookies", "Desserts", "@MacroMaster", 14, 30, 10, 4.0, 26, 24, ["high-protein"]),
+    ("Frozen Yogurt", "Desserts", "@FitnessFoodie", 10, 34, 4, 4.2, 39, 27, ["vegetarian"]),
+    ("Protein Mug Cake", "Desserts", "@KetoKing", 22, 18, 8, 4.4, 68, 18, ["high-protein", "quick"]),
+]
+
+OVERNIGHT_OATS = {
+    "name": "Protein-Packed Overnight Oats",
+    "category": "Breakfast",
+    "author": "@HealthyChef",
+    "description": "A delicious high-protein breakfast that you can prepare the night before. Perfect for busy "
+                   "mornings when you need a nutritious start to your day without spending time cooking.",
+    "protein": 32, "carbs": 45, "fat": 12, "calories": 420, "fiber": 8, "sugar": 6, "sodium": 120,
+    "prep_time": "5 min", "cook_time": "0 min", "servings": 1,
+    "rating": 4.8, "reviews": 124, "days_ago": 0,
+    "ingredients": [
+        "1/2 cup rolled oats",
+        "1 scoop vanilla protein powder",
+        "1 tablespoon chia seeds",
+        "1 tablespoon almond butter",
+        "1/2 cup almond milk",
+        "1/4 cup Greek yogurt",
+        "1/2 banana, sliced",
+        "1/4 cup berries",
+        "1 teaspoon honey or maple syrup (optional)",
+    ],
+    "instructions": [
+        "In a jar or container, mix oats, protein powder, and chia seeds.",
+        "Add almond milk and Greek yogurt, then stir until well combined.",
+        "Stir in almond butter and sweetener if using.",
+        "Seal the container and refrigerate overnight or for at least 4 hours.",
+        "Before serving, top with sliced banana and berries.",
+    ],
+    "tags": ["high-protein", "meal-prep", "vegetarian", "quick", "no-cook"],
+}
+
+
+# Insert the starter catalog, but only into a database that has no recipes yet
+def seed_sample_recipes(conn):
+    if conn.execute("SELECT 1 FROM recipes LIMIT 1").fetchone():
+        return
+
+    recipes = [
+        dict(name=name, category=category, author=author, protein=protein, carbs=carbs, fat=fat,
+             calories=protein * 4 + carbs * 4 + fat * 9, rating=rating, reviews=reviews, days_ago=days_ago,
+             tags=tags, ingredients=[], instructions=[])
+        for name, category, author, protein, carbs, fat, rating, reviews, days_ago, tags in SAMPLE_MEALS
+    ]
+    recipes.append(OVERNIGHT_OATS)
+
+    for recipe in recipes:
+        c = conn.execute(
+            """
+            INSERT INTO recipes (author, name, description, category, image, instructions, prep_time, cook_time,
+                                 servings, protein, carbs, fat, calories, fiber, sugar, sodium,
+                                 rating_sum, rating_count, created_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?,
+                    datetime('2025-03-01 12:00:00', ?))
+            """,
+            (recipe["author"], recipe["name"], recipe.get("description"), recipe["category"], PLACEHOLDER_IMAGE,
+             "\n".join(recipe["instructions"]), recipe.get("prep_time"), recipe.get("cook_time"),
+             recipe.get("servings", 1), recipe["protein"], recipe["carbs"], recipe["fat"], recipe["calories"],
+             recipe.get("fiber", 0), recipe.get("sugar", 0), recipe.get("sodium", 0),
+             round(recipe["rating"] * recipe["reviews"]), recipe["reviews"], f"-{recipe['days_ago']} days")
+        )
+        recipe_id = c.lastrowid
+        conn.executemany("INSERT INTO ingredients (recipe_id, position, line) VALUES (?, ?, ?)",
+                         [(recipe_id, i, line) for i, line in enumerate(recipe["ingredients"])])
+        conn.executemany("INSERT INTO tags (recipe_id, tag) VALUES (?, ?)",
+                         [(recipe_id, tag) for tag in recipe["tags"]])
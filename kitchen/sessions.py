@@ -0,0 +1,99 @@
+# kitchen/sessions.py
+# "Remember me" logins: a random token in a cookie, stored server-side only as a hash.
+# The cookie is written by a script in the page, so it can't be HttpOnly: any script running on the
+# page can read the token. It is Secure, so it only travels over HTTPS (browsers allow localhost too).
+import hashlib
+import secrets
+
+import streamlit as st
+import streamlit.components.v1 as components
+
+from kitchen import db
+
+SESSION_COOKIE = "leo_session"
+SESSION_DAYS = 30
+
+
+def _token_hash(token):
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+# Create a persistent session for a user and return its token
+def create_session(conn, user_id, days=SESSION_DAYS):
+    # Expired rows are cleared on the way in, using idx_sessions_expires
+    conn.execute("DELETE FROM sessions WHERE expires_at <= datetime('now')")
+    token = secrets.token_urlsafe(32)
+    conn.execute(
+        "INSERT INTO sessions (token_hash, user_id, expires_at) VALUES (?, ?, datetime('now', ?))",
+        (_token_hash(token), user_id, f"+{days} days")
+    )
+    return token
+
+
+# Look up the user behind a token with a single primary-key lookup; None if unknown or expired
+def user_for_token(conn, token):
+    return conn.execute(
+        """
+        SELECT users.id, users.username FROM sessions JOIN users ON users.id = sessions.user_id
+        WHERE sessions.token_hash = ? AND sessions.expires_at > datetime('now')
+        """,
+        (_token_hash(token),)
+    ).fetchone()
+
+
+def delete_session(conn, token):
+    conn.execute("DELETE FROM sessions WHERE token_hash = ?", (_token_hash(token),))
+
+
+# Streamlit can't set cookies from Python, so the cookie is written by a tiny script
+# on the next render (a cookie queued right before st.rerun() would never reach the browser)
+def _queue_cookie(value, max_age):
+    st.session_state.pending_session_cookie = (value, max_age)
+
+
+def write_pending_cookie():
+    pending = st.session_state.pop("pending_session_cookie", None)
+    if pending:
+        value, max_age = pending
+        components.html(
+            f"<script>parent.document.cookie = '{SESSION_COOKIE}={value}; max-age={max_age}; "
+            f"path=/; Secure; SameSite=Lax';</script>",
+            height=0,
+        )
+
+
+# Log a returning browser back in from its cookie. Runs once per Streamlit session,
+# so it costs one lookup at startup instead of a password check.
+def restore_session():
+    write_pending_cookie()
+    if st.session_state.get("session_checked") or st.session_state.get("authenticated"):
+        return
+    st.session_state.session_checked = True
+
+    token = st.context.cookies.get(SESSION_COOKIE)
+    if not token:
+        return
+    with db.connection() as conn:
+        user = user_for_token(conn, token)
+    if user:
+        st.session_state.authenticated = True
+        st.session_state.user_id = user["id"]
+        st.session_state.username = user["username"]
+        st.session_state.session_token = token
+
+
+# Called after a successful login with "Remember me" ticked
+def remember_login(user_id):
+    with db.connection() as conn:
+        token = create_session(conn, user_id)
+    st.session_state.session_token = token
+    _queue_cookie(token, SESSION_DAYS * 24 * 60 * 60)
+
+
+# Called on logout: forget the server-side session and expire the cookie
+def forget_login():
+    token = st.session_state.pop("session_token", None) or st.context.cookies.get(SESSION_COOKIE)
+    if token:
+        with db.connection() as conn:
+            delete_session(conn, token)
+        _queue_cookie("", 0)
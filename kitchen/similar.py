@@ -0,0 +1,150 @@
+# kitchen/similar.py
+# "You might also like": content-based recommendations by cosine similarity
+import re
+import threading
+import zlib
+
+import numpy as np
+import streamlit as st
+
+from kitchen.incremental import IncrementalIndex
+from kitchen.recipes import CATEGORIES
+
+# Vector layout: [macro profile | category one-hot | hashed tags | hashed ingredient words].
+# Tags and ingredient words are feature-hashed into fixed-size blocks, so adding a recipe
+# with new words never changes the dimensions and old rows never need re-encoding.
+MACRO_DIMS = 4
+TAG_DIMS = 16
+INGREDIENT_DIMS = 64
+DIMS = MACRO_DIMS + len(CATEGORIES) + TAG_DIMS + INGREDIENT_DIMS
+
+# How much each block counts towards similarity
+MACRO_WEIGHT = 1.0
+CATEGORY_WEIGHT = 0.6
+TAG_WEIGHT = 0.8
+INGREDIENT_WEIGHT = 0.8
+
+# Words in ingredient lines that say nothing about the food itself
+INGREDIENT_STOPWORDS = {
+    "cup", "cups", "tablespoon", "tablespoons", "tbsp", "teaspoon", "teaspoons", "tsp", "scoop", "scoops",
+    "gram", "grams", "ounce", "ounces", "pound", "pounds", "slice", "slices", "piece", "pieces", "pinch",
+    "and", "or", "of", "the", "for", "with", "optional", "sliced", "chopped", "diced", "minced", "fresh",
+    "large", "small", "medium", "to", "taste",
+}
+
+CATEGORY_INDEX = {category: i for i, category in enumerate(CATEGORIES)}
+
+
+def _hashed_block(words, dims):
+    block = np.zeros(dims, dtype=np.float32)
+    for word in words:
+        block[zlib.crc32(word.encode()) % dims] += 1.0
+    return block
+
+
+def _unit(block):
+    norm = np.linalg.norm(block)
+    return block / norm if norm else block
+
+
+def ingredient_words(text):
+    words = re.findall(r"[a-z]{3,}", (text or "").lower())
+    return [word.rstrip("s") for word in words if word not in INGREDIENT_STOPWORDS]
+
+
+# Encode one recipe (a mapping with category, macros, tags and ingredients text) as a unit vector
+def encode(recipe):
+    calories = max(float(recipe["calories"] or 0), 1.0)
+    macros = np.array([
+        recipe["protein"] * 4 / calories,
+        recipe["carbs"] * 4 / calories,
+        recipe["fat"] * 9 / calories,
+        min(calories / 1000, 1.5),
+    ], dtype=np.float32)
+
+    category = np.zeros(len(CATEGORIES), dtype=np.float32)
+    if recipe["category"] in CATEGORY_INDEX:
+        category[CATEGORY_INDEX[recipe["category"]]] = 1.0
+
+    tags = _hashed_block((recipe["tags"] or "").split(), TAG_DIMS)
+    ingredients = _hashed_block(ingredient_words(recipe["ingredients"]), INGREDIENT_DIMS)
+
+    vector = np.concatenate([
+        MACRO_WEIGHT * _unit(macros),
+        CATEGORY_WEIGHT * category,
+        TAG_WEIGHT * _unit(tags),
+        INGREDIENT_WEIGHT * _unit(ingredients),
+    ])
+    return _unit(vector)
+
+
+class SimilarRecipes(IncrementalIndex):
+    # Row-normalized recipe vectors in one NumPy matrix; a top-k query is a single
+    # matrix-vector product. Rows are appended as recipes are added (ids only grow).
+    SCAN_QUERY = """
+        SELECT id, category, protein, carbs, fat, calories,
+               (SELECT group_concat(tag, ' ') FROM tags WHERE recipe_id = recipes.id) AS tags,
+               (SELECT group_concat(line, ' ') FROM ingredients WHERE recipe_id = recipes.id) AS ingredients
+        FROM recipes WHERE id > ? AND status = 'published' ORDER BY id
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._matrix = np.zeros((0, DIMS), dtype=np.float32)
+        self._ids = np.zeros(0, dtype=np.int64)
+        self._size = 0
+        self._row_of = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return self._size
+
+    def __contains__(self, recipe_id):
+        return recipe_id in self._row_of
+
+    # Append encoded recipes, growing the matrix geometrically so appends are amortized O(1)
+    def add(self, recipes):
+        recipes = [recipe for recipe in recipes if recipe["id"] not in self._row_of]
+        vectors = [encode(recipe) for recipe in recipes]
+        if not vectors:
+            return
+        with self._lock:
+            needed = self._size + len(vectors)
+            if needed > len(self._matrix):
+                capacity = max(needed, 2 * len(self._matrix), 1024)
+                matrix = np.zeros((capacity, DIMS), dtype=np.float32)
+                matrix[:self._size] = self._matrix[:self._size]
+                ids = np.zeros(capacity, dtype=np.int64)
+                ids[:self._size] = self._ids[:self._size]
+                self._matrix, self._ids = matrix, ids
+            self._matrix[self._size:needed] = np.vstack(vectors)
+            for offset, recipe in enumerate(recipes):
+                self._ids[self._size + offset] = recipe["id"]
+                self._row_of[recipe["id"]] = self._size + offset
+            self._size = needed
+
+    # Ids of the k recipes most similar to recipe_id, best first
+    def similar(self, recipe_id, k=3):
+        with self._lock:
+            row = self._row_of.get(recipe_id)
+            if row is None or self._size < 2:
+                return []
+            matrix, ids = self._matrix[:self._size], self._ids[:self._size]
+            scores = matrix @ matrix[row]
+        scores[row] = -np.inf
+        k = min(k, len(scores) - 1)
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [int(recipe_id) for recipe_id in ids[top]]
+
+
+@st.cache_resource
+def get_engine():
+    return SimilarRecipes()
+
+
+# Recommendations for the detail page; the engine picks up new recipes incrementally
+# (right away when asked about a recipe it hasn't seen)
+def similar_recipe_ids(recipe_id, k=3):
+    engine = get_engine()
+    return engine.current(force=recipe_id not in engine).similar(recipe_id, k)
@@ -0,0 +1,19 @@
+# kitchen/users.py
+# User profile lookups shared by the Authentication and My Profile pages
+
+STAT_LABELS = {
+    "recipes_shared": "Recipes Shared",
+    "saved_recipes": "Saved Recipes",
+    "total_likes": "Total Likes",
+    "comments": "Comments",
+}
+
+
+# Activity counters for the dashboards: a single-row read of user_stats,
+# which triggers keep up to date as recipes, saves, likes and comments change
+def get_user_stats(conn, user_id):
+    row = conn.execute(
+        "SELECT recipes_shared, saved_recipes, total_likes, comments FROM user_stats WHERE user_id = ?",
+        (user_id,)
+    ).fetchone()
+    return dict(row) if row else dict.fromkeys(STAT_LABELS, 0)
@@ -0,0 +1,103 @@
+# kitchen/writer.py
+# Background write queue. Sessions hand write jobs to one writer thread, which commits
+# whatever has piled up as a single transaction (a "group commit"): a burst of posts costs
+# a few fsyncs and never has sessions queueing on SQLite's write lock one by one.
+import queue
+import threading
+from concurrent.futures import Future
+
+import streamlit as st
+
+from kitchen import db
+
+MAX_BATCH = 64
+WRITE_TIMEOUT_SECONDS = 30
+
+_STOP = object()
+
+
+class WriteQueue:
+    def __init__(self, path=db.DB_PATH, max_batch=MAX_BATCH):
+        self.path = path
+        self.max_batch = max_batch
+        self._jobs = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="kitchen-writer", daemon=True)
+        self._thread.start()
+
+    # Queue `job(conn, *args)`; the returned future resolves once the job's group has committed.
+    # Each job runs in its own savepoint, so a failing job only rolls back itself.
+    def submit(self, job, *args):
+        future = Future()
+        self._jobs.put((job, args, future))
+        return future
+
+    # Submit and wait, for callers that need the result (e.g. the new recipe id)
+    def write(self, job, *args, timeout=WRITE_TIMEOUT_SECONDS):
+        return self.submit(job, *args).result(timeout=timeout)
+
+    # Finish the queued jobs, then stop the thread
+    def close(self):
+        self._jobs.put(_STOP)
+        self._thread.join()
+
+    # The first job blocks; everything queued behind it (while the last group was committing) joins it
+    def _next_batch(self):
+        batch = [self._jobs.get()]
+        while len(batch) < self.max_batch and batch[-1] is not _STOP:
+            try:
+                batch.append(self._jobs.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        conn = db.connect(self.path)
+        conn.isolation_level = None  # transactions are managed explicitly below
+        try:
+            while True:
+                batch = self._next_batch()
+                stopping = batch[-1] is _STOP
+                if stopping:
+                    batch.pop()
+                if batch:
+                    self._commit_group(conn, batch)
+                if stopping:
+                    return
+        finally:
+            conn.close()
+
+    def _commit_group(self, conn, batch):
+        done = []
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            for job, args, future in batch:
+                if not future.set_running_or_notify_cancel():
+                    continue
+                conn.execute("SAVEPOINT job")
+                try:
+                    result = job(conn, *args)
+                except Exception as exc:
+                    conn.execute("ROLLBACK TO job")
+                    conn.execute("RELEASE job")
+                    future.set_exception(exc)
+                else:
+                    conn.execute("RELEASE job")
+                    done.append((future, result))
+            conn.execute("COMMIT")
+        except Exception as exc:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            # Nothing in the group was committed, including jobs that ran fine
+            for job, args, future in batch:
+                if not future.done():
+                    future.set_exception(exc)
+            return
+        for future, result in done:
+            future.set_result(result)
+
+
+# Process-wide writer, started after the schema is migrated
+@st.cache_resource
+def get_writer():
+    db.get_pool()
+    return WriteQueue(db.DB_PATH)
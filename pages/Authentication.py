@@ -1,11 +1,11 @@
 # pages/auth.py
 import streamlit as st
-import pandas as pd
-import hashlib
 import sqlite3
 import re
 from datetime import datetime
 
+from kitchen import auth, db, ratelimit, sessions, users
+
 # Page configuration
 st.set_page_config(page_title="Login/Register - Leo's Food App", page_icon="🐱", layout="wide")
 
@@ -18,41 +18,11 @@ st.set_page_config(page_title="Login/Register - Leo's Food App", page_icon="🐱
 # st.sidebar.page_link("pages/post_meal.py", label="📝 Share Your Meal")
 # st.sidebar.page_link("pages/auth.py", label="👤 Login/Register")
 
-# Database initialization function
-def init_db():
-    conn = sqlite3.connect('food_app.db', check_same_thread=False)
-    c = conn.cursor()
-    
-    # Create users table if it doesn't exist
-    c.execute('''
-    CREATE TABLE IF NOT EXISTS users (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        username TEXT UNIQUE NOT NULL,
-        email TEXT UNIQUE NOT NULL,
-        password_hash TEXT NOT NULL,
-        full_name TEXT,
-        bio TEXT,
-        profile_pic TEXT,
-        date_joined TEXT,
-        is_premium BOOLEAN DEFAULT 0
-    )
-    ''')
-    
-    conn.commit()
-    return conn
-
-# Hash password function
-def hash_password(password):
-    return hashlib.sha256(password.encode()).hexdigest()
-
 # Email validation function
 def is_valid_email(email):
     pattern = r"^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$"
     return re.match(pattern, email) is not None
 
-# Initialize database connection
-conn = init_db()
-
 # Initialize session state variables if they don't exist
 if 'authenticated' not in st.session_state:
     st.session_state.authenticated = False
@@ -61,8 +31,12 @@ if 'username' not in st.session_state:
 if 'user_id' not in st.session_state:
     st.session_state.user_id = None
 
+# Log returning "Remember me" users back in from their session cookie
+sessions.restore_session()
+
 # Logout function
 def logout():
+    sessions.forget_login()
     st.session_state.authenticated = False
     st.session_state.username = ""
     st.session_state.user_id = None
@@ -81,10 +55,9 @@ if st.session_state.authenticated:
         
     with col2:
         # Fetch user info from database
-        c = conn.cursor()
-        c.execute("SELECT full_name, bio, date_joined, is_premium FROM users WHERE id = ?", 
-                 (st.session_state.user_id,))
-        user_info = c.fetchone()
+        with db.connection() as conn:
+            user_info = conn.execute("SELECT full_name, bio, date_joined, is_premium FROM users WHERE id = ?",
+                                     (st.session_state.user_id,)).fetchone()
         
         if user_info:
             full_name, bio, date_joined, is_premium = user_info
@@ -99,16 +72,13 @@ if st.session_state.authenticated:
     # Activity overview
     st.subheader("Your Activity")
     
-    metric_col1, metric_col2, metric_col3, metric_col4 = st.columns(4)
+    with db.connection() as conn:
+        stats = users.get_user_stats(conn, st.session_state.user_id)
     
-    with metric_col1:
-        st.metric("Recipes Shared", "12")
-    with metric_col2:
-        st.metric("Saved Recipes", "34")
-    with metric_col3:
-        st.metric("Total Likes", "156")
-    with metric_col4:
-        st.metric("Comments", "28")
+    metric_cols = st.columns(len(users.STAT_LABELS))
+    for metric_col, (key, label) in zip(metric_cols, users.STAT_LABELS.items()):
+        with metric_col:
+            st.metric(label, stats[key])
     
     # Recent activity
     st.subheader("Recent Activity")
@@ -139,24 +109,54 @@ else:
                 if not username_email or not password:
                     st.error("Please fill in all fields.")
                 else:
-                    # Check if input is email or username
-                    if '@' in username_email:
-                        query = "SELECT id, username, password_hash FROM users WHERE email = ?"
+                    # Throttle per account and per client before doing any hashing
+                    limiter = ratelimit.get_login_limiter()
+                    throttle_keys = ratelimit.login_keys(username_email)
+                    allowed, retry_after = limiter.acquire(*throttle_keys)
+                    
+                    if not allowed:
+                        st.error(f"Too many login attempts. Please try again in {ratelimit.format_retry_after(retry_after)}.")
                     else:
-                        query = "SELECT id, username, password_hash FROM users WHERE username = ?"
+                        # Check if input is email or username
+                        if '@' in username_email:
+                            query = "SELECT id, username, password_hash FROM users WHERE email = ?"
+                        else:
+                            query = "SELECT id, username, password_hash FROM users WHERE username = ?"
                     
-                    c = conn.cursor()
-                    c.execute(query, (username_email,))
-                    user_data = c.fetchone()
+                        with db.connection() as conn:
+                            user_data = conn.execute(query, (username_email,)).fetchone()
                     
-                    if user_data and user_data[2] == hash_password(password):
-                        st.session_state.authenticated = True
-                        st.session_state.user_id = user_data[0]
-                        st.session_state.username = user_data[1]
-                        st.success("Login successful!")
-                        st.rerun()
-                    else:
-                        st.error("Invalid username/email or password.")
+                        try:
+                            password_ok, needs_rehash = auth.verify_password(password, user_data[2] if user_data else None)
+                        except TimeoutError:
+                            password_ok = needs_rehash = None
+                    
+                        if password_ok is None:
+                            st.error("We're handling a lot of logins right now. Please try again in a moment.")
+                        elif password_ok:
+                            # Upgrade legacy SHA-256 (or outdated scrypt) hashes now that we know the password.
+                            # If the hashing pool is busy the upgrade waits for the next login.
+                            if needs_rehash:
+                                try:
+                                    new_hash = auth.hash_password(password)
+                                except TimeoutError:
+                                    new_hash = None
+                                if new_hash:
+                                    with db.connection() as conn:
+                                        conn.execute("UPDATE users SET password_hash = ? WHERE id = ?", (new_hash, user_data[0]))
+                        
+                            limiter.record_success(throttle_keys[0])
+                            if remember_me:
+                                sessions.remember_login(user_data[0])
+                        
+                            st.session_state.authenticated = True
+                            st.session_state.user_id = user_data[0]
+                            st.session_state.username = user_data[1]
+                            st.success("Login successful!")
+                            st.rerun()
+                        else:
+                            limiter.record_failure(*throttle_keys)
+                            st.error("Invalid username/email or password.")
         
         # Password recovery link
         st.markdown("[Forgot your password?](#)")
@@ -188,13 +188,15 @@ else:
                     st.error("You must agree to the Terms of Service and Privacy Policy.")
                 else:
                     try:
+                        # Hash outside the database transaction so the connection isn't held meanwhile
+                        password_hash = auth.hash_password(reg_password)
+                        
                         # Insert new user into database
-                        c = conn.cursor()
-                        c.execute(
-                            "INSERT INTO users (username, email, password_hash, full_name, date_joined) VALUES (?, ?, ?, ?, ?)",
-                            (reg_username, reg_email, hash_password(reg_password), reg_full_name, datetime.now().strftime("%Y-%m-%d"))
-                        )
-                        conn.commit()
+                        with db.connection() as conn:
+                            c = conn.execute(
+                                "INSERT INTO users (username, email, password_hash, full_name, date_joined) VALUES (?, ?, ?, ?, ?)",
+                                (reg_username, reg_email, password_hash, reg_full_name, datetime.now().strftime("%Y-%m-%d"))
+                            )
                         
                         # Set session state
                         st.session_state.authenticated = True
@@ -206,6 +208,8 @@ else:
                         
                     except sqlite3.IntegrityError:
                         st.error("Username or email already exists. Please choose a different one.")
+                    except TimeoutError:
+                        st.error("We're handling a lot of sign-ups right now. Please try again in a moment.")
         
         # Terms and conditions
         st.markdown("By creating an account, you agree to our [Terms of Service](#) and [Privacy Policy](#).")
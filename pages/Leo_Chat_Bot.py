@@ -1,9 +1,11 @@
 import streamlit as st
-from openai import OpenAI
 
-st.title("Ask Leo!")
+from kitchen import chat, chat_cache, chat_history, db, sessions
+
+# Log returning "Remember me" users back in from their session cookie
+sessions.restore_session()
 
-client = OpenAI(api_key=st.secrets["OPENAI_API_KEY"])
+st.title("Ask Leo!")
 
 # --- SIDEBAR NAVIGATION ---
 # st.sidebar.title("Navigation")
@@ -16,25 +18,69 @@ client = OpenAI(api_key=st.secrets["OPENAI_API_KEY"])
 # st.sidebar.page_link("pages/Authentication.py", label="🔑 Login/Register")
 
 
-# Chat History
-if "messages" not in st.session_state:
-    st.session_state.messages = []
+# Chat History: transcripts are stored per conversation. Signed-in users get their latest one back,
+# and the ?chat= token in the URL finds an anonymous chat again after a reconnect.
+user_id = st.session_state.user_id if st.session_state.get("authenticated") else None
+if "chat_id" not in st.session_state or st.session_state.get("chat_user") != user_id:
+    with db.connection() as conn:
+        chat_id = chat_history.resume_conversation(conn, user_id, st.query_params.get("chat"))
+        conversation = chat_history.load_conversation(conn, chat_id) if chat_id else chat.Conversation()
+    st.session_state.chat_id = chat_id
+    st.session_state.chat_user = user_id
+    st.session_state.conversation = conversation
+    # Oldest message shown; None shows the latest page only
+    st.session_state.chat_since_id = None
+chat_id = st.session_state.chat_id
+conversation = st.session_state.conversation
+
+if chat_id:
+    if st.button("🆕 New chat"):
+        st.session_state.chat_id = None
+        st.session_state.conversation = chat.Conversation()
+        st.session_state.chat_since_id = None
+        st.query_params.pop("chat", None)
+        st.rerun()
 
-for message in st.session_state.messages:
-    with st.chat_message(message["role"]):
-        st.markdown(message["content"])
+    with db.connection() as conn:
+        messages = chat_history.transcript(conn, chat_id, st.session_state.chat_since_id)
+        earlier_id = chat_history.earlier_page_start(conn, chat_id, messages[0]["id"]) if messages else None
+    if earlier_id and st.button("⬆️ Load earlier messages"):
+        st.session_state.chat_since_id = earlier_id
+        st.rerun()
+
+    for message in messages:
+        with st.chat_message(message["role"]):
+            st.markdown(message["content"])
 
 prompt = st.chat_input("Say something")
 if prompt:
     with st.chat_message("user"):
         st.markdown(prompt)
-    st.session_state.messages.append({"role": "user", "content": prompt})
+    with db.connection() as conn:
+        if chat_id is None:
+            chat_id, token = chat_history.create_conversation(conn, user_id)
+            st.session_state.chat_id = chat_id
+            st.query_params["chat"] = token
+        message_id = chat_history.add_message(conn, chat_id, "user", prompt)
+    conversation.add("user", prompt, message_id)
+    summarized_id = conversation.summarized_id
 
     with st.chat_message("assistant"):
-        stream = client.chat.completions.create(
-            model="gpt-4o",
-            messages=st.session_state.messages,
-            stream=True
-        )
+        # Ground the answer in matching recipes from our own collection. The recipe index (NumPy)
+        # and the OpenAI client are loaded on the first question, not on every page view.
+        from kitchen import retrieval
+
+        context = retrieval.recipe_context(prompt)
+        stream = conversation.stream_reply(chat.get_client(), extra_system=context, cache=chat_cache.get_cache())
         response = st.write_stream(stream)
-    st.session_state.messages.append({"role": "assistant", "content": response})
+    with db.connection() as conn:
+        message_id = chat_history.add_message(conn, chat_id, "assistant", response)
+        if conversation.summarized_id != summarized_id:
+            chat_history.save_summary(conn, chat_id, conversation.summary, conversation.summarized_id)
+    conversation.add("assistant", response, message_id)
+
+# Answer cache counters (all sessions since the server started), for whoever runs the app
+with st.sidebar.expander("Answer cache"):
+    cache_stats = chat_cache.get_cache().stats()
+    st.caption(f"{cache_stats['hits']} hits · {cache_stats['misses']} misses ({cache_stats['hit_rate']:.0%} hit rate) · "
+               f"{cache_stats['entries']} stored answers")
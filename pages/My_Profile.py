@@ -1,8 +1,8 @@
 # pages/profile.py
 import streamlit as st
-import pandas as pd
-import plotly.express as px
-import sqlite3
+from datetime import date, datetime
+
+from kitchen import charts, db, meal_log, planner, recipes, sessions, users
 
 # Page configuration
 st.set_page_config(page_title="My Profile - Leo's Food App", page_icon="🐱", layout="wide")
@@ -17,25 +17,27 @@ st.set_page_config(page_title="My Profile - Leo's Food App", page_icon="🐱", l
 # st.sidebar.page_link("pages/profile.py", label="👤 My Profile")
 # st.sidebar.page_link("pages/auth.py", label="🔑 Login/Register")
 
-# Initialize database connection
-def get_db_connection():
-    conn = sqlite3.connect('food_app.db', check_same_thread=False)
-    return conn
+# Format a stored timestamp like "Feb 28, 2025"
+def format_date(timestamp):
+    return datetime.strptime(timestamp, "%Y-%m-%d %H:%M:%S").strftime("%b %d, %Y")
+
+# Log returning "Remember me" users back in from their session cookie
+sessions.restore_session()
 
 # Check authentication status
 if 'authenticated' not in st.session_state or not st.session_state.authenticated:
     st.warning("Please log in to view your profile")
-    st.button("Go to Login Page", on_click=lambda: st.switch_page("pages/auth.py"))
+    st.button("Go to Login Page", on_click=lambda: st.switch_page("pages/Authentication.py"))
 else:
     # Get user data
-    conn = get_db_connection()
-    c = conn.cursor()
-    c.execute("""
-        SELECT username, email, full_name, bio, profile_pic, date_joined, is_premium 
-        FROM users WHERE id = ?
-    """, (st.session_state.user_id,))
-    
-    user_data = c.fetchone()
+    with db.connection() as conn:
+        user_data = conn.execute("""
+            SELECT username, email, full_name, bio, profile_pic, date_joined, is_premium 
+            FROM users WHERE id = ?
+        """, (st.session_state.user_id,)).fetchone()
+        stats = users.get_user_stats(conn, st.session_state.user_id)
+        user_recipes = recipes.user_recipes(conn, st.session_state.user_id)
+        saved_recipes = recipes.saved_recipes(conn, st.session_state.user_id)
     
     if not user_data:
         st.error("User data not found. Please try logging in again.")
@@ -67,64 +69,137 @@ else:
             # Edit profile button
             st.button("Edit Profile")
         
+        # Activity counters
+        stat_cols = st.columns(len(users.STAT_LABELS))
+        for stat_col, (key, label) in zip(stat_cols, users.STAT_LABELS.items()):
+            with stat_col:
+                st.metric(label, stats[key])
+        
         # --- TABS FOR DIFFERENT SECTIONS ---
-        tab1, tab2, tab3 = st.tabs(["My Stats", "My Recipes", "Saved Recipes"])
+        tab1, tab_plan, tab2, tab3 = st.tabs(["My Stats", "Meal Plan", "My Recipes", "Saved Recipes"])
         
         with tab1:
             st.subheader("Nutrition Summary")
             
-            # Mock data for user's nutrition history
-            dates = pd.date_range(start='2025-02-01', end='2025-03-01')
-            nutrition_data = pd.DataFrame({
-                'Date': dates,
-                'Protein': [round(100 + i*1.5) for i in range(len(dates))],
-                'Carbs': [round(150 - i) for i in range(len(dates))],
-                'Fat': [round(50 + i*0.5) for i in range(len(dates))],
-                'Calories': [round(1800 + i*10) for i in range(len(dates))]
-            })
+            date_range = st.selectbox("Date range", list(charts.DATE_RANGES), index=1)
+            
+            # Chart bounds plus the summaries, all read from the rollups
+            today = date.today()
+            with db.connection() as conn:
+                range_start, range_end = charts.range_bounds(conn, st.session_state.user_id, date_range, today)
+                log_version = meal_log.log_version(conn, st.session_state.user_id)
+                this_week, last_week = meal_log.weekly_averages(conn, st.session_state.user_id, today)
+                monthly_data = meal_log.rollups(conn, st.session_state.user_id, "month",
+                                                date(today.year - 1, today.month, 1), today)
+            
+            # Log something eaten outside the recipe pages
+            with st.expander("➕ Log a meal"):
+                with st.form("log_meal_form", clear_on_submit=True):
+                    log_col1, log_col2, log_col3, log_col4, log_col5 = st.columns(5)
+                    with log_col1:
+                        log_day = st.date_input("Day", value=today, max_value=today, key="log_day")
+                    with log_col2:
+                        log_protein = st.number_input("Protein (g)", min_value=0, value=0, key="log_protein")
+                    with log_col3:
+                        log_carbs = st.number_input("Carbs (g)", min_value=0, value=0, key="log_carbs")
+                    with log_col4:
+                        log_fat = st.number_input("Fat (g)", min_value=0, value=0, key="log_fat")
+                    with log_col5:
+                        log_calories = st.number_input("Calories", min_value=0, value=0, key="log_calories")
+                    if st.form_submit_button("Log meal"):
+                        logged_at = datetime.combine(log_day, datetime.now().time())
+                        with db.connection() as conn:
+                            meal_log.log_meal(conn, st.session_state.user_id, log_protein, log_carbs, log_fat,
+                                              log_calories, logged_at=logged_at)
+                        st.rerun()
+            
+            if not log_version:
+                st.info("Log meals from any recipe page or with the form above to see your trends here.")
+            
+            # Downsampled figures, cached until the range or the user's log changes
+            fig, fig2 = charts.nutrition_figures(st.session_state.user_id, range_start.isoformat(),
+                                                 range_end.isoformat(), date_range, log_version)
             
             # Nutrition trend chart
             st.subheader("Your Macro Trends")
-            fig = px.line(nutrition_data, x='Date', y=['Protein', 'Carbs', 'Fat'], 
-                          title='Daily Macro Nutrients (Last 30 Days)')
             st.plotly_chart(fig, use_container_width=True)
             
             # Calorie tracking
             st.subheader("Calorie Tracking")
-            fig2 = px.bar(nutrition_data, x='Date', y='Calories', 
-                          title='Daily Calorie Intake (Last 30 Days)')
             st.plotly_chart(fig2, use_container_width=True)
             
-            # Weekly summary stats
+            # Weekly summary stats: this week's average per logged day against last week's
             st.subheader("Weekly Summary")
-            weekly_data = nutrition_data.tail(7)
-            
-            avg_col1, avg_col2, avg_col3, avg_col4 = st.columns(4)
-            with avg_col1:
-                st.metric("Avg. Protein", f"{round(weekly_data['Protein'].mean())}g", 
-                          f"{round(weekly_data['Protein'].mean() - weekly_data['Protein'].iloc[0])}g")
-            with avg_col2:
-                st.metric("Avg. Carbs", f"{round(weekly_data['Carbs'].mean())}g", 
-                          f"{round(weekly_data['Carbs'].mean() - weekly_data['Carbs'].iloc[0])}g")
-            with avg_col3:
-                st.metric("Avg. Fat", f"{round(weekly_data['Fat'].mean())}g", 
-                          f"{round(weekly_data['Fat'].mean() - weekly_data['Fat'].iloc[0])}g")
-            with avg_col4:
-                st.metric("Avg. Calories", f"{round(weekly_data['Calories'].mean())}", 
-                          f"{round(weekly_data['Calories'].mean() - weekly_data['Calories'].iloc[0])}")
+            
+            avg_cols = st.columns(4)
+            for avg_col, (label, macro, unit) in zip(avg_cols, [
+                ("Avg. Protein", "protein", "g"), ("Avg. Carbs", "carbs", "g"),
+                ("Avg. Fat", "fat", "g"), ("Avg. Calories", "calories", ""),
+            ]):
+                with avg_col:
+                    st.metric(label, f"{round(this_week[macro])}{unit}",
+                              f"{round(this_week[macro] - last_week[macro])}{unit}")
+            
+            # Monthly history
+            if not monthly_data.empty:
+                st.subheader("Monthly Summary")
+                monthly_table = monthly_data[meal_log.MACRO_COLUMNS].div(monthly_data["days"], axis=0).round()
+                monthly_table.columns = [f"Avg. {macro.title()}" for macro in meal_log.MACRO_COLUMNS]
+                monthly_table.insert(0, "Meals Logged", monthly_data["entries"])
+                monthly_table.index = monthly_table.index.strftime("%B %Y")
+                st.dataframe(monthly_table.iloc[::-1], use_container_width=True)
+        
+        with tab_plan:
+            st.subheader("Daily Meal Plan")
+            st.write("Set your daily targets and we'll pick a breakfast, lunch, dinner and snack that add up to them.")
+            
+            plan_col1, plan_col2, plan_col3, plan_col4, plan_col5 = st.columns(5)
+            with plan_col1:
+                plan_protein = st.number_input("Protein (g)", min_value=0, value=150, key="plan_protein")
+            with plan_col2:
+                plan_carbs = st.number_input("Carbs (g)", min_value=0, value=200, key="plan_carbs")
+            with plan_col3:
+                plan_fat = st.number_input("Fat (g)", min_value=0, value=60, key="plan_fat")
+            with plan_col4:
+                plan_calories = st.number_input("Calories", min_value=0, value=1940, key="plan_calories")
+            with plan_col5:
+                plan_date = st.date_input("Day", value=date.today(), key="plan_date")
+            include_dessert = st.checkbox("Include a dessert", key="plan_dessert")
+            
+            plan = planner.daily_plan(plan_protein, plan_carbs, plan_fat, plan_calories, plan_date.isoformat(),
+                                      include_dessert)
+            cards_by_id = {card["id"]: card for card in recipes.cached_cards(tuple(plan.values()))}
+            planned = {slot: cards_by_id[recipe_id] for slot, recipe_id in plan.items() if recipe_id in cards_by_id}
+            
+            if not planned:
+                st.write("Set at least one target to build a plan.")
+            else:
+                plan_cols = st.columns(len(planned))
+                for plan_col, (slot, meal) in zip(plan_cols, planned.items()):
+                    with plan_col:
+                        st.caption(slot)
+                        st.image(meal["image"], use_column_width=True)
+                        st.markdown(f"**{meal['name']}**")
+                        st.write(f"{meal['protein']}g P • {meal['carbs']}g C • {meal['fat']}g F • {meal['calories']} kcal")
+                        if st.button("View Recipe", key=f"plan_view_{slot}"):
+                            st.switch_page("pages/Recipe_Detail.py", query_params={"id": meal["id"]})
+                
+                # Day totals against the targets
+                total_cols = st.columns(4)
+                for total_col, (label, macro, target, unit) in zip(total_cols, [
+                    ("Protein", "protein", plan_protein, "g"), ("Carbs", "carbs", plan_carbs, "g"),
+                    ("Fat", "fat", plan_fat, "g"), ("Calories", "calories", plan_calories, ""),
+                ]):
+                    total = sum(meal[macro] for meal in planned.values())
+                    with total_col:
+                        st.metric(f"Total {label}", f"{total}{unit}", f"{total - target:+}{unit} vs target",
+                                  delta_color="off")
         
         with tab2:
             st.subheader("My Shared Recipes")
             
-            # Mock data for user's recipes
-            user_recipes = [
-                {"name": "Protein Pancakes", "date": "Feb 28, 2025", "likes": 24, "comments": 3, 
-                 "image": "https://api.placeholder.com/300/200"},
-                {"name": "Chicken Avocado Wrap", "date": "Feb 20, 2025", "likes": 18, "comments": 2, 
-                 "image": "https://api.placeholder.com/300/200"},
-                {"name": "Greek Yogurt Bowl", "date": "Feb 15, 2025", "likes": 32, "comments": 5, 
-                 "image": "https://api.placeholder.com/300/200"}
-            ]
+            if not user_recipes:
+                st.write("You haven't shared any recipes yet.")
             
             for i, recipe in enumerate(user_recipes):
                 col1, col2 = st.columns([1, 3])
@@ -134,12 +209,13 @@ else:
                     
                 with col2:
                     st.subheader(recipe["name"])
-                    st.write(f"Posted on: {recipe['date']}")
-                    st.write(f"❤️ {recipe['likes']} likes • 💬 {recipe['comments']} comments")
+                    st.write(f"Posted on: {format_date(recipe['created_at'])}")
+                    st.write(f"❤️ {recipe['like_count']} likes • 💬 {recipe['comment_count']} comments")
                     
                     action_col1, action_col2, action_col3 = st.columns(3)
                     with action_col1:
-                        st.button("View Recipe", key=f"view_{i}")
+                        if st.button("View Recipe", key=f"view_{i}"):
+                            st.switch_page("pages/Recipe_Detail.py", query_params={"id": recipe["id"]})
                     with action_col2:
                         st.button("Edit", key=f"edit_{i}")
                     with action_col3:
@@ -147,22 +223,13 @@ else:
                         
                 st.divider()
             
-            st.button("Create New Recipe", on_click=lambda: st.switch_page("pages/post_meal.py"))
+            st.button("Create New Recipe", on_click=lambda: st.switch_page("pages/Share_Your_Meals.py"))
         
         with tab3:
             st.subheader("Recipes You've Saved")
             
-            # Mock data for saved recipes
-            saved_recipes = [
-                {"name": "Banana Protein Muffins", "author": "@HealthyBaker", "date_saved": "Mar 1, 2025", 
-                 "image": "https://api.placeholder.com/300/200"},
-                {"name": "Quinoa Salad Bowl", "author": "@NutritionChef", "date_saved": "Feb 25, 2025", 
-                 "image": "https://api.placeholder.com/300/200"},
-                {"name": "Low-Carb Pizza", "author": "@KetoKing", "date_saved": "Feb 20, 2025", 
-                 "image": "https://api.placeholder.com/300/200"},
-                {"name": "Protein Ice Cream", "author": "@FitnessFoodie", "date_saved": "Feb 18, 2025", 
-                 "image": "https://api.placeholder.com/300/200"}
-            ]
+            if not saved_recipes:
+                st.write("Recipes you save will show up here.")
             
             saved_grid_cols = st.columns(2)
             
@@ -170,11 +237,12 @@ else:
                 with saved_grid_cols[i % 2]:
                     st.image(recipe["image"], use_column_width=True)
                     st.subheader(recipe["name"])
-                    st.write(f"By {recipe['author']} • Saved on {recipe['date_saved']}")
+                    st.write(f"By {recipe['author']} • Saved on {format_date(recipe['saved_at'])}")
                     
                     view_col, unsave_col = st.columns(2)
                     with view_col:
-                        st.button("View Recipe", key=f"saved_view_{i}")
+                        if st.button("View Recipe", key=f"saved_view_{i}"):
+                            st.switch_page("pages/Recipe_Detail.py", query_params={"id": recipe["id"]})
                     with unsave_col:
                         st.button("Unsave", key=f"saved_unsave_{i}")
                     
@@ -1,9 +1,9 @@
 # pages/recipe_detail.py
 import streamlit as st
-import pandas as pd
-import plotly.express as px
 from datetime import datetime
 
+from kitchen import charts, db, meal_log, recipes, sessions, similar
+
 # Page configuration
 st.set_page_config(page_title="Recipe Details - Leo's Food App", page_icon="🐱", layout="wide")
 
@@ -15,57 +15,63 @@ st.set_page_config(page_title="Recipe Details - Leo's Food App", page_icon="🐱
 # st.sidebar.page_link("pages/chatbot.py", label="🤖 Chat Bot")
 # st.sidebar.page_link("pages/post_meal.py", label="📝 Share Your Meal")
 
-# Get recipe ID from query parameters (would be implemented in a real app)
-# For demo purposes, let's create a sample recipe
-recipe = {
-    "id": 1,
-    "name": "Protein-Packed Overnight Oats",
-    "user": "@HealthyChef",
-    "user_profile_pic": "https://api.placeholder.com/100/100",
-    "date_posted": "February 28, 2025",
-    "image": "https://api.placeholder.com/800/600",
-    "category": "Breakfast",
-    "description": "A delicious high-protein breakfast that you can prepare the night before. Perfect for busy mornings when you need a nutritious start to your day without spending time cooking.",
-    "rating": 4.8,
-    "reviews": 124,
-    "protein": 32,
-    "carbs": 45,
-    "fat": 12,
-    "calories": 420,
-    "fiber": 8,
-    "sugar": 6,
-    "sodium": 120,
-    "prep_time": "5 min",
-    "cook_time": "0 min",
-    "total_time": "5 min + overnight",
-    "servings": 1,
-    "ingredients": [
-        "1/2 cup rolled oats",
-        "1 scoop vanilla protein powder",
-        "1 tablespoon chia seeds",
-        "1 tablespoon almond butter",
-        "1/2 cup almond milk",
-        "1/4 cup Greek yogurt",
-        "1/2 banana, sliced",
-        "1/4 cup berries",
-        "1 teaspoon honey or maple syrup (optional)"
-    ],
-    "instructions": [
-        "In a jar or container, mix oats, protein powder, and chia seeds.",
-        "Add almond milk and Greek yogurt, then stir until well combined.",
-        "Stir in almond butter and sweetener if using.",
-        "Seal the container and refrigerate overnight or for at least 4 hours.",
-        "Before serving, top with sliced banana and berries."
-    ],
-    "tags": ["high-protein", "meal-prep", "vegetarian", "quick", "no-cook"],
-    "saved_count": 342,
-    "likes": 518,
-    "similar_recipes": [
-        {"id": 2, "name": "Protein Pancakes", "image": "https://api.placeholder.com/150/150"},
-        {"id": 3, "name": "Greek Yogurt Bowl", "image": "https://api.placeholder.com/150/150"},
-        {"id": 4, "name": "Protein Smoothie", "image": "https://api.placeholder.com/150/150"}
-    ]
-}
+# Initialize session state variables if they don't exist
+if 'authenticated' not in st.session_state:
+    st.session_state.authenticated = False
+if 'user_id' not in st.session_state:
+    st.session_state.user_id = None
+
+# Log returning "Remember me" users back in from their session cookie
+sessions.restore_session()
+
+# Get recipe ID from query parameters, e.g. /Recipe_Detail?id=12
+try:
+    recipe_id = int(st.query_params.get("id", ""))
+except ValueError:
+    recipe_id = None
+
+recipe = recipes.cached_recipe(recipe_id) if recipe_id is not None else None
+if recipe is None:
+    st.warning("We couldn't find that recipe.")
+    st.markdown("[🏠 Back to the feed](/)")
+    st.stop()
+
+recipe["date_posted"] = datetime.strptime(recipe["created_at"], "%Y-%m-%d %H:%M:%S").strftime("%B %d, %Y")
+
+# What the logged-in user has already done with this recipe
+if st.session_state.authenticated:
+    with db.connection() as conn:
+        reactions = recipes.user_reactions(conn, st.session_state.user_id, recipe_id)
+else:
+    reactions = {"liked": False, "saved": False}
+
+
+# Like/save buttons: write, then drop this recipe's cached view so the counters refresh
+def toggle_reaction(table, on):
+    if not st.session_state.authenticated:
+        st.session_state.login_prompt = True
+        return
+    with db.connection() as conn:
+        recipes.toggle_reaction(conn, table, st.session_state.user_id, recipe_id, on)
+    recipes.invalidate_recipe(recipe_id)
+
+
+def rate_recipe():
+    stars = st.session_state.get("rating_stars")
+    if stars is None:
+        return
+    with db.connection() as conn:
+        recipes.rate_recipe(conn, st.session_state.user_id, recipe_id, stars + 1)
+    recipes.invalidate_recipe(recipe_id)
+    recipes.invalidate_feed()
+
+
+# Add a portion of this recipe to the user's nutrition log
+def log_meal():
+    with db.connection() as conn:
+        meal_log.log_recipe(conn, st.session_state.user_id, recipe, st.session_state.log_portion)
+    st.session_state.meal_logged = True
+
 
 # --- RECIPE DETAIL PAGE ---
 
@@ -78,13 +84,19 @@ with col_img:
     # Action buttons
     btn_col1, btn_col2, btn_col3, btn_col4 = st.columns(4)
     with btn_col1:
-        st.button("❤️ Like", key="like_btn")
+        st.button("💔 Unlike" if reactions["liked"] else "❤️ Like", key="like_btn",
+                  on_click=toggle_reaction, args=("likes", not reactions["liked"]))
     with btn_col2:
-        st.button("🔖 Save", key="save_btn")
+        st.button("✅ Saved" if reactions["saved"] else "🔖 Save", key="save_btn",
+                  on_click=toggle_reaction, args=("saves", not reactions["saved"]))
     with btn_col3:
         st.button("📤 Share", key="share_btn")
     with btn_col4:
         st.button("🖨️ Print", key="print_btn")
+    
+    if st.session_state.pop("login_prompt", False):
+        st.info("Log in to like and save recipes.")
+    st.caption(f"❤️ {recipe['like_count']} likes • 🔖 {recipe['save_count']} saves")
 
 with col_info:
     st.title(recipe["name"])
@@ -94,9 +106,11 @@ with col_info:
     
     # Rating
     st.markdown(f"⭐ {recipe['rating']} ({recipe['reviews']} ratings)")
+    if st.session_state.authenticated:
+        st.feedback("stars", key="rating_stars", on_change=rate_recipe)
     
     # Description
-    st.markdown(recipe["description"])
+    st.markdown(recipe["description"] or "")
     
     # Tags
     st.markdown("**Tags:** " + ", ".join([f"#{tag}" for tag in recipe["tags"]]))
@@ -104,9 +118,9 @@ with col_info:
     # Recipe stats
     stats_col1, stats_col2, stats_col3 = st.columns(3)
     with stats_col1:
-        st.markdown(f"**Prep time:**  \n{recipe['prep_time']}")
+        st.markdown(f"**Prep time:**  \n{recipe['prep_time'] or '—'}")
     with stats_col2:
-        st.markdown(f"**Cook time:**  \n{recipe['cook_time']}")
+        st.markdown(f"**Cook time:**  \n{recipe['cook_time'] or '—'}")
     with stats_col3:
         st.markdown(f"**Servings:**  \n{recipe['servings']}")
 
@@ -123,33 +137,40 @@ with macro_cols[2]:
 with macro_cols[3]:
     st.metric("Calories", f"{recipe['calories']}")
 
-# Macro pie chart
-nutrition_data = pd.DataFrame({
-    'Nutrient': ['Protein', 'Carbs', 'Fat'],
-    'Grams': [recipe['protein'], recipe['carbs'], recipe['fat']],
-    'Calories': [recipe['protein'] * 4, recipe['carbs'] * 4, recipe['fat'] * 9]
-})
-
-chart_col1, chart_col2 = st.columns(2)
-with chart_col1:
-    fig = px.pie(nutrition_data, values='Grams', names='Nutrient', 
-                 title='Macronutrient Distribution (grams)',
-                 color_discrete_sequence=['#1f77b4', '#ff7f0e', '#2ca02c'])
-    st.plotly_chart(fig, use_container_width=True)
-
-with chart_col2:
-    fig = px.pie(nutrition_data, values='Calories', names='Nutrient', 
-                 title='Calorie Distribution',
-                 color_discrete_sequence=['#1f77b4', '#ff7f0e', '#2ca02c'])
-    st.plotly_chart(fig, use_container_width=True)
+if st.session_state.authenticated:
+    portion_col, log_col = st.columns([1, 3], vertical_alignment="bottom")
+    with portion_col:
+        st.number_input("Portions", min_value=0.25, max_value=10.0, value=1.0, step=0.25, key="log_portion")
+    with log_col:
+        st.button("🍽️ Log meal", key="log_meal_btn", on_click=log_meal)
+    if st.session_state.pop("meal_logged", False):
+        st.success("Logged! See your totals under My Profile → My Stats.")
+
+# Macro breakdown: cached Plotly pies, or a tiny inline SVG for slow connections
+if st.toggle("Lightweight charts", key="light_charts"):
+    st.markdown(charts.macro_bars_svg(recipe_id, recipe["protein"], recipe["carbs"], recipe["fat"]),
+                unsafe_allow_html=True)
+else:
+    chart_cols = st.columns(2)
+    for chart_col, fig in zip(chart_cols, charts.macro_pies(recipe_id, recipe["protein"], recipe["carbs"],
+                                                              recipe["fat"])):
+        with chart_col:
+            st.plotly_chart(fig, use_container_width=True)
+
+
+# Shopping checklist; ticking an item only reruns this fragment, not the whole page
+@st.fragment
+def ingredient_checklist():
+    for i, item in enumerate(recipe["ingredients"]):
+        st.checkbox(item, key=f"ingredient_{i}")
+
 
 # Ingredients and Instructions
 ingredients_col, instructions_col = st.columns(2)
 
 with ingredients_col:
     st.subheader("Ingredients")
-    for item in recipe["ingredients"]:
-        st.checkbox(item)
+    ingredient_checklist()
 
 with instructions_col:
     st.subheader("Instructions")
@@ -163,19 +184,29 @@ with st.form("comment_form"):
     submit_comment = st.form_submit_button("Post Comment")
 
 if submit_comment and comment_text:
-    st.success("Comment posted successfully!")
-
-# Sample comments
-st.markdown("**@FitnessFoodie** • 2 days ago  \nMade this yesterday and loved it! I added a tablespoon of cocoa powder for a chocolate version. Delicious!")
-
-st.markdown("**@ProteinQueen** • 5 days ago  \nThis has become my go-to breakfast! So convenient and keeps me full until lunch.")
-
-# Similar recipes
+    if st.session_state.authenticated:
+        with db.connection() as conn:
+            recipes.add_comment(conn, st.session_state.user_id, recipe_id, comment_text)
+        recipes.invalidate_recipe(recipe_id)
+        st.success("Comment posted successfully!")
+        recipe = recipes.cached_recipe(recipe_id)
+    else:
+        st.info("Log in to join the conversation.")
+
+for comment in recipe["comments"]:
+    st.markdown(f"**@{comment['user']}** • {comment['created_at'][:10]}  \n{comment['body']}")
+if not recipe["comments"]:
+    st.caption("No comments yet. Be the first!")
+
+# Similar recipes: nearest neighbours by macros, category, tags and ingredients
 st.subheader("You might also like")
 similar_cols = st.columns(3)
 
-for i, similar in enumerate(recipe["similar_recipes"]):
+similar_recipes = recipes.cached_cards(tuple(similar.similar_recipe_ids(recipe_id, k=3)))
+
+for i, similar_recipe in enumerate(similar_recipes):
     with similar_cols[i]:
-        st.image(similar["image"], use_column_width=True)
-        st.markdown(f"**{similar['name']}**")
-        st.button("View Recipe", key=f"similar_{i}")
+        st.image(similar_recipe["thumb"], width=150)
+        st.markdown(f"**{similar_recipe['name']}**")
+        if st.button("View Recipe", key=f"similar_{i}"):
+            st.switch_page("pages/Recipe_Detail.py", query_params={"id": similar_recipe["id"]})
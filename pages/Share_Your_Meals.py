@@ -1,6 +1,8 @@
 # pages/post_meal.py
 import streamlit as st
-import pandas as pd
+import re
+
+from kitchen import db, images, nutrition, publishing, recipes, sessions, writer
 
 # Page configuration
 st.set_page_config(page_title="Share Your Meal - Leo's Food App", page_icon="🐱", layout="wide")
@@ -13,6 +15,9 @@ st.set_page_config(page_title="Share Your Meal - Leo's Food App", page_icon="
 # st.sidebar.page_link("pages/chatbot.py", label="🤖 Chat Bot")
 # st.sidebar.page_link("pages/post_meal.py", label="📝 Share Your Meal")
 
+# Log returning "Remember me" users back in from their session cookie
+sessions.restore_session()
+
 # --- SHARE MEAL FORM ---
 st.title("Share Your Meal 📝")
 st.write("Fill out the form below to share your meal with the community!")
@@ -34,12 +39,11 @@ with st.form("meal_form"):
     st.subheader("Meal Image")
     uploaded_image = st.file_uploader("Upload an image of your meal", type=["jpg", "jpeg", "png"])
     
-    # Show a preview if image is uploaded
-    if uploaded_image is not None:
-        st.image(uploaded_image, caption="Image Preview", use_column_width=True)
-    
     # Nutrition information
     st.subheader("Nutrition Information")
+    auto_nutrition = st.checkbox("Calculate nutrition from my ingredients",
+                                 help="Works the numbers out from the ingredient list below; "
+                                      "anything we can't recognize is left out.")
     
     macro_col1, macro_col2, macro_col3, macro_col4 = st.columns(4)
     
@@ -83,31 +87,109 @@ with st.form("meal_form"):
     # Submit button
     submitted = st.form_submit_button("Share Your Meal")
 
-if submitted:
-    # Calculate actual calories from macros
-    calculated_calories = protein * 4 + carbs * 4 + fat * 9
-    
-    # Success message
-    st.success("Your meal has been shared successfully!")
-    
-    # Show a preview of how it will appear in the feed
-    st.subheader("Preview:")
-    
-    preview_col1, preview_col2 = st.columns([1, 2])
-    
-    with preview_col1:
-        if uploaded_image is not None:
-            st.image(uploaded_image, use_column_width=True)
+if submitted and not st.session_state.get("authenticated"):
+    st.warning("Please log in to share your meal.")
+elif submitted and not meal_name.strip():
+    st.error("Please give your meal a name.")
+elif submitted:
+    # Derive every nutrition field from the ingredient list, if asked to
+    parsed_ingredients = []
+    if auto_nutrition and ingredients.strip():
+        totals, parsed_ingredients = nutrition.recipe_nutrition(ingredients.splitlines())
+        protein, carbs, fat, calories = totals["protein"], totals["carbs"], totals["fat"], totals["calories"]
+        fiber, sugar, sodium, cholesterol = totals["fiber"], totals["sugar"], totals["sodium"], totals["cholesterol"]
+        saturated_fat, trans_fat = totals["saturated_fat"], totals["trans_fat"]
+    
+    # Keep the photo for the background worker, which makes the feed, detail and thumbnail sizes
+    upload_digest = None
+    if uploaded_image is not None:
+        try:
+            upload_digest = images.store_upload(uploaded_image.getvalue())
+        except ValueError as exc:
+            st.error(str(exc))
+            st.stop()
+    
+    # Save the recipe, its ingredients, tags and publish job in one transaction on the shared writer thread
+    ingredient_lines = [line.strip() for line in ingredients.splitlines() if line.strip()]
+    meal = {
+        "name": meal_name.strip(),
+        "category": meal_category,
+        "description": meal_description,
+        "recipe_url": recipe_url or None,
+        "instructions": [re.sub(r"^\d+[.)]\s*", "", line.strip()) for line in instructions.splitlines()
+                         if line.strip()],
+        "ingredients": ingredient_lines,
+        "tags": list(dict.fromkeys(tag.strip().lstrip("#").lower() for tag in meal_tags.split(",")
+                                   if tag.strip().lstrip("#"))),
+        "protein": protein, "carbs": carbs, "fat": fat, "calories": calories,
+        "fiber": fiber, "sugar": sugar, "sodium": sodium, "cholesterol": cholesterol,
+        "saturated_fat": saturated_fat, "trans_fat": trans_fat,
+    }
+    recipe_id = writer.get_writer().write(publishing.save_submission, st.session_state.user_id,
+                                          f"@{st.session_state.username}", meal, upload_digest)
+    publishing.get_runner().wake()
+    st.session_state.shared_meal = {"recipe_id": recipe_id, "parsed": parsed_ingredients}
+
+
+# Preview of the meal just shared. While it is processing the fragment polls its status,
+# and the whole page reruns once it is published so the polling stops.
+PREVIEW_POLL_SECONDS = 2
+
+shared_meal = st.session_state.get("shared_meal")
+if shared_meal:
+    with db.connection() as conn:
+        shared_status = publishing.recipe_status(conn, shared_meal["recipe_id"])
+    
+    @st.fragment(run_every=PREVIEW_POLL_SECONDS if shared_status == "processing" else None)
+    def meal_preview():
+        with db.connection() as conn:
+            recipe = recipes.load_recipe(conn, shared_meal["recipe_id"])
+        if recipe is None:
+            return
+        if recipe["status"] != shared_status:
+            st.rerun()
+        
+        if recipe["status"] == "processing":
+            st.info("⏳ Your meal is saved! We're preparing your photo; it will appear in the feed in a moment.")
         else:
-            st.image("https://api.placeholder.com/400/300", use_column_width=True)
-    
-    with preview_col2:
-        st.markdown(f"### {meal_name}")
-        st.markdown(f"**Category:** {meal_category}")
-        st.markdown(f"**Description:** {meal_description}")
+            # Success message
+            st.success("Your meal has been shared successfully!")
+        
+        # Show a preview of how it will appear in the feed
+        st.subheader("Preview:")
+        
+        preview_col1, preview_col2 = st.columns([1, 2])
         
-        st.markdown("#### Nutrition Facts")
-        st.markdown(f"**Protein:** {protein}g | **Carbs:** {carbs}g | **Fat:** {fat}g | **Calories:** {calories}")
+        with preview_col1:
+            st.image(recipe["image"], use_column_width=True)
         
-        if recipe_url:
-            st.markdown(f"[View Full Recipe]({recipe_url})")
+        with preview_col2:
+            st.markdown(f"### {recipe['name']}")
+            st.markdown(f"**Category:** {recipe['category']}")
+            st.markdown(f"**Description:** {recipe['description']}")
+            
+            st.markdown("#### Nutrition Facts")
+            st.markdown(f"**Protein:** {recipe['protein']}g | **Carbs:** {recipe['carbs']}g | "
+                        f"**Fat:** {recipe['fat']}g | **Calories:** {recipe['calories']}")
+            
+            parsed_ingredients = shared_meal["parsed"]
+            if parsed_ingredients:
+                unmatched = [item.line for item in parsed_ingredients if item.nutrients is None]
+                if unmatched:
+                    st.warning("We couldn't work out nutrition for: " + ", ".join(unmatched))
+                with st.expander("How we calculated this"):
+                    st.dataframe([{
+                        "Ingredient": item.line,
+                        "Matched": item.food or "—",
+                        "Grams": round(item.grams) if item.grams is not None else None,
+                        "Calories": round(item.nutrients["calories"]) if item.nutrients else None,
+                        "Protein (g)": round(item.nutrients["protein"], 1) if item.nutrients else None,
+                    } for item in parsed_ingredients], hide_index=True, use_container_width=True)
+            
+            if recipe["recipe_url"]:
+                st.markdown(f"[View Full Recipe]({recipe['recipe_url']})")
+            if recipe["status"] == "published":
+                st.markdown(f"[See it on Leo's Kitchen](/Recipe_Detail?id={recipe['id']})")
+    
+    meal_preview()
+    st.button("Share another meal", on_click=lambda: st.session_state.pop("shared_meal", None))
@@ -0,0 +1,44 @@
+# tests/conftest.py
+# Shared fixtures: a local stand-in for the OpenAI client and a throwaway database.
+import re
+from types import SimpleNamespace
+
+import pytest
+
+from kitchen import db
+
+
+def _chunk(text):
+    return SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=text))])
+
+
+# Records every chat.completions.create() call; streamed replies come back as OpenAI-style
+# chunks, summaries as "summary <n>"
+class FakeClient:
+    def __init__(self, reply="Try overnight oats with Greek yogurt."):
+        self.reply = reply
+        self.calls = []
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+
+    def _create(self, model, messages, stream=False, max_tokens=None):
+        self.calls.append({"model": model, "messages": messages, "max_tokens": max_tokens})
+        if stream:
+            return iter(_chunk(word) for word in re.findall(r"\S+\s*", self.reply))
+        content = f"summary {len(self.calls)}"
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+    def calls_to(self, model):
+        return [call for call in self.calls if call["model"] == model]
+
+
+@pytest.fixture
+def client():
+    return FakeClient()
+
+
+@pytest.fixture
+def pool(tmp_path):
+    pool = db.ConnectionPool(str(tmp_path / "test.db"))
+    pool.migrate()
+    yield pool
+    pool.close()
@@ -0,0 +1,116 @@
+# tests/test_chat.py
+# Token-budgeted window and running summary of kitchen/chat.py, against the fake client.
+from kitchen import chat
+
+BUDGET = 200
+
+
+# Stored-looking turns: message ids 2 * turn + 1 (user) and 2 * turn + 2 (assistant)
+def _add_turns(conversation, start, stop):
+    for turn in range(start, stop):
+        conversation.add("user", f"question {turn} about high protein breakfast ideas", 2 * turn + 1)
+        conversation.add("assistant", f"answer {turn}: oats, eggs and greek yogurt with berries", 2 * turn + 2)
+    return conversation
+
+
+def _conversation(turns, budget=BUDGET):
+    return _add_turns(chat.Conversation(budget=budget), 0, turns)
+
+
+# Summary plus recent turns, i.e. everything the budget covers
+def _context_tokens(request):
+    return sum(chat.message_tokens(message) for message in request[1:])
+
+
+def test_count_tokens():
+    assert chat.count_tokens("") == 0
+    assert chat.count_tokens("high protein, please!") == 7
+    assert chat.count_tokens("overnight") == 3
+
+
+def test_short_conversation_is_sent_whole(client):
+    conversation = _conversation(2)
+    "".join(chunk.choices[0].delta.content for chunk in conversation.stream_reply(client))
+
+    assert not client.calls_to(chat.SUMMARY_MODEL)
+    request = client.calls_to(chat.MODEL)[0]["messages"]
+    assert request[0] == {"role": "system", "content": chat.SYSTEM_PROMPT}
+    assert [message["content"] for message in request[1:]] == [message["content"] for message in conversation.messages]
+    assert all(set(message) == {"role", "content"} for message in request)
+
+
+def test_request_messages_stay_within_budget(client):
+    conversation = chat.Conversation(budget=BUDGET)
+    for turn in range(40):
+        conversation.add("user", f"question {turn}: what can I cook with salmon, rice and spinach tonight?")
+        reply = "".join(chunk.choices[0].delta.content for chunk in conversation.stream_reply(client))
+        conversation.add("assistant", reply)
+
+        request = client.calls_to(chat.MODEL)[-1]["messages"]
+        assert _context_tokens(request) <= BUDGET
+        assert request[-1]["content"].startswith(f"question {turn}:")
+    assert client.calls_to(chat.SUMMARY_MODEL)
+
+
+def test_request_messages_keep_the_latest_message_even_over_budget():
+    conversation = chat.Conversation(budget=20)
+    conversation.add("user", "short")
+    conversation.add("user", "a very long question " * 20)
+    request = conversation.request_messages()
+    assert len(request) == 2
+    assert request[-1]["content"] == conversation.messages[-1]["content"]
+
+
+def test_compact_sends_only_previous_summary_and_folded_turns(client):
+    conversation = _conversation(12)
+    kept_before = list(conversation.messages)
+
+    assert conversation.compact(client)
+    first = client.calls_to(chat.SUMMARY_MODEL)[0]
+    folded = kept_before[:len(kept_before) - len(conversation.messages)]
+    content = first["messages"][1]["content"]
+    assert first["max_tokens"] == chat.SUMMARY_MAX_TOKENS
+    assert "(none yet)" in content
+    assert all(message["content"] in content for message in folded)
+    assert not any(message["content"] in content for message in conversation.messages)
+    assert conversation.summary == "summary 1"
+
+    # The next fold carries the previous summary, not the turns it already covers
+    _add_turns(conversation, 12, 24)
+    assert conversation.compact(client)
+    second = client.calls_to(chat.SUMMARY_MODEL)[1]["messages"][1]["content"]
+    assert "Current summary:\nsummary 1" in second
+    assert not any(message["content"] in second for message in folded)
+    assert conversation.summary == "summary 2"
+
+
+def test_compact_is_a_no_op_within_budget(client):
+    conversation = _conversation(2)
+    assert not conversation.compact(client)
+    assert not client.calls
+    assert conversation.summarized_id is None
+    assert conversation.summary == ""
+
+
+def test_summarized_id_moves_forward(client):
+    conversation = _conversation(12)
+    assert conversation.compact(client)
+    first_id = conversation.summarized_id
+    assert first_id is not None
+    # The summary covers exactly the messages before the ones still held
+    assert conversation.messages[0]["id"] == first_id + 1
+    assert conversation.context_tokens() <= BUDGET
+
+    _add_turns(conversation, 12, 24)
+    assert conversation.compact(client)
+    assert conversation.summarized_id > first_id
+    assert conversation.messages[0]["id"] == conversation.summarized_id + 1
+
+
+def test_restored_conversation_continues_from_its_summary(client):
+    messages = [{"id": 7, "role": "user", "content": "and for dinner?"}]
+    conversation = chat.Conversation(messages, summary="Wants high protein meals.", summarized_id=6)
+    request = conversation.request_messages(extra_system="Recipes: Salmon with Veggies")
+    assert request[1]["content"].endswith("Wants high protein meals.")
+    assert request[2] == {"role": "system", "content": "Recipes: Salmon with Veggies"}
+    assert request[3] == {"role": "user", "content": "and for dinner?"}
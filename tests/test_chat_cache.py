@@ -0,0 +1,115 @@
+# tests/test_chat_cache.py
+# Response cache of kitchen/chat_cache.py on a throwaway database, against the fake client.
+from types import SimpleNamespace
+
+import pytest
+
+from kitchen import chat, chat_cache
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(chat_cache, "time", SimpleNamespace(time=clock))
+    return clock
+
+
+@pytest.fixture
+def cache(pool):
+    return chat_cache.ResponseCache(pool)
+
+
+def _text(chunk):
+    return chunk if isinstance(chunk, str) else chunk.choices[0].delta.content
+
+
+def _ask(client, cache, prompt, history=(), extra_system=None):
+    conversation = chat.Conversation()
+    for role, content in history:
+        conversation.add(role, content)
+    conversation.add("user", prompt)
+    return "".join(_text(chunk) for chunk in conversation.stream_reply(client, extra_system, cache=cache))
+
+
+def test_normalize():
+    assert chat_cache.normalize("  High  protein\nbreakfast ideas?! ") == "high protein breakfast ideas"
+    assert chat_cache.normalize("How many calories in OATS?") == "how many calories in oats"
+
+
+def test_normalized_prompt_hits(client, cache):
+    first = _ask(client, cache, "High protein breakfast ideas?")
+    second = _ask(client, cache, "  high protein   BREAKFAST ideas ")
+
+    assert second == first == client.reply
+    assert len(client.calls_to(chat.MODEL)) == 1
+    assert cache.stats() == {"hits": 1, "misses": 1, "hit_rate": 0.5, "entries": 1}
+
+
+def test_different_context_misses(client, cache):
+    _ask(client, cache, "high protein breakfast ideas")
+    _ask(client, cache, "high protein breakfast ideas", history=[("user", "I'm vegan"), ("assistant", "Noted!")])
+    _ask(client, cache, "high protein breakfast ideas", extra_system="Recipes: Protein Pancakes")
+
+    assert len(client.calls_to(chat.MODEL)) == 3
+    assert cache.stats()["misses"] == 3
+    assert cache.stats()["entries"] == 3
+
+
+def test_entries_expire_after_ttl(client, pool, clock):
+    cache = chat_cache.ResponseCache(pool, ttl=60)
+    key = chat_cache.cache_key(chat.MODEL, [{"role": "user", "content": "oats"}])
+    cache.put(key, "oats", "Oats are great.")
+
+    clock.now += 59
+    assert cache.get(key) == "Oats are great."
+    clock.now += 2
+    assert cache.get(key) is None
+
+    cache.evict()
+    assert cache.stats()["entries"] == 0
+
+
+def test_least_recently_used_entries_are_evicted(pool, clock):
+    cache = chat_cache.ResponseCache(pool, max_entries=2)
+    for key in ("a", "b", "c"):
+        clock.now += 1
+        cache.put(key, key, f"answer {key}")
+    clock.now += 1
+    assert cache.get("a") == "answer a"
+
+    cache.evict()
+    assert cache.get("b") is None
+    assert cache.get("a") == "answer a"
+    assert cache.get("c") == "answer c"
+
+
+def test_unfinished_stream_is_not_stored(cache):
+    def broken_stream():
+        yield SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content="Half an "))])
+        raise ConnectionError("stream dropped")
+
+    with pytest.raises(ConnectionError):
+        "".join(cache.store_stream("key", "prompt", broken_stream()))
+    assert cache.get("key") is None
+
+    # A reader that stops early (e.g. the session went away) stores nothing either
+    stream = cache.store_stream("key", "prompt", iter([
+        SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=word))]) for word in ("a ", "b")
+    ]))
+    next(stream)
+    stream.close()
+    assert cache.get("key") is None
+    assert cache.stats()["entries"] == 0
+
+
+def test_replay_reproduces_the_text():
+    text = "Try  overnight oats\nwith berries. "
+    assert "".join(chat_cache.replay(text)) == text
@@ -0,0 +1,51 @@
+# tests/test_images.py
+# Background processing of uploaded photos (kitchen/images.py) in a throwaway media folder.
+import io
+
+import pytest
+from PIL import Image
+
+from kitchen import images
+
+
+@pytest.fixture(autouse=True)
+def media_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(images, "MEDIA_DIR", str(tmp_path / "media"))
+
+
+def _photo():
+    buffer = io.BytesIO()
+    Image.new("RGB", (800, 600), (200, 100, 50)).save(buffer, "JPEG")
+    return buffer.getvalue()
+
+
+def test_upload_is_processed_and_dropped():
+    digest = images.store_upload(_photo())
+    assert images.process_upload(digest)
+    assert images._has_renditions(digest)
+    assert not images.os.path.exists(images._upload_path(digest))
+    # Repeating the job (e.g. after a crash) still succeeds
+    assert images.process_upload(digest)
+
+
+def test_missing_upload_without_renditions_fails():
+    assert not images.process_upload("0" * 64)
+
+
+# Two jobs for the same photo: the other one finished it and dropped the upload
+# between this job's checks
+def test_upload_dropped_by_a_concurrent_job_still_counts(monkeypatch):
+    digest = images.store_upload(_photo())
+    other_job_done = False
+    has_renditions = images._has_renditions
+
+    def finished_by_other_job(checked_digest):
+        nonlocal other_job_done
+        if not other_job_done:
+            other_job_done = True
+            assert images.process_upload(checked_digest)
+            return False
+        return has_renditions(checked_digest)
+
+    monkeypatch.setattr(images, "_has_renditions", finished_by_other_job)
+    assert images.process_upload(digest)
@@ -0,0 +1,60 @@
+# tests/test_incremental.py
+# Incremental refresh of the in-memory recipe indexes (kitchen/incremental.py) on a throwaway database.
+import pytest
+
+from kitchen import macros, retrieval, similar
+
+INDEXES = [macros.MacroIndex, similar.SimilarRecipes, retrieval.RecipeIndex]
+
+
+def _add_recipe(conn, name, status="published"):
+    return conn.execute(
+        "INSERT INTO recipes (author, name, category, protein, carbs, fat, calories, status) "
+        "VALUES ('@leo', ?, 'Breakfast', 30, 40, 10, 370, ?)",
+        (name, status)
+    ).lastrowid
+
+
+def _indexed_ids(index):
+    return {int(recipe_id) for recipe_id in index._ids[:len(index)]}
+
+
+@pytest.mark.parametrize("index_class", INDEXES)
+def test_processing_recipes_are_indexed_once_published(pool, index_class):
+    index = index_class()
+    with pool.connection() as conn:
+        processing = _add_recipe(conn, "Slow Oats", "processing")
+        later = _add_recipe(conn, "Quick Eggs")
+    with pool.connection() as conn:
+        index.refresh(conn)
+    assert later in _indexed_ids(index) and processing not in _indexed_ids(index)
+
+    with pool.connection() as conn:
+        conn.execute("UPDATE recipes SET status = 'published' WHERE id = ?", (processing,))
+    with pool.connection() as conn:
+        index.refresh(conn)
+    assert processing in _indexed_ids(index)
+    assert len(index) == len(_indexed_ids(index))
+
+
+# A recipe published by another connection while a refresh is reading must not be skipped
+@pytest.mark.parametrize("index_class", INDEXES)
+def test_recipe_published_during_a_refresh_is_not_skipped(pool, index_class):
+    with pool.connection() as conn:
+        processing = _add_recipe(conn, "Slow Oats", "processing")
+        later = _add_recipe(conn, "Quick Eggs")
+
+    class PublishingMidScan(index_class):
+        def add(self, recipes):
+            super().add(recipes)
+            with pool.connection() as conn:
+                conn.execute("UPDATE recipes SET status = 'published' WHERE id = ?", (processing,))
+
+    index = PublishingMidScan()
+    with pool.connection() as conn:
+        index.refresh(conn, batch_size=1)
+    assert later in _indexed_ids(index)
+
+    with pool.connection() as conn:
+        index.refresh(conn)
+    assert processing in _indexed_ids(index)
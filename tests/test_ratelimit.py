@@ -0,0 +1,67 @@
+# tests/test_ratelimit.py
+# Login throttling of kitchen/ratelimit.py: state persisted to a throwaway database, and the client keys.
+from types import SimpleNamespace
+
+import pytest
+
+from kitchen import db, ratelimit
+
+KEYS = ("user:leo", "client:10.0.0.1")
+
+
+@pytest.fixture
+def limiter(pool, monkeypatch):
+    monkeypatch.setattr(db, "connection", pool.connection)
+    return ratelimit.LoginLimiter(persist=True)
+
+
+def test_lockout_survives_a_restart(limiter):
+    for _ in range(ratelimit.USERNAME_LIMIT.max_failures):
+        limiter.acquire(*KEYS)
+        limiter.record_failure(*KEYS)
+    assert not limiter.acquire(*KEYS)[0]
+
+    restarted = ratelimit.LoginLimiter(persist=True)
+    allowed, retry_after = restarted.acquire(*KEYS)
+    assert not allowed and retry_after > 0
+
+
+# Saves happen after the lock is released, so they can commit out of order
+def test_older_snapshot_does_not_overwrite_a_newer_one(limiter):
+    limiter.acquire(*KEYS)
+    with limiter._lock:
+        older = limiter._snapshot(KEYS)
+    for _ in range(ratelimit.USERNAME_LIMIT.max_failures):
+        limiter.record_failure(*KEYS)
+    limiter._save(older)
+
+    restarted = ratelimit.LoginLimiter(persist=True)
+    assert restarted._states["user:leo"].failures == ratelimit.USERNAME_LIMIT.max_failures
+    assert not restarted.acquire(*KEYS)[0]
+
+
+def _connect(monkeypatch, ip_address=None, forwarded=None):
+    headers = {"X-Forwarded-For": forwarded} if forwarded else {}
+    context = SimpleNamespace(ip_address=ip_address, headers=headers)
+    monkeypatch.setattr(ratelimit, "st", SimpleNamespace(context=context))
+
+
+def test_login_keys_use_the_client_address(monkeypatch):
+    _connect(monkeypatch, ip_address="10.0.0.1", forwarded="1.2.3.4")
+    assert ratelimit.login_keys(" Leo ") == ("user:leo", "client:10.0.0.1")
+
+
+# Without a trusted proxy, X-Forwarded-For is whatever the client sent: rotating it must not
+# give a fresh bucket, and clients without an address must not share one
+def test_client_set_forwarded_for_is_ignored(monkeypatch):
+    _connect(monkeypatch, forwarded="1.2.3.4")
+    assert ratelimit.login_keys("leo") == ("user:leo",)
+
+
+def test_only_the_proxy_appended_hop_is_trusted(monkeypatch):
+    monkeypatch.setattr(ratelimit, "TRUSTED_PROXY_HOPS", 1)
+    _connect(monkeypatch, ip_address="192.168.0.2", forwarded="6.6.6.6, 10.0.0.1")
+    assert ratelimit.login_keys("leo") == ("user:leo", "client:10.0.0.1")
+
+    _connect(monkeypatch, ip_address="192.168.0.2")
+    assert ratelimit.login_keys("leo") == ("user:leo",)